@@ -0,0 +1,207 @@
+import argparse
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from graph_csr import CSRGraph
+from routing import INF, dijkstra, resume
+
+# --- RUTE ALTERNATIF (k rute bermakna, bukan hanya satu jalur terpendek) ---
+# Metode plateau (default), dibangun dari DUA shortest-path tree:
+#   maju  T_s : Dijkstra dari s          -> ds[v], pred_s[v]
+#   mundur T_t: Dijkstra dari t (graf transpos) -> dt[v], next_t[v] (langkah ke arah t)
+# Edge u -> v yang ada di KEDUA tree (pred_s[v] == u dan next_t[u] == v) membentuk
+# rantai "plateau". Setiap plateau memberi satu rute s ~> awal plateau (T_s),
+# sepanjang plateau, akhir plateau ~> t (T_t), dengan biaya ds[v] + dt[v] untuk
+# node v mana pun di plateau. Plateau panjang = rute alternatif yang wajar.
+# Kedua tree dibatasi radius (1 + stretch) * d(s, t): node di luar radius tidak
+# mungkin berada di rute yang lolos batas stretch, jadi tidak perlu di-settle.
+#
+# Metode penalty: ulangi Dijkstra s -> t sambil menaikkan bobot edge rute yang
+# sudah ditemukan (bobot disalin, graf asli tidak berubah).
+#
+# Setiap kandidat harus: jalur sederhana (tanpa loop), biaya <= (1 + stretch) * optimal,
+# dan berbagi <= overlap * biayanya dengan setiap rute yang sudah dipilih.
+
+DEFAULT_K = 3
+DEFAULT_STRETCH = 0.25
+DEFAULT_OVERLAP = 0.6
+# Plateau minimum (fraksi d(s, t)); plateau lebih pendek menghasilkan rute berliku
+MIN_PLATEAU = 0.1
+# Toleransi relatif saat membandingkan biaya rute (jumlah ulang bobot) dengan jarak Dijkstra
+COST_RTOL = 1e-9
+# Metode penalty: faktor kenaikan bobot edge rute terpilih & batas iterasi per rute
+PENALTY = 0.4
+PENALTY_ROUNDS = 4
+
+
+class Route:
+    """Satu rute: urutan indeks node, biaya, dan edge (u, v) -> bobot untuk hitung overlap."""
+
+    __slots__ = ('nodes', 'cost', 'edges')
+
+    def __init__(self, nodes, cost, edges):
+        self.nodes = nodes
+        self.cost = cost
+        self.edges = edges
+
+
+def edge_weight(csr, u, v):
+    weights, targets = csr.weights, csr.targets
+    return min(weights[i] for i in range(csr.offsets[u], csr.offsets[u + 1]) if targets[i] == v)
+
+
+def make_route(csr, nodes):
+    """Route dari urutan node (bobot edge asli); None jika jalur tidak sederhana."""
+    if len(set(nodes)) != len(nodes):
+        return None
+    edges = {(a, b): edge_weight(csr, a, b) for a, b in zip(nodes, nodes[1:])}
+    return Route(nodes, sum(edges.values()), edges)
+
+
+def shared_cost(a, b):
+    """Total bobot edge yang dilalui kedua rute."""
+    small, large = (a, b) if len(a.edges) <= len(b.edges) else (b, a)
+    return sum(w for e, w in small.edges.items() if e in large.edges)
+
+
+def accept(route, chosen, best_cost, stretch, overlap):
+    """Terima rute jika lolos batas stretch & overlap terhadap semua rute terpilih."""
+    if route is None or route.cost > (1.0 + stretch) * best_cost:
+        return False
+    for other in chosen:
+        if route.nodes == other.nodes or shared_cost(route, other) > overlap * route.cost:
+            return False
+    return True
+
+
+# --- METODE PLATEAU ---
+def plateau_alternatives(csr, s, t, k=DEFAULT_K, stretch=DEFAULT_STRETCH, overlap=DEFAULT_OVERLAP):
+    """Hingga k rute s -> t. Mengembalikan (list Route, rute pertama = terpendek; visited)."""
+    fwd = dijkstra(csr, s, (t,), with_pred=True)
+    best = fwd.dist[t]
+    if best == INF:
+        return [], fwd.visited
+    limit = (1.0 + stretch) * best
+    resume(csr, fwd, None, limit)
+    bwd = dijkstra(csr.reverse(), t, with_pred=True, limit=limit)
+    ds, pred_s, dt, next_t = fwd.dist, fwd.pred, bwd.dist, bwd.pred
+    visited = fwd.visited + bwd.visited
+
+    # Plateau: rantai edge u -> next_t[u] yang juga edge pohon maju (pred_s[next_t[u]] == u)
+    def on_plateau(u):
+        v = next_t[u]
+        return v != -1 and pred_s[v] == u
+
+    plateaus = []
+    for u in range(csr.num_nodes):
+        if ds[u] + dt[u] > limit or not on_plateau(u):
+            continue
+        p = pred_s[u]
+        if p != -1 and next_t[p] == u:
+            continue  # bukan awal rantai
+        end = u
+        while on_plateau(end):
+            end = next_t[end]
+        length = dt[u] - dt[end]
+        if length >= MIN_PLATEAU * best:
+            plateaus.append((ds[u] + dt[u] - length, u))
+    plateaus.sort()  # skor: biaya di luar plateau (kecil = lebih "alami")
+
+    chosen = []
+    for _, start in plateaus:
+        head = fwd.path_to(start)
+        tail = []
+        v = next_t[start]
+        while v != -1:
+            tail.append(v)
+            v = next_t[v]
+        route = make_route(csr, head + tail)
+        if route is None:
+            continue
+        if not chosen:
+            chosen.append(route)  # plateau terpanjang selalu rute terpendek (s ~> t di kedua tree)
+        elif accept(route, chosen, best, stretch, overlap):
+            chosen.append(route)
+        if len(chosen) == k:
+            break
+    # Biaya dijumlah ulang dari edge -> bandingkan dengan toleransi relatif, bukan ==
+    if not chosen or chosen[0].cost > best * (1.0 + COST_RTOL):
+        rest, chosen = chosen, [make_route(csr, fwd.path_to(t))]
+        chosen += [r for r in rest if accept(r, chosen, best, stretch, overlap)][:k - 1]
+    chosen[1:] = sorted(chosen[1:], key=lambda r: r.cost)
+    return chosen, visited
+
+
+# --- METODE PENALTY ---
+def penalty_alternatives(csr, s, t, k=DEFAULT_K, stretch=DEFAULT_STRETCH, overlap=DEFAULT_OVERLAP):
+    """Hingga k rute s -> t dengan penalti bobot. Mengembalikan (list Route, visited)."""
+    weights = array('d', csr.weights)
+    penalized = CSRGraph(csr.offsets, csr.targets, weights, csr.node_ids, csr.xs, csr.ys)
+    offsets, targets = csr.offsets, csr.targets
+
+    chosen, visited, best = [], 0, INF
+    for _ in range(k * PENALTY_ROUNDS):
+        spt = dijkstra(penalized, s, (t,), with_pred=True)
+        visited += spt.visited
+        if spt.dist[t] == INF:
+            break
+        route = make_route(csr, spt.path_to(t))
+        if not chosen:
+            best = route.cost
+            chosen.append(route)
+        elif accept(route, chosen, best, stretch, overlap):
+            chosen.append(route)
+        if len(chosen) == k:
+            break
+        for u, v in zip(route.nodes, route.nodes[1:]):
+            for i in range(offsets[u], offsets[u + 1]):
+                if targets[i] == v:
+                    weights[i] *= 1.0 + PENALTY
+    chosen[1:] = sorted(chosen[1:], key=lambda r: r.cost)
+    return chosen, visited
+
+
+METHODS = {'plateau': plateau_alternatives, 'penalty': penalty_alternatives}
+
+
+def alternatives(csr, s, t, k=DEFAULT_K, stretch=DEFAULT_STRETCH, overlap=DEFAULT_OVERLAP, method='plateau'):
+    return METHODS[method](csr, s, t, k, stretch, overlap)
+
+
+def report(routes):
+    best = routes[0].cost if routes else INF
+    for i, r in enumerate(routes, 1):
+        share = max((shared_cost(r, o) / r.cost for o in routes[:i - 1]), default=0.0) if r.cost else 0.0
+        print(f"  Rute {i}: biaya {r.cost:8.2f} (+{r.cost / best - 1:6.1%}) | {len(r.nodes):4d} node | "
+              f"overlap maks {share:5.1%}")
+
+
+# --- BENCHMARK: SEMUA INSTANCE ---
+def benchmark(data_dir, k, stretch, overlap):
+    from instance_io import load_instance_csr
+
+    files = sorted(Path(data_dir).glob('*.json'))
+    print(f"=== RUTE ALTERNATIF k={k}, stretch <= {stretch:.0%}, overlap <= {overlap:.0%} ===")
+    print(f"{'Instance':<20} | {'Metode':<8} | {'Rute':>4} | {'Time_ms':>9} | {'Visited':>8}")
+    for path in files:
+        inst, csr = load_instance_csr(path)
+        s, t = csr.to_index(inst['meta']['start_node']), csr.to_index(inst['meta']['end_node'])
+        for method in METHODS:
+            t0 = time.perf_counter()
+            routes, visited = alternatives(csr, s, t, k, stretch, overlap, method)
+            dt = (time.perf_counter() - t0) * 1000.0
+            print(f"{path.stem:<20} | {method:<8} | {len(routes):>4} | {dt:9.2f} | {visited:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Rute alternatif (plateau / penalty) untuk semua instance')
+    p.add_argument('--data', default='data', help='Folder instance')
+    p.add_argument('--k', type=int, default=DEFAULT_K, help='Jumlah rute maksimum')
+    p.add_argument('--stretch', type=float, default=DEFAULT_STRETCH, help='Batas biaya relatif (0.25 = +25%%)')
+    p.add_argument('--overlap', type=float, default=DEFAULT_OVERLAP, help='Batas bagian rute yang dipakai bersama')
+    args = p.parse_args()
+
+    sys.exit(benchmark(args.data, args.k, args.stretch, args.overlap))
@@ -2,6 +2,7 @@ import json
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from instance_io import load_instance_csr
 
 DATA_PATH = Path('data/solo_route_G01.json') # Sampel representatif
 
@@ -12,24 +13,16 @@ def analyze_dataset():
         print("ERROR: File data tidak ditemukan. Jalankan generate_instances.py dulu.")
         return
 
-    with open(DATA_PATH, 'r') as f:
-        data = json.load(f)
+    # Graf dibaca dari cache biner (mmap), tanpa json.load graf lengkap
+    data, csr = load_instance_csr(DATA_PATH)
 
     # 1. Statistik Dasar (N dan M)
-    graph = data['graph']
-    n_nodes = len(graph)
-    
-    # Hitung Edges (m) dan kumpulkan Bobot (Weights)
-    edges_weights = []
-    m_edges = 0
-    
-    for u, neighbors in graph.items():
-        m_edges += len(neighbors)
-        for v, weight in neighbors.items():
-            edges_weights.append(weight)
+    n_nodes = csr.num_nodes
+    m_edges = csr.num_edges
             
     # 2. Sebaran Nilai (Bobot Jalan)
-    weights = np.array(edges_weights)
+    # np.frombuffer: view langsung ke buffer bobot, tanpa menyalin
+    weights = np.frombuffer(csr.weights, dtype=np.float64)
     
     print(f"1. STRUKTUR GRAF (PETA SOLO):")
     print(f"   - Jumlah Node (n) : {n_nodes:,} simpul")
@@ -48,7 +41,8 @@ def analyze_dataset():
     snippet = {
         "project": data['project'],
         "meta": data['meta'],
-        "graph_sample": {k: graph[k] for k in list(graph.keys())[:2]} # Ambil 2 node saja
+        "graph_sample": {csr.to_osm(u): {csr.to_osm(v): w for v, w in csr.neighbors(u)}
+                         for u in range(2)} # Ambil 2 node saja
     }
     print(json.dumps(snippet, indent=2))
 
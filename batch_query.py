@@ -0,0 +1,65 @@
+import csv
+import json
+from pathlib import Path
+
+from routing import one_to_many
+
+# --- BATCH QUERY: ONE-TO-MANY & MANY-TO-MANY ---
+# Satu pencarian Dijkstra (routing.one_to_many) per SUMBER.
+# Pencarian berhenti begitu semua target yang diminta sudah di-settle,
+# sehingga total kerja sebanding dengan jumlah sumber, bukan jumlah pasangan.
+
+
+def many_to_many(csr, sources, targets, cache=None, graph_key=None):
+    """
+    Matriks jarak |sources| x |targets| (input berupa OSM ID).
+    Dengan `cache` (SPTCache) pencarian per sumber di-resume dari state tersimpan.
+    Mengembalikan (matrix: list of list, total visited).
+    """
+    target_idx = [csr.to_index(t) for t in targets]
+    matrix = []
+    total_visited = 0
+    for s in sources:
+        if cache is None:
+            row, visited = one_to_many(csr, csr.to_index(s), target_idx)
+        else:
+            spt, _, visited = cache.search(csr, graph_key, csr.to_index(s), target_idx)
+            row = [spt.dist[t] for t in target_idx]
+        matrix.append(row)
+        total_visited += visited
+    return matrix, total_visited
+
+
+def load_queries(path):
+    """
+    Baca file query: JSON {"sources": [...], "targets": [...]}
+    atau CSV dua kolom 'role,node' (role = source/target).
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        sources, targets = [], []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                (sources if row['role'].strip() == 'source' else targets).append(row['node'].strip())
+        return sources, targets
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [str(s) for s in data['sources']], [str(t) for t in data['targets']]
+
+
+def save_matrix(path, sources, targets, matrix):
+    """Simpan matriks jarak ke .csv (dengan header OSM ID) atau .npy (NumPy)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == '.npy':
+        import numpy as np  # Hanya dibutuhkan untuk output .npy
+        np.save(path, np.array(matrix, dtype=np.float64))
+        return path
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['source'] + [str(t) for t in targets])
+        for s, row in zip(sources, matrix):
+            writer.writerow([str(s)] + [repr(d) for d in row])
+    return path
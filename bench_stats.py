@@ -0,0 +1,65 @@
+import math
+
+# --- STATISTIK BENCHMARK ---
+# Ringkasan sampel waktu per (instance, algoritma) tanpa scipy:
+#   median, mean, std, p95, CV (std / mean) dan interval kepercayaan median.
+# CI median dihitung distribution-free dari order statistics (binomial n, 0.5),
+# karena waktu eksekusi jarang berdistribusi normal (ekor kanan panjang akibat
+# GC / context switch). Dengan sampel sedikit CI melebar menjadi [min, max].
+
+# Ambang CV di atas ini -> pengukuran dianggap noisy (ulangi di mesin yang lebih tenang)
+NOISE_CV = 0.10
+
+
+def percentile(values, q):
+    """Persentil q (0..100) dengan interpolasi linear, sama seperti numpy default."""
+    data = sorted(values)
+    if not data:
+        return math.nan
+    pos = (len(data) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (pos - lo)
+
+
+def median_ci(values, confidence=0.95):
+    """
+    Interval kepercayaan median: [x_(k), x_(n-k+1)] dengan k terbesar sehingga
+    P(Binom(n, 0.5) < k) <= (1 - confidence) / 2. Jika sampel terlalu sedikit
+    untuk mencapai tingkat kepercayaan tersebut, dikembalikan [min, max].
+    """
+    data = sorted(values)
+    n = len(data)
+    if n == 0:
+        return math.nan, math.nan
+    alpha = (1.0 - confidence) / 2
+    k, cdf = 0, 0.0
+    while k < n // 2:
+        p = math.comb(n, k) / 2 ** n
+        if cdf + p > alpha:
+            break
+        cdf += p
+        k += 1
+    if k == 0:
+        return data[0], data[-1]
+    return data[k - 1], data[n - k]
+
+
+def summarize(values, noise_cv=NOISE_CV):
+    """Dict ringkasan statistik dari list sampel (ms)."""
+    n = len(values)
+    mean = sum(values) / n
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1)) if n > 1 else 0.0
+    cv = std / mean if mean > 0 else 0.0
+    ci_low, ci_high = median_ci(values)
+    return {
+        'median': percentile(values, 50),
+        'mean': mean,
+        'std': std,
+        'p95': percentile(values, 95),
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'cv': cv,
+        'n': n,
+        'noisy': n > 1 and cv > noise_cv,
+    }
@@ -0,0 +1,433 @@
+import argparse
+import heapq
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# --- CONTRACTION HIERARCHIES (CH) ---
+# Preprocessing (sekali per peta):
+#   1. Urutan node berdasarkan prioritas = edge difference (shortcut yang
+#      dibutuhkan - edge yang hilang) + jumlah tetangga yang sudah dikontraksi.
+#      Prioritas diperbarui secara lazy saat node diambil dari heap.
+#   2. Kontraksi node satu per satu. Untuk tiap pasangan u -> v -> w dicari
+#      "witness" (jalur alternatif u -> w tanpa v yang tidak lebih mahal)
+#      dengan Dijkstra terbatas; jika tidak ada, ditambahkan shortcut u -> w
+#      dengan node tengah v (untuk unpacking jalur).
+#   3. Hasilnya dua graf CSR:
+#        UP   : edge a -> b dengan rank[b] > rank[a]   (disimpan di a)
+#        DOWN : edge a -> b dengan rank[a] > rank[b]   (disimpan terbalik di b)
+# Query: Dijkstra dua arah yang hanya naik rank (maju di UP dari s, mundur di
+# DOWN dari t). Setiap sisi berhenti saat minimum frontier-nya >= mu.
+#
+# File .ch (data/graphs/<hash>.ch), little-endian, setiap blok rata 8 byte:
+#   header (64 byte): magic, versi, V, E_up, E_down, hash graf sumber
+#   rank int32[V]
+#   up:   offsets int64[V+1], targets int32[E_up], weights float64[E_up], mids int32[E_up]
+#   down: offsets int64[V+1], targets int32[E_dn], weights float64[E_dn], mids int32[E_dn]
+# mids[i] = -1 untuk edge asli, selain itu node tengah shortcut.
+
+CH_MAGIC = b'SPCH\0\0\0\0'
+CH_VERSION = 1
+CH_HEADER = struct.Struct('<8sIqqq40s')
+CH_HEADER_SIZE = 80
+
+# Batas node yang di-settle per witness search. Lebih kecil = preprocessing
+# lebih cepat tetapi shortcut lebih banyak (tetap benar, hanya kurang optimal).
+WITNESS_SETTLE_LIMIT = 500
+
+
+class CHGraph:
+    """Hierarki hasil kontraksi: rank per node + graf UP dan DOWN (CSR dengan node tengah)."""
+
+    def __init__(self, rank, up, down, source_hash=''):
+        self.rank = rank
+        self.up = up          # (offsets, targets, weights, mids)
+        self.down = down      # (offsets, targets, weights, mids)
+        self.source_hash = source_hash
+
+    @property
+    def num_nodes(self):
+        return len(self.rank)
+
+    @property
+    def num_edges(self):
+        return len(self.up[1]) + len(self.down[1])
+
+    def num_shortcuts(self):
+        return sum(1 for m in self.up[3] if m >= 0) + sum(1 for m in self.down[3] if m >= 0)
+
+    # --- QUERY ---
+    def query(self, source, target, with_path=False):
+        """
+        Jarak terpendek source -> target (indeks integer).
+        Mengembalikan (jarak, visited) atau (jarak, visited, path) jika with_path.
+        """
+        if source == target:
+            return (0, 1, [source]) if with_path else (0, 1)
+
+        inf = float('inf')
+        dist = ({source: 0}, {target: 0})
+        parent = ({source: (-1, -1)}, {target: (-1, -1)})  # node -> (node sebelumnya, indeks edge)
+        pqs = ([(0, source)], [(0, target)])
+        graphs = (self.up, self.down)
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        mu = inf
+        meet = -1
+        visited_count = 0
+
+        while True:
+            # Pilih sisi yang masih punya frontier < mu (minimum terkecil dulu)
+            top0 = pqs[0][0][0] if pqs[0] else inf
+            top1 = pqs[1][0][0] if pqs[1] else inf
+            if top0 >= mu and top1 >= mu:
+                break
+            side = 0 if top0 <= top1 else 1
+
+            pq, d_this, d_other = pqs[side], dist[side], dist[1 - side]
+            offsets, targets, weights, _ = graphs[side]
+            par = parent[side]
+
+            curr_dist, u = heappop(pq)
+            if curr_dist > d_this[u]:
+                continue
+
+            visited_count += 1
+
+            other = d_other.get(u)
+            if other is not None and curr_dist + other < mu:
+                mu = curr_dist + other
+                meet = u
+
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                new_dist = curr_dist + weights[i]
+                if new_dist < d_this.get(v, inf):
+                    d_this[v] = new_dist
+                    par[v] = (u, i)
+                    heappush(pq, (new_dist, v))
+
+        if not with_path:
+            return mu, visited_count
+        if meet < 0:
+            return mu, visited_count, []
+
+        # Rantai maju s -> meet (edge UP) dan mundur meet -> t (edge DOWN)
+        path = [meet]
+        node = meet
+        while parent[0][node][0] != -1:
+            prev, i = parent[0][node]
+            path[:0] = self._unpack_edge(prev, node, self.up[3][i])[:-1]
+            node = prev
+        node = meet
+        while parent[1][node][0] != -1:
+            nxt, i = parent[1][node]
+            path.extend(self._unpack_edge(node, nxt, self.down[3][i])[1:])
+            node = nxt
+        return mu, visited_count, path
+
+    # --- UNPACKING SHORTCUT ---
+    def _find_mid(self, graph, at, other):
+        """Node tengah edge terpendek di graph[at] yang menuju/berasal dari 'other'."""
+        offsets, targets, weights, mids = graph
+        best_w, best_mid = float('inf'), -1
+        for i in range(offsets[at], offsets[at + 1]):
+            if targets[i] == other and weights[i] < best_w:
+                best_w, best_mid = weights[i], mids[i]
+        return best_mid
+
+    def _unpack_edge(self, a, b, mid):
+        """Ekspansi edge overlay a -> b menjadi urutan node jalan asli [a, ..., b]."""
+        out = [a]
+        stack = [(a, b, mid)]
+        while stack:
+            a, b, mid = stack.pop()
+            if mid < 0:
+                out.append(b)
+                continue
+            # a -> mid : rank[mid] < rank[a]  -> tersimpan di DOWN[mid] dengan target a
+            # mid -> b : rank[b] > rank[mid]  -> tersimpan di UP[mid] dengan target b
+            mid_a = self._find_mid(self.down, mid, a)
+            mid_b = self._find_mid(self.up, mid, b)
+            stack.append((mid, b, mid_b))
+            stack.append((a, mid, mid_a))
+        return out
+
+
+# --- PREPROCESSING ---
+def _witness_search(out, contracted, source, skip, max_cost, targets):
+    """
+    Dijkstra terbatas dari source di graf sisa (tanpa 'skip' dan node yang
+    sudah dikontraksi). Berhenti saat melewati max_cost, semua target settle,
+    atau batas settle tercapai. Mengembalikan dict jarak.
+    """
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    remaining = set(targets)
+    settled = 0
+    while pq and remaining:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if d > max_cost:
+            break
+        remaining.discard(u)
+        settled += 1
+        if settled > WITNESS_SETTLE_LIMIT:
+            break
+        for v, (w, _) in out[u].items():
+            if v == skip or contracted[v]:
+                continue
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def _shortcuts_for(out, inn, contracted, v):
+    """Daftar shortcut (u, w, biaya) yang dibutuhkan jika v dikontraksi."""
+    result = []
+    outs = [(w, c) for w, (c, _) in out[v].items() if not contracted[w]]
+    if not outs:
+        return result
+    for u, (c_uv, _) in inn[v].items():
+        if contracted[u]:
+            continue
+        targets = [w for w, _ in outs if w != u]
+        if not targets:
+            continue
+        max_cost = c_uv + max(c for w, c in outs if w != u)
+        dist = _witness_search(out, contracted, u, v, max_cost, targets)
+        for w, c_vw in outs:
+            if w == u:
+                continue
+            cost = c_uv + c_vw
+            if dist.get(w, float('inf')) > cost:
+                result.append((u, w, cost))
+    return result
+
+
+def _priority(out, inn, contracted, deleted, v):
+    shortcuts = _shortcuts_for(out, inn, contracted, v)
+    degree = sum(1 for u in inn[v] if not contracted[u]) + sum(1 for w in out[v] if not contracted[w])
+    return len(shortcuts) - degree + deleted[v], shortcuts
+
+
+def build_ch(csr, source_hash='', verbose=True):
+    """Bangun CHGraph dari CSRGraph."""
+    n = csr.num_nodes
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+
+    # Adjacency dinamis: out[u][v] = (bobot, node_tengah); hanya edge termurah per pasangan
+    out = [dict() for _ in range(n)]
+    inn = [dict() for _ in range(n)]
+    for u in range(n):
+        for i in range(offsets[u], offsets[u + 1]):
+            v, w = targets[i], weights[i]
+            if v == u:
+                continue
+            if v not in out[u] or w < out[u][v][0]:
+                out[u][v] = (w, -1)
+                inn[v][u] = (w, -1)
+
+    contracted = bytearray(n)
+    deleted = [0] * n
+    rank = array('i', bytes(4 * n))
+
+    pq = []
+    for v in range(n):
+        prio, _ = _priority(out, inn, contracted, deleted, v)
+        pq.append((prio, v))
+    heapq.heapify(pq)
+
+    up_edges = [[] for _ in range(n)]     # up_edges[a]   = [(b, w, mid)], rank b > rank a
+    down_edges = [[] for _ in range(n)]   # down_edges[b] = [(a, w, mid)], rank a > rank b
+
+    order = 0
+    t0 = time.perf_counter()
+    while pq:
+        _, v = heapq.heappop(pq)
+        if contracted[v]:
+            continue
+        # Lazy update: hitung ulang prioritas, kembalikan ke heap jika bukan lagi minimum
+        prio, shortcuts = _priority(out, inn, contracted, deleted, v)
+        if pq and prio > pq[0][0]:
+            heapq.heappush(pq, (prio, v))
+            continue
+
+        # Edge yang tersisa saat v dikontraksi menuju node dengan rank lebih tinggi
+        for w, (c, mid) in out[v].items():
+            if not contracted[w]:
+                up_edges[v].append((w, c, mid))
+        for u, (c, mid) in inn[v].items():
+            if not contracted[u]:
+                down_edges[v].append((u, c, mid))
+
+        for u, w, cost in shortcuts:
+            if w not in out[u] or cost < out[u][w][0]:
+                out[u][w] = (cost, v)
+                inn[w][u] = (cost, v)
+
+        contracted[v] = 1
+        rank[v] = order
+        order += 1
+        for nb in list(out[v]) + list(inn[v]):
+            if not contracted[nb]:
+                deleted[nb] += 1
+
+        if verbose and order % 1000 == 0:
+            print(f"  [CH] {order}/{n} node dikontraksi ({time.perf_counter() - t0:.1f} s)")
+
+    return CHGraph(rank, _to_csr(up_edges), _to_csr(down_edges), source_hash)
+
+
+def _to_csr(edges):
+    offsets = array('q', [0])
+    targets, weights, mids = array('i'), array('d'), array('i')
+    for lst in edges:
+        for b, w, mid in lst:
+            targets.append(b)
+            weights.append(w)
+            mids.append(mid)
+        offsets.append(len(targets))
+    return offsets, targets, weights, mids
+
+
+# --- PERSISTENSI (.ch) ---
+def _pad8(raw):
+    return raw.ljust(8 * ((len(raw) + 7) // 8), b'\0')
+
+
+def save_ch(ch, path):
+    path = Path(path)
+    cols = [array('i', ch.rank)]
+    for g in (ch.up, ch.down):
+        cols += [array('q', g[0]), array('i', g[1]), array('d', g[2]), array('i', g[3])]
+    if sys.byteorder != 'little':
+        for col in cols:
+            col.byteswap()
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        header = CH_HEADER.pack(CH_MAGIC, CH_VERSION, ch.num_nodes, len(ch.up[1]), len(ch.down[1]),
+                                ch.source_hash.encode('ascii')[:40])
+        f.write(header.ljust(CH_HEADER_SIZE, b'\0'))
+        for col in cols:
+            f.write(_pad8(col.tobytes()))
+    tmp.replace(path)
+
+
+def open_ch(path):
+    """Buka file .ch via mmap (zero-copy). None jika tidak ada / versi berbeda."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        raw = f.read(CH_HEADER.size)
+        if len(raw) < CH_HEADER.size:
+            return None
+        magic, version, n, e_up, e_dn, h = CH_HEADER.unpack(raw)
+        if magic != CH_MAGIC or version != CH_VERSION:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mm)
+    pos = CH_HEADER_SIZE
+
+    def take(code, count):
+        nonlocal pos
+        size = count * array(code).itemsize
+        chunk = view[pos:pos + size]
+        pos += 8 * ((size + 7) // 8)
+        if sys.byteorder == 'little':
+            return chunk.cast(code)
+        col = array(code, chunk.tobytes())
+        col.byteswap()
+        return col
+
+    rank = take('i', n)
+    up = (take('q', n + 1), take('i', e_up), take('d', e_up), take('i', e_up))
+    down = (take('q', n + 1), take('i', e_dn), take('d', e_dn), take('i', e_dn))
+    ch = CHGraph(rank, up, down, h.rstrip(b'\0').decode('ascii'))
+    ch._mmap = mm
+    return ch
+
+
+def load_or_build(csr, path, source_hash=''):
+    """Buka .ch jika cocok dengan graf, jika tidak bangun lalu simpan."""
+    ch = open_ch(path)
+    if ch is not None and ch.num_nodes == csr.num_nodes and ch.source_hash == source_hash:
+        return ch
+    ch = build_ch(csr, source_hash)
+    save_ch(ch, path)
+    return open_ch(path)
+
+
+# --- BUILD + VERIFIKASI ---
+def build_and_verify(instance_path, n_checks):
+    from instance_io import load_instance_csr, ch_path_for
+    from routing import one_to_many
+
+    inst, csr = load_instance_csr(instance_path)
+    path = ch_path_for(instance_path, inst)
+
+    print("=== CONTRACTION HIERARCHIES ===")
+    t0 = time.perf_counter()
+    ch = build_ch(csr, inst.get('graph_hash', ''))
+    t_build = time.perf_counter() - t0
+    save_ch(ch, path)
+    ch = open_ch(path)
+
+    print(f"  Waktu build     : {t_build:.2f} s")
+    print(f"  Edge overlay    : {ch.num_edges:,} (shortcut {ch.num_shortcuts():,}, graf asli {csr.num_edges:,})")
+    print(f"  Ukuran file     : {Path(path).stat().st_size / 1024:.1f} KB ({path})")
+
+    # Verifikasi terhadap Dijkstra heap biasa pada pasangan acak
+    rnd = random.Random(7)
+    errors = 0
+    t_ch = t_dij = 0.0
+    vis_ch = vis_dij = 0
+    for _ in range(n_checks):
+        s, t = rnd.randrange(csr.num_nodes), rnd.randrange(csr.num_nodes)
+        t0 = time.perf_counter()
+        d_ch, v_ch, path_nodes = ch.query(s, t, with_path=True)
+        t1 = time.perf_counter()
+        (d_ref,), v_ref = one_to_many(csr, s, [t])
+        t2 = time.perf_counter()
+        t_ch += t1 - t0
+        t_dij += t2 - t1
+        vis_ch += v_ch
+        vis_dij += v_ref
+
+        ok = d_ch == d_ref or abs(d_ch - d_ref) <= 1e-9 * max(1.0, d_ref)
+        if ok and path_nodes:
+            # Jalur hasil unpacking harus berupa edge asli dengan total biaya yang sama
+            cost = 0.0
+            for a, b in zip(path_nodes, path_nodes[1:]):
+                cost += min((w for v, w in csr.neighbors(a) if v == b), default=float('inf'))
+            ok = path_nodes[0] == s and path_nodes[-1] == t and abs(cost - d_ref) <= 1e-6 * max(1.0, d_ref)
+        if not ok:
+            errors += 1
+            print(f"[ERROR] {csr.to_osm(s)} -> {csr.to_osm(t)}: CH {d_ch} vs Dijkstra {d_ref}")
+
+    print(f"  Verifikasi      : {n_checks - errors}/{n_checks} pasangan acak cocok dengan Dijkstra heap")
+    if n_checks:
+        print(f"  Rata-rata query : CH {t_ch / n_checks * 1000:.3f} ms (visited {vis_ch / n_checks:.0f}) | "
+              f"Dijkstra {t_dij / n_checks * 1000:.3f} ms (visited {vis_dij / n_checks:.0f})")
+    return errors == 0
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Bangun Contraction Hierarchies + verifikasi')
+    p.add_argument('--instance', required=True, help='File instance/query yang merujuk graf')
+    p.add_argument('--verify', type=int, default=200, help='Jumlah pasangan acak untuk verifikasi')
+    args = p.parse_args()
+
+    sys.exit(0 if build_and_verify(args.instance, args.verify) else 1)
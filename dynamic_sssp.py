@@ -0,0 +1,326 @@
+import argparse
+import heapq
+import json
+import math
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from graph_csr import CSRGraph
+from routing import INF, dijkstra
+
+# --- UPDATE BOBOT LIVE + REPAIR SHORTEST-PATH TREE (DYNAMIC SSSP) ---
+# Waktu tempuh berubah sepanjang hari. Daripada membuat ulang instance dan
+# menjalankan Dijkstra dari nol, bobot edge diubah langsung pada graf yang
+# sudah dimuat (LiveGraph) lalu setiap SPT lengkap diperbaiki:
+#   kenaikan edge pohon (u->v, pred[v] == u) : subtree v kehilangan jalurnya ->
+#       jaraknya di-reset, lalu diisi ulang dari tetangga masuk di luar subtree
+#   penurunan edge (u->v)                    : relaksasi dist[u] + w baru ke v
+#   kenaikan edge non-pohon                  : tidak mengubah jarak apa pun
+# Node yang berubah dipropagasi dengan Dijkstra multi-sumber, sehingga biaya
+# repair sebanding dengan wilayah terdampak, bukan ukuran graf. Jika subtree
+# yang di-reset terlalu besar, Dijkstra dari nol lebih murah dan dipakai sebagai gantinya.
+
+# Batas subtree terdampak (fraksi V) sebelum repair beralih ke hitung ulang penuh
+RECOMPUTE_FRACTION = 0.4
+
+
+class LiveGraph(CSRGraph):
+    """
+    CSRGraph dengan bobot yang bisa diubah. Offsets/targets/ID/koordinat dipakai
+    bersama graf asal (mmap); hanya bobot yang disalin. `key` berubah setiap
+    update agar cache tidak mencampur SPT sebelum dan sesudah perubahan.
+    """
+
+    def __init__(self, csr, base_key):
+        super().__init__(csr.offsets, csr.targets, array('d', csr.weights), csr.node_ids, csr.xs, csr.ys)
+        self.base_key = base_key
+        self.version = 0
+        self._in_edges = None
+
+    @property
+    def key(self):
+        return self.base_key if self.version == 0 else f"{self.base_key}@{self.version}"
+
+    def edge_index(self, u, v):
+        """Posisi edge u -> v (indeks node) di buffer CSR. ValueError jika tidak ada."""
+        targets = self.targets
+        for i in range(self.offsets[u], self.offsets[u + 1]):
+            if targets[i] == v:
+                return i
+        raise ValueError(f"edge {self.to_osm(u)} -> {self.to_osm(v)} tidak ada di graf")
+
+    def in_edges(self):
+        """(rev_offsets, rev_edges, edge_src): edge masuk tiap node sebagai indeks edge maju, dibangun sekali."""
+        if self._in_edges is not None:
+            return self._in_edges
+        V, E = self.num_nodes, self.num_edges
+        offsets, targets = self.offsets, self.targets
+
+        edge_src = array('i', bytes(4 * E))
+        rev_offsets = array('q', bytes(8 * (V + 1)))
+        for u in range(V):
+            for i in range(offsets[u], offsets[u + 1]):
+                edge_src[i] = u
+                rev_offsets[targets[i] + 1] += 1
+        for u in range(V):
+            rev_offsets[u + 1] += rev_offsets[u]
+
+        fill = array('q', rev_offsets[:V])
+        rev_edges = array('i', bytes(4 * E))
+        for i in range(E):
+            v = targets[i]
+            rev_edges[fill[v]] = i
+            fill[v] += 1
+        self._in_edges = (rev_offsets, rev_edges, edge_src)
+        return self._in_edges
+
+    def update(self, changes):
+        """
+        Terapkan batch perubahan [(u, v, bobot baru)] (indeks node). Edge yang
+        muncul berkali-kali memakai nilai terakhir. Mengembalikan list
+        (u, v, bobot lama, bobot baru) untuk edge yang benar-benar berubah.
+        """
+        latest = {}
+        for u, v, w in changes:
+            if not (isinstance(w, (int, float)) and math.isfinite(w) and w >= 0):
+                raise ValueError(f"bobot {w!r} untuk edge {self.to_osm(u)} -> {self.to_osm(v)} harus finite >= 0")
+            latest[self.edge_index(u, v)] = (u, v, float(w))
+
+        applied = []
+        weights = self.weights
+        for i, (u, v, w) in latest.items():
+            if weights[i] != w:
+                applied.append((u, v, weights[i], w))
+                weights[i] = w
+        if applied:
+            self.version += 1
+            self._reverse = None  # graf transpos (bidirectional) dibangun ulang dari bobot baru
+        return applied
+
+
+def build_children(pred):
+    """List anak per node dari array predecessor."""
+    children = [[] for _ in range(len(pred))]
+    for v, p in enumerate(pred):
+        if p != -1:
+            children[p].append(v)
+    return children
+
+
+def repair(live, spt, changes):
+    """
+    Perbaiki SPT lengkap (dengan predecessor) setelah live.update(changes).
+    Mengembalikan {'affected': node subtree yang di-reset, 'settled': node yang
+    diproses ulang, 'recomputed': True jika beralih ke Dijkstra dari nol}.
+    Jarak hasil repair identik dengan Dijkstra dari nol.
+    """
+    if spt.pred is None or spt.frontier is None or spt.frontier:
+        raise ValueError("Repair butuh SPT lengkap dengan predecessor (dijkstra(..., with_pred=True))")
+    dist, pred = spt.dist, spt.pred
+    if spt.children is None:
+        spt.children = build_children(pred)
+    children = spt.children
+    offsets, targets, weights = live.offsets, live.targets, live.weights
+    heappush, heappop = heapq.heappush, heapq.heappop
+    heap = []
+
+    # 1. Kenaikan pada edge pohon -> seluruh subtree v kehilangan jalur lamanya
+    affected = set()
+    for u, v, old, new in changes:
+        if new > old and pred[v] == u and v not in affected:
+            stack = [v]
+            while stack:
+                x = stack.pop()
+                affected.add(x)
+                stack.extend(children[x])
+    if len(affected) > RECOMPUTE_FRACTION * len(dist):
+        fresh = dijkstra(live, spt.source, with_pred=True)
+        dist[:], pred[:] = fresh.dist, fresh.pred
+        spt.children = None
+        return {'affected': len(affected), 'settled': fresh.visited, 'recomputed': True}
+    for x in affected:
+        p = pred[x]
+        if p != -1 and p not in affected:
+            children[p].remove(x)
+    for x in affected:
+        dist[x] = INF
+        pred[x] = -1
+        children[x] = []
+
+    # 2. Isi ulang subtree dari tetangga masuk yang jaraknya masih valid
+    if affected:
+        rev_offsets, rev_edges, edge_src = live.in_edges()
+        for x in affected:
+            best, parent = INF, -1
+            for j in range(rev_offsets[x], rev_offsets[x + 1]):
+                i = rev_edges[j]
+                p = edge_src[i]
+                if p in affected:
+                    continue
+                d = dist[p] + weights[i]
+                if d < best:
+                    best, parent = d, p
+            if parent != -1:
+                dist[x] = best
+                pred[x] = parent
+                children[parent].append(x)
+                heappush(heap, (best, x))
+
+    # 3. Penurunan -> relaksasi langsung
+    for u, v, old, new in changes:
+        if new < old:
+            d = dist[u] + new
+            if d < dist[v]:
+                p = pred[v]
+                if p != -1:
+                    children[p].remove(v)
+                dist[v] = d
+                pred[v] = u
+                children[u].append(v)
+                heappush(heap, (d, v))
+
+    # 4. Propagasi Dijkstra dari semua node yang berubah
+    settled = 0
+    while heap:
+        d, x = heappop(heap)
+        if d > dist[x]:
+            continue
+        settled += 1
+        for i in range(offsets[x], offsets[x + 1]):
+            y = targets[i]
+            nd = d + weights[i]
+            if nd < dist[y]:
+                p = pred[y]
+                if p != -1:
+                    children[p].remove(y)
+                dist[y] = nd
+                pred[y] = x
+                children[x].append(y)
+                heappush(heap, (nd, y))
+
+    return {'affected': len(affected), 'settled': settled, 'recomputed': False}
+
+
+def load_updates(path, live):
+    """
+    File JSON [[u_osm, v_osm, bobot], ...] -> list perubahan berindeks untuk live.update().
+    ValueError jika baris tidak berformat [u, v, bobot] atau node tidak ada di graf.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    changes = []
+    for row in rows:
+        if not isinstance(row, (list, tuple)) or len(row) != 3:
+            raise ValueError(f"baris update {row!r} harus berformat [u, v, bobot]")
+        u, v, w = row
+        iu, iv = live.find(u), live.find(v)
+        if iu is None or iv is None:
+            raise ValueError(f"node {u if iu is None else v} di file update tidak ada di graf")
+        changes.append((iu, iv, w))
+    return changes
+
+
+# --- BENCHMARK: REPAIR vs HITUNG ULANG PENUH ---
+def benchmark(instance_path, n_sources, rounds, n_edges, seed):
+    from instance_io import load_instance_csr
+    from spt_cache import cache_key
+
+    inst, csr = load_instance_csr(instance_path)
+    live = LiveGraph(csr, cache_key(inst))
+    V, E = live.num_nodes, live.num_edges
+    rnd = random.Random(seed)
+    sources = rnd.sample(range(V), min(n_sources, V))
+    trees = [dijkstra(live, s, with_pred=True) for s in sources]
+    base = array('d', csr.weights)
+    edge_src = live.in_edges()[2]
+    congested = {}
+
+    print(f"=== DYNAMIC SSSP: {len(sources)} SPT, {rounds} batch x {n_edges} edge macet "
+          f"({Path(instance_path).name}, V={V:,}, E={E:,}) ===")
+    t_repair = t_full = 0.0
+    affected = settled = recomputed = mismatch = 0
+    for _ in range(rounds):
+        # Separuh edge yang macet pulih (penurunan), lalu edge acak baru macet (kenaikan 1.5-4x)
+        changes = []
+        for i in rnd.sample(sorted(congested), len(congested) // 2):
+            changes.append((edge_src[i], live.targets[i], base[i]))
+            del congested[i]
+        for i in rnd.sample(range(E), n_edges):
+            changes.append((edge_src[i], live.targets[i], base[i] * rnd.uniform(1.5, 4.0)))
+            congested[i] = True
+        applied = live.update(changes)
+
+        t0 = time.perf_counter()
+        for spt in trees:
+            stats = repair(live, spt, applied)
+            affected += stats['affected']
+            settled += stats['settled']
+            recomputed += stats['recomputed']
+        t_repair += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fresh = [dijkstra(live, s).dist for s in sources]
+        t_full += time.perf_counter() - t0
+        mismatch += sum(1 for spt, dist in zip(trees, fresh) for a, b in zip(spt.dist, dist) if a != b)
+
+    n = rounds * len(sources)
+    print(f"Hitung ulang penuh : {t_full * 1000.0:9.2f} ms  ({t_full * 1000.0 / n:.3f} ms per SPT)")
+    print(f"Repair inkremental : {t_repair * 1000.0:9.2f} ms  ({t_repair * 1000.0 / n:.3f} ms per SPT, "
+          f"speedup {t_full / t_repair if t_repair > 0 else 0:.1f}x)")
+    print(f"[INFO] Rata-rata per SPT per batch: {affected / n:.1f} node subtree di-reset, "
+          f"{settled / n:.1f} node diproses ulang (dari {V:,}); {recomputed} kali beralih ke hitung ulang penuh")
+    if mismatch:
+        print(f"[ERROR] {mismatch} jarak berbeda dari Dijkstra dari nol!")
+        return 1
+    print("[SUKSES] Semua jarak hasil repair identik dengan Dijkstra dari nol.")
+    return 0
+
+
+def apply_file(instance_path, updates_path):
+    """Terapkan file update ke graf instance, repair SPT dari start, cetak jarak sebelum/sesudah."""
+    from instance_io import load_instance_csr
+    from spt_cache import cache_key
+
+    inst, csr = load_instance_csr(instance_path)
+    live = LiveGraph(csr, cache_key(inst))
+    s, t = live.to_index(inst['meta']['start_node']), live.to_index(inst['meta']['end_node'])
+    spt = dijkstra(live, s, with_pred=True)
+    before = spt.dist[t]
+
+    try:
+        applied = live.update(load_updates(updates_path, live))
+    except FileNotFoundError:
+        print(f"[ERROR] File {updates_path} tidak ditemukan.")
+        return 1
+    except json.JSONDecodeError:
+        print(f"[ERROR] File {updates_path} bukan JSON yang valid.")
+        return 1
+    except ValueError as e:  # node/edge tidak ada di graf, bobot tidak valid
+        print(f"[ERROR] {e}")
+        return 1
+    t0 = time.perf_counter()
+    stats = repair(live, spt, applied)
+    ms = (time.perf_counter() - t0) * 1000.0
+    print(f"[INFO] {len(applied)} edge berubah -> graf {live.key}")
+    mode = 'hitung ulang penuh' if stats['recomputed'] else 'repair'
+    print(f"[INFO] {mode} {ms:.3f} ms: {stats['affected']} node di-reset, {stats['settled']} node diproses ulang")
+    print(f"Jarak {inst['meta']['start_node']} -> {inst['meta']['end_node']}: {before} -> {spt.dist[t]}")
+    return 0
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Update bobot edge live + repair shortest-path tree')
+    p.add_argument('--instance', default='data/solo_route_G01.json', help='File instance (menentukan graf)')
+    p.add_argument('--updates', metavar='FILE', help='Terapkan file JSON [[u, v, bobot], ...] lalu repair')
+    p.add_argument('--sources', type=int, default=10, help='Jumlah SPT yang dipelihara (benchmark)')
+    p.add_argument('--rounds', type=int, default=20, help='Jumlah batch update (benchmark)')
+    p.add_argument('--edges', type=int, default=20, help='Jumlah edge macet baru per batch (benchmark)')
+    p.add_argument('--seed', type=int, default=42)
+    args = p.parse_args()
+
+    if args.updates:
+        sys.exit(apply_file(args.instance, args.updates))
+    sys.exit(benchmark(args.instance, args.sources, args.rounds, args.edges, args.seed))
@@ -1,100 +1,166 @@
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen, tanpa jendela (aman di worker proses)
+import argparse
+import hashlib
 import json
-import heapq
-import matplotlib.pyplot as plt
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import time
+from instance_io import load_instance_csr
+from map_render import get_renderer, path_coords
+from spt_cache import SPTCache, cache_key
 
 # Setup Folder
 DATA_DIR = Path('data')
 RESULTS_DIR = Path('results')
-RESULTS_DIR.mkdir(exist_ok=True)
-
-# --- FUNGSI DIJKSTRA (Copy-paste agar mandiri) ---
-def get_dijkstra_path(graph, start, end):
-    distances = {node: float('inf') for node in graph}
-    distances[start] = 0
-    pq = [(0, start)]
-    predecessors = {node: None for node in graph} 
-    
-    while pq:
-        curr_dist, curr_node = heapq.heappop(pq)
-        if curr_node == end: break
-        if curr_dist > distances.get(curr_node, float('inf')): continue
-            
-        for neighbor, weight in graph.get(curr_node, {}).items():
-            new_dist = curr_dist + weight
-            if neighbor not in distances: distances[neighbor] = float('inf')
-            if new_dist < distances[neighbor]:
-                distances[neighbor] = new_dist
-                predecessors[neighbor] = curr_node
-                heapq.heappush(pq, (new_dist, neighbor))
-    
-    path = []
-    curr = end
-    if distances.get(end) == float('inf'): return []
-    while curr is not None:
-        path.append(curr)
-        curr = predecessors.get(curr)
-    return path[::-1]
+
+# Parameter gambar (background jalan dirender sekali per peta, lalu di-cache)
+RENDER_PARAMS = {'figsize': (8, 8), 'dpi': 100, 'color': '#e0e0e0', 'linewidth': 0.5}
+# Naikkan jika cara menggambar berubah -> semua gambar dianggap kedaluwarsa
+RENDER_VERSION = 1
+
+# --- BUILD INKREMENTAL ---
+# Setiap gambar punya dua hash:
+#   hash instance : sha1 isi file query JSON (memuat hash graf, atau graf itu
+#                   sendiri untuk format lama) -> kunci jalur di sidecar
+#   hash render   : hash instance + RENDER_PARAMS + RENDER_VERSION -> kunci gambar
+# Manifest (results/images_manifest.json) mencatat hash render tiap PNG; gambar
+# yang hash-nya sama dan file-nya masih ada tidak dirender ulang.
+MANIFEST_NAME = 'images_manifest.json'
+
+
+def instance_hash(json_path):
+    with open(json_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def render_hash(inst_hash):
+    raw = json.dumps([inst_hash, RENDER_PARAMS, RENDER_VERSION], sort_keys=True).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _read_json(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+# Cache SPT per proses: instance dengan sumber sama me-resume pencarian sebelumnya
+_SPT_CACHE = SPTCache()
+
+
+# --- RENDER SATU INSTANCE (dijalankan di worker) ---
+def render_job(job):
+    """
+    job = (json_path, output_path, cached_path). cached_path = list OSM ID dari
+    sidecar (None -> jalankan Dijkstra). Mengembalikan (nama, path OSM ID, status).
+    """
+    json_path, output_path, cached_path = job
+    name = Path(json_path).stem
+    data, csr = load_instance_csr(json_path)  # graf bersama di-cache per proses
+    if csr.xs is None:
+        return name, None, 'nocoords'
+
+    if cached_path is None:
+        start_node = csr.to_index(data['meta']['start_node'])
+        end_node = csr.to_index(data['meta']['end_node'])
+        _, path_nodes, _, _ = _SPT_CACHE.path(csr, cache_key(data), start_node, end_node)
+        path_osm = [str(csr.to_osm(u)) for u in path_nodes]
+    else:
+        path_osm = cached_path
+        path_nodes = [csr.to_index(nid) for nid in path_osm]
+
+    # Background per peta (kunci = hash graf; format lama -> per file)
+    map_key = data.get('graph_hash', str(json_path))
+    renderer = get_renderer(map_key, csr, **RENDER_PARAMS)
+    path_x, path_y = path_coords(csr, path_nodes)
+    renderer.render(path_x, path_y, name, output_path)
+    return name, path_osm, 'rendered' if cached_path is None else 'redrawn'
+
 
 # --- GENERATOR GAMBAR MASSAL ---
-def generate_all():
-    json_files = sorted(list(DATA_DIR.glob('*.json')))
-    
+def generate_all(data_dir=DATA_DIR, out_dir=RESULTS_DIR, workers=None, force=False, paths_file=None):
+    json_files = sorted(Path(data_dir).glob('*.json'))
+
     if not json_files:
         print("File data JSON tidak ditemukan!")
         return
 
-    print(f"Mulai membuat gambar untuk {len(json_files)} instance...")
-    print("Mohon bersabar, menggambar peta memakan waktu...")
-    
-    for i, json_path in enumerate(json_files, 1):
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-
-        nodes_coords = data.get('nodes')
-        graph_adj = data.get('graph')
-        start_node = str(data['meta']['start_node'])
-        end_node = str(data['meta']['end_node'])
-        instance_name = json_path.stem # misal: solo_route_G01
-
-        # Hitung Rute
-        path_nodes = get_dijkstra_path(graph_adj, start_node, end_node)
-        
-        # Setup Plot (Tanpa menampilkannya di layar)
-        plt.ioff() # Turn off interactive mode
-        fig, ax = plt.subplots(figsize=(8, 8))
-        
-        # Gambar Background (Jalanan)
-        for u, neighbors in graph_adj.items():
-            if u not in nodes_coords: continue
-            x1, y1 = nodes_coords[u]['x'], nodes_coords[u]['y']
-            for v in neighbors:
-                if v in nodes_coords:
-                    x2, y2 = nodes_coords[v]['x'], nodes_coords[v]['y']
-                    ax.plot([x1, x2], [y1, y2], c='#e0e0e0', linewidth=0.5, zorder=1)
-
-        # Gambar Rute (Merah)
-        if path_nodes:
-            path_x = [nodes_coords[str(n)]['x'] for n in path_nodes if str(n) in nodes_coords]
-            path_y = [nodes_coords[str(n)]['y'] for n in path_nodes if str(n) in nodes_coords]
-            
-            ax.plot(path_x, path_y, c='red', linewidth=2, label='Rute', zorder=2)
-            ax.scatter(path_x[0], path_y[0], c='green', s=100, zorder=3)
-            ax.scatter(path_x[-1], path_y[-1], c='blue', s=100, zorder=3)
-
-        ax.set_title(f"{instance_name}", fontsize=12)
-        ax.axis('off')
-        
-        # Simpan
-        output_path = RESULTS_DIR / f"img_{instance_name}.png"
-        plt.tight_layout()
-        plt.savefig(output_path, dpi=100) # dpi 100 biar tidak terlalu besar filenya
-        plt.close(fig) # Tutup agar memori tidak penuh
-        
-        print(f"[{i}/{len(json_files)}] Disimpan: {output_path.name}")
-
-    print("\n[SELESAI] Semua gambar peta tersimpan di folder 'results/'")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _read_json(manifest_path)
+    sidecar = _read_json(paths_file) if paths_file else {}
+    t0 = time.perf_counter()
+
+    # 1. Tentukan gambar yang perlu dirender ulang
+    jobs, hashes, skipped = [], {}, 0
+    for json_path in json_files:
+        name = json_path.stem # misal: solo_route_G01
+        output_path = out_dir / f"img_{name}.png"
+        inst_h = instance_hash(json_path)
+        rend_h = render_hash(inst_h)
+        hashes[name] = (inst_h, rend_h)
+        entry = sidecar.get(name)
+        cached_path = entry['path'] if entry and entry.get('hash') == inst_h else None
+        # Dengan --paths, gambar tanpa jalur valid di sidecar tetap diproses agar sidecar lengkap
+        up_to_date = output_path.exists() and manifest.get(output_path.name) == rend_h
+        if not force and up_to_date and (not paths_file or cached_path is not None):
+            skipped += 1
+            continue
+        jobs.append((str(json_path), str(output_path), cached_path))
+
+    print(f"[INFO] {len(json_files)} instance: {skipped} gambar up-to-date, {len(jobs)} perlu dirender.")
+    if not jobs:
+        print("[SELESAI] Tidak ada yang perlu dirender.")
+        return
+
+    # 2. Render (paralel; tiap worker membangun background sekali per peta)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers > 1:
+        # Chunk berurutan -> instance pada peta yang sama cenderung jatuh ke worker yang sama
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(render_job, jobs, chunksize=max(1, -(-len(jobs) // workers)))
+            results = list(results)
+    else:
+        results = [render_job(job) for job in jobs]
+
+    # 3. Perbarui manifest + sidecar jalur
+    for i, (name, path_osm, status) in enumerate(results, 1):
+        output_name = f"img_{name}.png"
+        if status == 'nocoords':
+            print(f"[{i}/{len(jobs)}] [WARN] {name} tidak memiliki koordinat, dilewati.")
+            continue
+        inst_h, rend_h = hashes[name]
+        manifest[output_name] = rend_h
+        sidecar[name] = {'hash': inst_h, 'path': path_osm}
+        note = ' (jalur dari sidecar)' if status == 'redrawn' else ''
+        print(f"[{i}/{len(jobs)}] Disimpan: {output_name}{note}")
+
+    _write_json(manifest_path, manifest)
+    if paths_file:
+        _write_json(paths_file, sidecar)
+        print(f"[INFO] Jalur tersimpan di sidecar: {paths_file}")
+
+    print(f"\n[SELESAI] Gambar peta tersimpan di folder '{out_dir}/' "
+          f"({len(jobs)} dirender, {workers} worker, {time.perf_counter() - t0:.1f} detik)")
 
 if __name__ == "__main__":
-    generate_all()
\ No newline at end of file
+    p = argparse.ArgumentParser(description='Render gambar rute untuk semua instance (inkremental)')
+    p.add_argument('--data', default=str(DATA_DIR), help='Folder instance')
+    p.add_argument('--out', default=str(RESULTS_DIR), help='Folder output PNG')
+    p.add_argument('--workers', type=int, default=None, help='Jumlah proses render (default: jumlah core)')
+    p.add_argument('--force', action='store_true', help='Render ulang semua gambar walau up-to-date')
+    p.add_argument('--paths', metavar='FILE',
+                   help='Sidecar JSON jalur hasil Dijkstra (dibaca & diperbarui; pencarian tidak diulang)')
+    args = p.parse_args()
+
+    generate_all(args.data, args.out, args.workers, args.force, args.paths)
@@ -1,8 +1,8 @@
-import osmnx as ox
-import networkx as nx
+import argparse
 import json
 import random
 from pathlib import Path
+from instance_io import save_graph, make_query, build_adjacency
 
 BASE_DIR = Path(__file__).resolve().parent / 'data'
 BASE_DIR.mkdir(exist_ok=True)
@@ -13,10 +13,14 @@ def save_instance(name, data):
         json.dump(data, f, ensure_ascii=False, indent=2)
     print(f"Saved: {p}")
 
-def generate_solo_instances():
-    print("1. Mendownload Peta Solo (Master)...")
-    center_point = (-7.5714, 110.8295) 
-    G_master = ox.graph_from_point(center_point, dist=2000, network_type='drive')
+CENTER_POINT = (-7.5714, 110.8295)
+DIST_M = 2000
+
+def load_master_online():
+    """Download peta via osmnx/Overpass (butuh internet). Mengembalikan (nodes_list, node_coords, adj_list, total_edges)."""
+    import osmnx as ox  # Hanya dibutuhkan untuk mode online
+
+    G_master = ox.graph_from_point(CENTER_POINT, dist=DIST_M, network_type='drive')
     G_master = ox.add_edge_speeds(G_master)
     G_master = ox.add_edge_travel_times(G_master)
     
@@ -27,7 +31,39 @@ def generate_solo_instances():
     for node, data in G_master.nodes(data=True):
         node_coords[node] = {'y': data['y'], 'x': data['x']} # Lat, Lon
     
-    print("2. Membuat 15 Instance Unik dengan Koordinat...")
+    # Adjacency cukup dibangun sekali untuk semua instance. MultiDiGraph bisa
+    # punya edge paralel u->v: simpan yang TERCEPAT, dan semua node (termasuk
+    # yang tanpa edge keluar) muncul eksplisit.
+    edges = ((u, v, data.get('travel_time', data.get('length', 1)))
+             for u, v, data in G_master.edges(data=True))
+    adj_list = build_adjacency(edges, nodes_list)
+    return nodes_list, node_coords, adj_list, sum(len(nbrs) for nbrs in adj_list.values())
+
+def load_master_offline(source):
+    """Bangun peta yang sama dari cache Overpass / ekstrak .osm/.pbf lokal (lihat osm_import.py)."""
+    from osm_import import import_osm
+
+    node_ids, lat, lon, src, dst, weight = import_osm(source, CENTER_POINT, DIST_M)
+    nodes_list = list(node_ids)
+    node_coords = {nid: {'y': lat[i], 'x': lon[i]} for i, nid in enumerate(nodes_list)}
+    edges = ((nodes_list[src[i]], nodes_list[dst[i]], weight[i]) for i in range(len(src)))
+    adj_list = build_adjacency(edges, nodes_list)
+    # Hitung edge SETELAH edge paralel digabung (sama seperti mode online & graf yang dimuat)
+    return nodes_list, node_coords, adj_list, sum(len(nbrs) for nbrs in adj_list.values())
+
+def generate_solo_instances(source=None):
+    if source:
+        print(f"1. Membangun Peta Solo (Master) secara offline dari {source}...")
+        nodes_list, node_coords, adj_list, total_edges = load_master_offline(source)
+    else:
+        print("1. Mendownload Peta Solo (Master)...")
+        nodes_list, node_coords, adj_list, total_edges = load_master_online()
+
+    # --- GRAF MASTER: disimpan SEKALI di data/graphs/<hash>.json ---
+    graph_h, graph_path = save_graph(BASE_DIR, node_coords, adj_list)
+    print(f"Graf master: {graph_path} (hash {graph_h[:12]})")
+
+    print("2. Membuat 15 Instance Unik (query ringan yang merujuk graf master)...")
     rnd = random.Random(42) 
     
     for i in range(1, 16):
@@ -35,26 +71,21 @@ def generate_solo_instances():
         end = rnd.choice(nodes_list)
         while start == end:
             end = rnd.choice(nodes_list)
-            
-        adj_list = {}
-        for u, v, data in G_master.edges(data=True):
-            if u not in adj_list: adj_list[u] = {}
-            weight = data.get('travel_time', data.get('length', 1))
-            adj_list[u][v] = weight
-
-        instance_data = {
-            "project": "shortest_path_solo",
-            "meta": {
-                "start_node": start,
-                "end_node": end,
-                "total_nodes": len(G_master.nodes),
-                "total_edges": len(G_master.edges)
-            },
-            "nodes": node_coords, # <--- DATA BARU UNTUK VISUALISASI
-            "graph": adj_list
+
+        name = f'solo_route_G{i:02d}.json'
+        meta = {
+            "start_node": start,
+            "end_node": end,
+            "total_nodes": len(nodes_list),
+            "total_edges": total_edges
         }
+        instance_data = make_query("shortest_path_solo", graph_h, graph_path, BASE_DIR / name, meta)
         
-        save_instance(f'solo_route_G{i:02d}.json', instance_data)
+        save_instance(name, instance_data)
 
 if __name__ == "__main__":
-    generate_solo_instances()
\ No newline at end of file
+    p = argparse.ArgumentParser(description='Buat graf master Solo + 15 instance query')
+    p.add_argument('--offline', metavar='SOURCE',
+                   help='Tanpa internet: cache Overpass (cache/<hash>.json) atau ekstrak .osm/.pbf')
+    args = p.parse_args()
+    generate_solo_instances(args.offline)
\ No newline at end of file
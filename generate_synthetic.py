@@ -0,0 +1,313 @@
+import argparse
+import hashlib
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+
+from graph_csr import write_binary
+from instance_io import GRAPH_SUBDIR, save_graph, make_query
+
+# --- GENERATOR GRAF JALAN SINTETIS (OFFLINE) ---
+# Menghasilkan graf mirip jaringan jalan dari 1k sampai 10M node tanpa osmnx /
+# koneksi internet, agar kurva waktu vs V benar-benar diukur pada V yang berbeda.
+#
+# Topologi:
+#   grid      : kisi persegi dengan posisi node digeser acak (jitter), sebagian
+#               ruas dihapus, sebagian satu arah.
+#   delaunay  : kisi yang sama tetapi tiap sel dibagi dua segitiga lewat diagonal
+#               TERPENDEK (kriteria flip Delaunay lokal) -> triangulasi planar
+#               mirip Delaunay (derajat ~6 sebelum penipisan).
+#   geometric : random geometric graph, titik uniform + edge antar titik
+#               berjarak <= r (r dipilih dari target derajat rata-rata).
+#
+# Keterhubungan kuat dijamin oleh "backbone" dua arah yang tidak pernah dihapus
+# atau dibuat satu arah: spanning tree acak ala binary-tree maze pada kisi
+# (grid/delaunay) atau rantai titik berurutan serpentine per sel (geometric).
+#
+# Bobot = travel_time (detik) seperti osmnx: panjang ruas (jarak lurus x faktor
+# kelokan) / kecepatan kelas jalan. Koordinat lat/lon di sekitar pusat peta Solo.
+#
+# Output per graf: data/synthetic/graphs/<hash>.json (format instance biasa) atau
+# langsung <hash>.bin (format biner graph_csr, untuk graf besar; hanya engine csr),
+# plus file query ringan <topologi>_n<V>_QXX.json yang merujuk graf tersebut.
+
+OUT_DIR = Path(__file__).resolve().parent / 'data' / 'synthetic'
+CENTER = (-7.5714, 110.8295)  # (lat, lon) sama dengan generate_instances.py
+SPACING_M = 100.0              # jarak rata-rata antar simpang (meter)
+METERS_PER_DEG = 111320.0
+
+# Kelas jalan: kecepatan km/jam (indeks = kelas)
+SPEEDS_KMH = np.array([30.0, 40.0, 50.0, 70.0])  # residential, tertiary, secondary, primary
+ARTERIAL_EVERY = 16   # tiap 16 baris/kolom kisi = jalan primer
+SECONDARY_EVERY = 4   # tiap 4 baris/kolom kisi = jalan sekunder
+
+# Default per topologi: (fraksi ruas dihapus, fraksi ruas satu arah)
+DEFAULTS = {
+    'grid': (0.10, 0.15),
+    'delaunay': (0.35, 0.15),
+    'geometric': (0.0, 0.15),
+}
+GEOMETRIC_DEGREE = 4.0
+
+# Di atas ukuran ini format default = biner (dict JSON sebesar itu tidak muat di RAM)
+JSON_MAX_NODES = 200_000
+
+
+# --- TOPOLOGI (semua mengembalikan koordinat meter + edge tak berarah) ---
+def _lattice(n, rng):
+    """Kisi side x side dengan jitter. Mengembalikan (side, x, y) dalam meter."""
+    side = max(2, math.isqrt(n - 1) + 1)
+    r, c = np.divmod(np.arange(side * side, dtype=np.int64), side)
+    jitter = rng.uniform(-0.3, 0.3, size=(2, side * side)) * SPACING_M
+    return side, c * SPACING_M + jitter[0], r * SPACING_M + jitter[1]
+
+
+def _lattice_class(index_along, n_edges):
+    """Kelas jalan untuk ruas di baris/kolom ke-index_along."""
+    cls = np.zeros(n_edges, dtype=np.int8)
+    cls[index_along % SECONDARY_EVERY == 0] = 2
+    cls[index_along % ARTERIAL_EVERY == 0] = 3
+    return cls
+
+
+def _lattice_edges(side, rng):
+    """Ruas horizontal + vertikal kisi, plus backbone binary-tree maze."""
+    ids = np.arange(side * side, dtype=np.int32).reshape(side, side)
+    hu, hv = ids[:, :-1].ravel(), ids[:, 1:].ravel()
+    vu, vv = ids[:-1, :].ravel(), ids[1:, :].ravel()
+    h_cls = _lattice_class(np.repeat(np.arange(side), side - 1), len(hu))
+    v_cls = _lattice_class(np.tile(np.arange(side), side - 1), len(vu))
+
+    # Binary-tree maze: tiap node (r, c) terhubung ke barat ATAU utara (acak);
+    # baris 0 selalu ke barat, kolom 0 selalu ke utara -> spanning tree.
+    go_west = rng.random((side, side)) < 0.5
+    go_west[0, :] = True
+    go_west[:, 0] = False
+    # Ruas horizontal (r, c-1)-(r, c) milik node (r, c); vertikal (r-1, c)-(r, c) milik (r, c)
+    h_back = go_west[:, 1:].ravel()
+    v_back = ~go_west[1:, :].ravel()
+
+    return (np.concatenate([hu, vu]), np.concatenate([hv, vv]),
+            np.concatenate([h_cls, v_cls]), np.concatenate([h_back, v_back]))
+
+
+def topo_grid(n, rng):
+    side, x, y = _lattice(n, rng)
+    u, v, cls, backbone = _lattice_edges(side, rng)
+    return x, y, u, v, cls, backbone
+
+
+def topo_delaunay(n, rng):
+    side, x, y = _lattice(n, rng)
+    u, v, cls, backbone = _lattice_edges(side, rng)
+
+    # Diagonal terpendek per sel (a=kiri-atas, b=kanan-atas, c=kiri-bawah, d=kanan-bawah)
+    ids = np.arange(side * side, dtype=np.int32).reshape(side, side)
+    a, b = ids[:-1, :-1].ravel(), ids[:-1, 1:].ravel()
+    c, d = ids[1:, :-1].ravel(), ids[1:, 1:].ravel()
+    ad = np.hypot(x[a] - x[d], y[a] - y[d])
+    bc = np.hypot(x[b] - x[c], y[b] - y[c])
+    use_ad = ad <= bc
+    du, dv = np.where(use_ad, a, b), np.where(use_ad, d, c)
+
+    return (x, y, np.concatenate([u, du]), np.concatenate([v, dv]),
+            np.concatenate([cls, np.zeros(len(du), dtype=np.int8)]),
+            np.concatenate([backbone, np.zeros(len(du), dtype=bool)]))
+
+
+def topo_geometric(n, rng):
+    side_m = math.sqrt(n) * SPACING_M
+    x = rng.uniform(0, side_m, n)
+    y = rng.uniform(0, side_m, n)
+    radius = SPACING_M * math.sqrt(GEOMETRIC_DEGREE / math.pi)
+
+    # Sel berukuran radius: pasangan kandidat hanya di sel sendiri + 4 sel "setengah" tetangga
+    ncx = int(side_m // radius) + 1
+    cx = np.minimum((x // radius).astype(np.int64), ncx - 1)
+    cy = np.minimum((y // radius).astype(np.int64), ncx - 1)
+    cell = cy * ncx + cx
+    order = np.argsort(cell, kind='stable')
+    count = np.bincount(cell, minlength=ncx * ncx)
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    max_count = int(count.max())
+
+    us, vs = [], []
+
+    def add_pairs(cells_a, slot_a, cells_b, slot_b):
+        p = order[start[cells_a] + slot_a]
+        q = order[start[cells_b] + slot_b]
+        close = np.hypot(x[p] - x[q], y[p] - y[q]) <= radius
+        us.append(p[close].astype(np.int32))
+        vs.append(q[close].astype(np.int32))
+
+    all_cells = np.arange(ncx * ncx, dtype=np.int64)
+    ccx, ccy = all_cells % ncx, all_cells // ncx
+    for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+        valid = (ccx + dx >= 0) & (ccx + dx < ncx) & (ccy + dy < ncx)
+        base = all_cells[valid]
+        other = base + dy * ncx + dx
+        for sa in range(max_count):
+            has_a = count[base] > sa
+            ba, oa = base[has_a], other[has_a]
+            # Di sel yang sama cukup pasangan slot sa < sb
+            for sb in range(sa + 1 if (dx, dy) == (0, 0) else 0, max_count):
+                has_b = count[oa] > sb
+                if not has_b.any():
+                    continue
+                add_pairs(ba[has_b], sa, oa[has_b], sb)
+
+    u, v = np.concatenate(us), np.concatenate(vs)
+    # Kelas jalan acak: 70% residential, 15% tertiary, 10% secondary, 5% primary
+    cls = rng.choice(4, size=len(u), p=[0.70, 0.15, 0.10, 0.05]).astype(np.int8)
+
+    # Backbone: rantai titik berurutan serpentine (baris sel, arah kolom bolak-balik)
+    snake = np.where(cy % 2 == 0, cx, ncx - 1 - cx)
+    chain = np.lexsort((np.where(cy % 2 == 0, x, -x), snake, cy))
+    chain = chain.astype(np.int32)
+    bu, bv = chain[:-1], chain[1:]
+    return (x, y, np.concatenate([u, bu]), np.concatenate([v, bv]),
+            np.concatenate([cls, np.zeros(len(bu), dtype=np.int8)]),
+            np.concatenate([np.zeros(len(u), dtype=bool), np.ones(len(bu), dtype=bool)]))
+
+
+TOPOLOGIES = {
+    'grid': topo_grid,
+    'delaunay': topo_delaunay,
+    'geometric': topo_geometric,
+}
+
+
+# --- GRAF BERARAH + BOBOT ---
+def build_directed(x, y, u, v, cls, backbone, p_delete, p_oneway, rng):
+    """
+    Hapus / jadikan satu arah ruas non-backbone, hitung travel_time, susun CSR (numpy).
+    Indeks node int32 + `del` array perantara agar graf 10M node tetap muat di RAM.
+    """
+    n = len(x)
+    keep = backbone | (rng.random(len(u)) >= p_delete)
+    u, v, cls, backbone = u[keep], v[keep], cls[keep], backbone[keep]
+    del keep
+
+    travel_time = np.hypot(x[u] - x[v], y[u] - y[v])
+    travel_time *= rng.uniform(1.0, 1.25, len(u))        # faktor kelokan ruas
+    travel_time /= SPEEDS_KMH[cls] / 3.6
+    del cls
+
+    oneway = ~backbone & (rng.random(len(u)) < p_oneway)
+    flip = oneway & (rng.random(len(u)) < 0.5)
+    two = ~oneway
+    del backbone, oneway
+    src = np.concatenate([np.where(flip, v, u), v[two]])
+    dst = np.concatenate([np.where(flip, u, v), u[two]])
+    w = np.concatenate([travel_time, travel_time[two]])
+    del u, v, flip, two, travel_time
+
+    # Urutkan (src, dst, w) lalu buang edge paralel kecuali yang termurah
+    order = np.lexsort((w, dst, src))
+    src, dst, w = src[order], dst[order], w[order]
+    del order
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    src, dst, w = src[first], dst[first], w[first]
+
+    offsets = np.zeros(n + 1, dtype='<i8')
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    return offsets, dst.astype('<i4'), w.astype('<f8')
+
+
+def to_latlon(x, y):
+    lat0, lon0 = CENTER
+    lat = lat0 + (y - y.mean()) / METERS_PER_DEG
+    lon = lon0 + (x - x.mean()) / (METERS_PER_DEG * math.cos(math.radians(lat0)))
+    return lon.astype('<f8'), lat.astype('<f8')
+
+
+# --- PENYIMPANAN ---
+def save_json_graph(out_dir, offsets, targets, weights, xs, ys, meta):
+    """Format instance biasa lewat instance_io.save_graph (node ID = indeks)."""
+    n = len(xs)
+    nodes = {i: {'y': float(ys[i]), 'x': float(xs[i])} for i in range(n)}
+    off, tgt, wt = offsets.tolist(), targets.tolist(), weights.tolist()
+    graph = {u: {tgt[i]: wt[i] for i in range(off[u], off[u + 1])} for u in range(n)}
+    return save_graph(out_dir, nodes, graph, meta)
+
+
+def save_bin_graph(out_dir, offsets, targets, weights, xs, ys, meta):
+    """Langsung ke graphs/<hash>.bin (tanpa JSON); hash = SHA-1 semua blok."""
+    n, e = len(xs), len(targets)
+    node_ids = np.arange(n, dtype='<i8')
+    columns = {'offsets': offsets, 'node_ids': node_ids, 'xs': xs, 'ys': ys,
+               'weights': weights, 'targets': targets}
+    sha = hashlib.sha1(f"{n}:{e}".encode('ascii'))
+    for name in ('offsets', 'node_ids', 'xs', 'ys', 'weights', 'targets'):
+        sha.update(memoryview(columns[name]).cast('B'))
+    h = sha.hexdigest()
+
+    graph_dir = Path(out_dir) / GRAPH_SUBDIR
+    graph_dir.mkdir(parents=True, exist_ok=True)
+    write_binary(graph_dir / f"{h}.bin", n, e, columns, h)
+    with open(graph_dir / f"{h}.meta.json", 'w', encoding='utf-8') as f:
+        json.dump({'hash': h, 'meta': meta}, f, indent=2)
+    # Query merujuk <hash>.json seperti biasa; instance_io memakai .bin di sebelahnya
+    return h, graph_dir / f"{h}.json"
+
+
+def generate(topology, n, out_dir=OUT_DIR, seed=42, queries=15, fmt=None,
+             p_delete=None, p_oneway=None):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    d_delete, d_oneway = DEFAULTS[topology]
+    p_delete = d_delete if p_delete is None else p_delete
+    p_oneway = d_oneway if p_oneway is None else p_oneway
+    # Seed per (topologi, n) agar tiap graf deterministik & independen
+    rng = np.random.default_rng([seed, list(TOPOLOGIES).index(topology), n])
+
+    t0 = time.perf_counter()
+    x, y, *edges = TOPOLOGIES[topology](n, rng)
+    offsets, targets, weights = build_directed(x, y, *edges, p_delete, p_oneway, rng)
+    xs, ys = to_latlon(x, y)
+    V, E = len(xs), len(targets)
+    t_build = time.perf_counter() - t0
+
+    fmt = fmt or ('json' if V <= JSON_MAX_NODES else 'bin')
+    meta = {'total_nodes': V, 'total_edges': E,
+            'generator': {'topology': topology, 'n': n, 'seed': seed,
+                          'p_delete': p_delete, 'p_oneway': p_oneway}}
+    saver = save_json_graph if fmt == 'json' else save_bin_graph
+    graph_h, graph_path = saver(out_dir, offsets, targets, weights, xs, ys, meta)
+
+    # Query acak; backbone dua arah menjamin semua pasangan saling terjangkau
+    pairs = rng.integers(0, V, size=(queries * 2, 2))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]][:queries]
+    for i, (s, t) in enumerate(pairs.tolist(), start=1):
+        name = f"{topology}_n{V}_Q{i:02d}.json"
+        query = make_query(f"synthetic_{topology}", graph_h, graph_path, out_dir / name,
+                           {'start_node': s, 'end_node': t, 'total_nodes': V, 'total_edges': E})
+        with open(out_dir / name, 'w', encoding='utf-8') as f:
+            json.dump(query, f, ensure_ascii=False, indent=2)
+
+    print(f"[SUKSES] {topology:<9} V={V:>9} E={E:>10} ({fmt}, {t_build:.1f} s) -> graf {graph_h[:12]}, {len(pairs)} query")
+    return graph_h
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Generator graf jalan sintetis (offline) untuk uji skalabilitas')
+    p.add_argument('--topology', nargs='+', choices=list(TOPOLOGIES), default=['grid'])
+    p.add_argument('--nodes', nargs='+', type=int, default=[1000, 10000, 100000],
+                   help='Perkiraan jumlah node per graf (grid/delaunay dibulatkan ke kuadrat)')
+    p.add_argument('--out', default=str(OUT_DIR), help='Folder output (query + graphs/)')
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--queries', type=int, default=15, help='Jumlah query per graf')
+    p.add_argument('--format', choices=['json', 'bin'],
+                   help=f'Default: json jika V <= {JSON_MAX_NODES}, selain itu bin (engine csr saja)')
+    p.add_argument('--p-delete', type=float, help='Fraksi ruas non-backbone yang dihapus')
+    p.add_argument('--p-oneway', type=float, help='Fraksi ruas non-backbone yang satu arah')
+    args = p.parse_args()
+
+    for topology in args.topology:
+        for n in args.nodes:
+            generate(topology, n, args.out, args.seed, args.queries, args.format,
+                     args.p_delete, args.p_oneway)
@@ -0,0 +1,122 @@
+import math
+from array import array
+
+# --- UTILITAS GEOGRAFIS UNTUK HEURISTIK A* ---
+# Batas bawah waktu tempuh u -> t = jarak haversine(u, t) / kecepatan maksimum.
+# Kecepatan maksimum dihitung dari bobot travel_time di graf itu sendiri:
+#   v_max = max over edge (haversine(u, v) / travel_time(u, v))
+# sehingga untuk SETIAP edge berlaku travel_time >= haversine / v_max. Karena
+# haversine memenuhi ketidaksamaan segitiga, heuristik ini admissible & konsisten.
+
+EARTH_RADIUS_M = 6371008.8
+
+# Toleransi pembulatan float: sedikit memperbesar v_max agar h tidak pernah
+# melebihi biaya sebenarnya akibat error pembulatan.
+SPEED_SAFETY = 1.0 + 1e-9
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Jarak great-circle dalam meter antara dua titik (derajat)."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _edge_speed(dist_m, w):
+    """Kecepatan tersirat sebuah edge (m/s). Edge berbobot 0 dengan panjang > 0 -> inf."""
+    if w > 0:
+        return dist_m / w
+    return math.inf if dist_m > 0 else 0.0
+
+
+def max_speed_adjacency(graph, coords):
+    """v_max (m/s) dari adjacency dict {u: {v: travel_time}} + koordinat {id: {x, y}}."""
+    max_speed = 0.0
+    for u, neighbors in graph.items():
+        cu = coords.get(u)
+        if cu is None:
+            continue
+        for v, w in neighbors.items():
+            cv = coords.get(v)
+            if cv is None:
+                continue
+            max_speed = max(max_speed, _edge_speed(haversine_m(cu['y'], cu['x'], cv['y'], cv['x']), w))
+    return (max_speed or 1.0) * SPEED_SAFETY
+
+
+# Cache v_max untuk graf dict: id(graph) -> (graph, v_max)
+_SPEED_CACHE = {}
+
+
+def cached_max_speed(graph, coords):
+    cached = _SPEED_CACHE.get(id(graph))
+    if cached is not None and cached[0] is graph:
+        return cached[1]
+    speed = max_speed_adjacency(graph, coords)
+    _SPEED_CACHE[id(graph)] = (graph, speed)
+    return speed
+
+
+class GeoIndex:
+    """
+    Koordinat dalam radian + cos(lat) per node (array kontigu) dan v_max graf.
+    Dibangun sekali per graf; heuristik per query hanya membaca array ini.
+    """
+
+    def __init__(self, lat_rad, lon_rad, cos_lat, max_speed):
+        self.lat_rad = lat_rad
+        self.lon_rad = lon_rad
+        self.cos_lat = cos_lat
+        self.max_speed = max_speed
+
+    def heuristic_fn(self, target):
+        """
+        Fungsi h(u) untuk satu target. Dipakai bersama array memo di algoritma,
+        sehingga hanya node yang benar-benar disentuh pencarian yang dihitung.
+        """
+        lat_rad, lon_rad, cos_lat = self.lat_rad, self.lon_rad, self.cos_lat
+        t_lat, t_lon, t_cos = lat_rad[target], lon_rad[target], cos_lat[target]
+        if math.isnan(t_lat) or math.isinf(self.max_speed):
+            return lambda u: 0.0
+
+        scale = 2 * EARTH_RADIUS_M / self.max_speed
+        sin, asin, sqrt, isnan = math.sin, math.asin, math.sqrt, math.isnan
+
+        def h(u):
+            lat = lat_rad[u]
+            if isnan(lat):
+                return 0.0
+            a = sin((t_lat - lat) / 2) ** 2 + cos_lat[u] * t_cos * sin((t_lon - lon_rad[u]) / 2) ** 2
+            return scale * asin(min(1.0, sqrt(a)))
+        return h
+
+
+def build_geo_index(csr):
+    """GeoIndex untuk CSRGraph (membutuhkan csr.xs / csr.ys). Di-cache pada objek csr."""
+    geo = getattr(csr, '_geo', None)
+    if geo is not None:
+        return geo
+    if csr.xs is None:
+        raise ValueError("Graf tidak memiliki koordinat node; A* membutuhkan 'nodes' (x, y)")
+
+    xs, ys = csr.xs, csr.ys
+    lat_rad = array('d', (math.radians(y) for y in ys))
+    lon_rad = array('d', (math.radians(x) for x in xs))
+    cos_lat = array('d', (math.cos(v) for v in lat_rad))
+
+    max_speed = 0.0
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    for u in range(csr.num_nodes):
+        if math.isnan(xs[u]):
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if math.isnan(xs[v]):
+                continue
+            max_speed = max(max_speed, _edge_speed(haversine_m(ys[u], xs[u], ys[v], xs[v]), weights[i]))
+
+    geo = GeoIndex(lat_rad, lon_rad, cos_lat, (max_speed or 1.0) * SPEED_SAFETY)
+    csr._geo = geo
+    return geo
@@ -0,0 +1,295 @@
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any
+
+# --- STRUKTUR GRAF CSR (Compressed Sparse Row) ---
+# Adjacency JSON (dict of dict dengan key string OSM ID) dikonversi SEKALI
+# menjadi tiga buffer kontigu:
+#   offsets[u] .. offsets[u+1]  -> rentang edge milik node u
+#   targets[i]                  -> node tujuan edge ke-i (integer)
+#   weights[i]                  -> bobot edge ke-i (float64)
+# Node diberi indeks 0..V-1 sesuai urutan OSM ID (numerik), sehingga urutan
+# scan linear sama dengan urutan key di file JSON.
+
+
+class CSRGraph:
+    """Graf berindeks integer dalam format CSR + indeks dua arah OSM ID <-> int."""
+
+    def __init__(self, offsets, targets, weights, node_ids, xs=None, ys=None):
+        self.offsets = offsets      # array('q'), panjang V+1
+        self.targets = targets      # array('i'), panjang E
+        self.weights = weights      # array('d'), panjang E
+        self.node_ids = node_ids    # int -> OSM ID (list[str], atau buffer int64 terurut)
+        self.xs = xs                # array('d') longitude (opsional)
+        self.ys = ys                # array('d') latitude (opsional)
+        # OSM ID -> int. Untuk graf hasil mmap (ID int64 terurut) dibiarkan None
+        # dan pencarian memakai binary search, agar tidak ada dict berukuran V.
+        self.index = None
+        if node_ids and isinstance(node_ids[0], str):
+            self.index = {nid: i for i, nid in enumerate(node_ids)}
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def find(self, osm_id):
+        """OSM ID (int/str) -> indeks integer, atau None jika node tidak ada."""
+        if self.index is not None:
+            return self.index.get(str(osm_id))
+        key = int(osm_id)
+        i = bisect_left(self.node_ids, key)
+        if i < len(self.node_ids) and self.node_ids[i] == key:
+            return i
+        return None
+
+    def to_index(self, osm_id):
+        """OSM ID (int/str) -> indeks integer. KeyError jika node tidak ada."""
+        idx = self.find(osm_id)
+        if idx is None:
+            raise KeyError(str(osm_id))
+        return idx
+
+    def to_osm(self, idx):
+        """Indeks integer -> OSM ID (string, sama seperti key di JSON)."""
+        return str(self.node_ids[idx])
+
+    def out_degree(self, u):
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def neighbors(self, u):
+        """Generator (v, weight) untuk semua edge keluar dari u."""
+        targets, weights = self.targets, self.weights
+        for i in range(self.offsets[u], self.offsets[u + 1]):
+            yield targets[i], weights[i]
+
+    def reverse(self):
+        """
+        Graf transpos (semua edge dibalik) dalam format CSR, dibangun sekali lalu
+        di-cache. Dipakai pencarian mundur (bidirectional) dari node tujuan.
+        """
+        rev = getattr(self, '_reverse', None)
+        if rev is not None:
+            return rev
+
+        V, E = self.num_nodes, self.num_edges
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        # Counting sort berdasarkan node tujuan
+        rev_offsets = array('q', bytes(8 * (V + 1)))
+        for i in range(E):
+            rev_offsets[targets[i] + 1] += 1
+        for u in range(V):
+            rev_offsets[u + 1] += rev_offsets[u]
+
+        fill = array('q', rev_offsets[:V])
+        rev_targets = array('i', bytes(4 * E))
+        rev_weights = array('d', bytes(8 * E))
+        for u in range(V):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                pos = fill[v]
+                rev_targets[pos] = u
+                rev_weights[pos] = weights[i]
+                fill[v] = pos + 1
+
+        rev = CSRGraph(rev_offsets, rev_targets, rev_weights, self.node_ids, self.xs, self.ys)
+        rev.index = self.index
+        rev._reverse = self
+        self._reverse = rev
+        return rev
+
+    def to_adjacency(self):
+        """Kembali ke format dict of dict (key string) seperti instance['graph']."""
+        adj = {}
+        ids = [str(n) for n in self.node_ids]
+        for u in range(self.num_nodes):
+            lo, hi = self.offsets[u], self.offsets[u + 1]
+            if lo == hi:
+                continue
+            adj[ids[u]] = {ids[self.targets[i]]: self.weights[i] for i in range(lo, hi)}
+        return adj
+
+
+def _node_sort_key(node_id):
+    # OSM ID numerik diurutkan sebagai angka, sisanya sebagai string
+    return (0, int(node_id), '') if node_id.isdigit() else (1, 0, node_id)
+
+
+def build_csr(graph, coords=None):
+    """
+    Konversi adjacency dict {u: {v: w}} (+ koordinat opsional) menjadi CSRGraph.
+    Semua node yang muncul sebagai sumber, tujuan, maupun di 'coords' diberi indeks.
+    """
+    graph = {str(u): neighbors for u, neighbors in graph.items()}
+    node_set = set(graph)
+    for neighbors in graph.values():
+        node_set.update(str(v) for v in neighbors)
+    if coords:
+        coords = {str(n): c for n, c in coords.items()}
+        node_set.update(coords)
+
+    node_ids = sorted(node_set, key=_node_sort_key)
+    index = {nid: i for i, nid in enumerate(node_ids)}
+
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d')
+    for nid in node_ids:
+        neighbors = graph.get(nid, {})
+        for v, w in neighbors.items():
+            targets.append(index[str(v)])
+            weights.append(float(w))
+        offsets.append(len(targets))
+
+    xs = ys = None
+    if coords:
+        xs = array('d', (coords[nid]['x'] if nid in coords else math.nan for nid in node_ids))
+        ys = array('d', (coords[nid]['y'] if nid in coords else math.nan for nid in node_ids))
+
+    return CSRGraph(offsets, targets, weights, node_ids, xs, ys)
+
+
+def from_instance(instance: Any):
+    """Bangun CSRGraph dari instance JSON (kunci 'graph' dan 'nodes')."""
+    return build_csr(instance['graph'], instance.get('nodes'))
+
+
+# --- FORMAT BINER (.bin) UNTUK mmap ---
+# Layout little-endian, setiap blok rata 8 byte:
+#   header (128 byte)  : magic, versi, flags, V, E, hash sumber (hex)
+#   offsets  int64[V+1]
+#   node_ids int64[V]   (OSM ID, terurut naik -> lookup via binary search)
+#   xs, ys   float64[V] (hanya jika FLAG_COORDS)
+#   weights  float64[E]
+#   targets  int32[E]
+# File dibuka read-only lewat mmap dan setiap blok di-cast menjadi memoryview
+# tanpa menyalin data, sehingga banyak proses berbagi page cache OS yang sama.
+
+BIN_MAGIC = b'SPGRAPH\0'
+BIN_VERSION = 1
+BIN_HEADER = struct.Struct('<8sIIqq40s')
+BIN_HEADER_SIZE = 128
+FLAG_COORDS = 1
+
+
+def _bin_layout(V, E, has_coords):
+    """Offset byte tiap blok: dict nama -> (offset, typecode, jumlah)."""
+    layout = {}
+    pos = BIN_HEADER_SIZE
+    blocks = [('offsets', 'q', V + 1), ('node_ids', 'q', V)]
+    if has_coords:
+        blocks += [('xs', 'd', V), ('ys', 'd', V)]
+    blocks += [('weights', 'd', E), ('targets', 'i', E)]
+    for name, code, count in blocks:
+        layout[name] = (pos, code, count)
+        pos += count * array(code).itemsize
+        pos = (pos + 7) & ~7
+    return layout, pos
+
+
+def save_binary(csr, path, source_hash=''):
+    """Tulis CSRGraph ke file biner. Node ID harus numerik (OSM ID)."""
+    if not all(str(n).isdigit() for n in csr.node_ids):
+        raise ValueError("Format biner hanya mendukung node ID numerik")
+
+    columns = {
+        'offsets': array('q', csr.offsets),
+        'node_ids': array('q', (int(n) for n in csr.node_ids)),
+        'weights': array('d', csr.weights),
+        'targets': array('i', csr.targets),
+    }
+    if csr.xs is not None and csr.ys is not None:
+        columns['xs'] = array('d', csr.xs)
+        columns['ys'] = array('d', csr.ys)
+    if sys.byteorder != 'little':
+        for col in columns.values():
+            col.byteswap()
+    write_binary(path, csr.num_nodes, csr.num_edges, columns, source_hash)
+
+
+def write_binary(path, V, E, columns, source_hash=''):
+    """
+    Tulis blok-blok graf biner secara streaming. `columns` berisi buffer
+    little-endian (array.array atau numpy array kontigu dengan itemsize yang
+    sesuai layout) untuk 'offsets', 'node_ids', 'weights', 'targets' dan
+    opsional 'xs'/'ys'. Dipakai juga oleh generator graf sintetis besar.
+    """
+    has_coords = 'xs' in columns and 'ys' in columns
+    layout, total = _bin_layout(V, E, has_coords)
+
+    # Tulis ke file sementara lalu rename agar pembaca lain tidak melihat file setengah jadi
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        header = BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, FLAG_COORDS if has_coords else 0,
+                                 V, E, source_hash.encode('ascii')[:40])
+        f.write(header.ljust(BIN_HEADER_SIZE, b'\0'))
+        for name, (pos, code, count) in sorted(layout.items(), key=lambda item: item[1][0]):
+            raw = memoryview(columns[name]).cast('B')
+            if len(raw) != count * array(code).itemsize:
+                raise ValueError(f"Blok {name}: {len(raw)} byte, seharusnya {count * array(code).itemsize}")
+            f.seek(pos)
+            f.write(raw)
+        f.truncate(total)
+    tmp.replace(path)
+
+
+def read_binary_header(path):
+    """Baca header file biner. Mengembalikan dict, atau None jika bukan format ini / versi lain."""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(BIN_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw) < BIN_HEADER.size:
+        return None
+    magic, version, flags, V, E, h = BIN_HEADER.unpack(raw)
+    if magic != BIN_MAGIC or version != BIN_VERSION:
+        return None
+    return {'version': version, 'flags': flags, 'V': V, 'E': E,
+            'source_hash': h.rstrip(b'\0').decode('ascii')}
+
+
+def open_binary(path):
+    """Buka file biner via mmap (zero-copy). Mengembalikan CSRGraph."""
+    header = read_binary_header(path)
+    if header is None:
+        raise ValueError(f"{path} bukan file graf biner versi {BIN_VERSION}")
+
+    V, E = header['V'], header['E']
+    has_coords = bool(header['flags'] & FLAG_COORDS)
+    layout, total = _bin_layout(V, E, has_coords)
+
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mm) < total:
+        mm.close()
+        raise ValueError(f"{path} terpotong ({len(mm)} < {total} byte)")
+
+    view = memoryview(mm)
+    cols = {}
+    for name, (pos, code, count) in layout.items():
+        size = count * array(code).itemsize
+        if sys.byteorder == 'little':
+            cols[name] = view[pos:pos + size].cast(code)
+        else:
+            # Mesin big-endian: terpaksa menyalin + byteswap
+            col = array(code, view[pos:pos + size].tobytes())
+            col.byteswap()
+            cols[name] = col
+
+    csr = CSRGraph(cols['offsets'], cols['targets'], cols['weights'], cols['node_ids'],
+                   cols.get('xs'), cols.get('ys'))
+    csr.source_hash = header['source_hash']
+    csr._mmap = mm  # jaga agar mapping tetap hidup selama graf dipakai
+    return csr
@@ -0,0 +1,365 @@
+import argparse
+import hashlib
+import json
+import math
+from pathlib import Path
+from graph_csr import build_csr, from_instance, open_binary, read_binary_header, save_binary
+
+# --- FORMAT INSTANCE DENGAN GRAF BERSAMA ---
+# Semua instance Solo memakai peta yang sama, jadi graf cukup disimpan SEKALI:
+#
+#   data/graphs/<hash>.json   -> graf master: {"hash", "meta", "nodes", "graph"}
+#   data/solo_route_GXX.json  -> query ringan: {"project", "meta", "graph_ref"}
+#
+# "graph_ref" = {"hash": <sha1 isi graf>, "file": <path relatif thd file query>}.
+# load_instance() mengembalikan dict berformat lama ('project', 'meta', 'nodes',
+# 'graph') sehingga algoritma tidak perlu diubah. Graf di-parse sekali per proses
+# lalu dipakai ulang oleh semua query yang merujuk hash yang sama.
+
+GRAPH_SUBDIR = 'graphs'
+
+# Cache per proses: hash -> dict graf master
+_GRAPH_CACHE = {}
+# Cache per proses: hash -> CSRGraph (mmap dari file .bin)
+_CSR_CACHE = {}
+
+
+# --- MEMBANGUN & MEMVALIDASI GRAF ---
+# Bobot disimpan dengan 7 digit signifikan (error relatif <= 5e-8, jauh di bawah
+# presisi travel_time osmnx) dan koordinat 7 desimal (presisi asli OSM), agar
+# file JSON ringkas tanpa mengubah hasil rute.
+WEIGHT_DIGITS = 7
+COORD_DECIMALS = 7
+MAX_ERRORS = 5
+
+
+def compact_weight(w):
+    return float(f"{w:.{WEIGHT_DIGITS}g}")
+
+
+def build_adjacency(edges, node_ids=()):
+    """
+    Adjacency {u: {v: w}} dari iterable (u, v, w). Edge paralel -> bobot TERKECIL
+    (bukan yang terakhir), dan setiap node (termasuk yang tanpa edge keluar)
+    muncul eksplisit sebagai key.
+    """
+    adj = {n: {} for n in node_ids}
+    for u, v, w in edges:
+        nbrs = adj.setdefault(u, {})
+        if v not in nbrs or w < nbrs[v]:
+            nbrs[v] = w
+        adj.setdefault(v, {})
+    return adj
+
+
+def validate_graph(nodes, graph, source='graf'):
+    """
+    Validasi SATU pass atas node & edge, sebelum algoritma apa pun berjalan:
+    koordinat numerik dalam rentang lat/lon, target edge dikenal, bobot angka
+    finite >= 0. Node yang hanya muncul sebagai target / di 'nodes' ditambahkan
+    ke graph sebagai {} (in-place). ValueError berisi beberapa kesalahan pertama.
+    Mengembalikan jumlah node yang ditambahkan.
+    """
+    errors = []
+
+    def fail(msg):
+        errors.append(msg)
+        if len(errors) >= MAX_ERRORS:
+            raise ValueError(f"{source} tidak valid: " + "; ".join(errors))
+
+    if not isinstance(graph, dict):
+        raise ValueError(f"{source} tidak valid: 'graph' harus object, bukan {type(graph).__name__}")
+    nodes = nodes or {}
+    for nid, c in nodes.items():
+        try:
+            x, y = c['x'], c['y']
+            if not (-180.0 <= x <= 180.0 and -90.0 <= y <= 90.0):
+                fail(f"koordinat node {nid} di luar rentang ({y}, {x})")
+        except (KeyError, TypeError):
+            fail(f"koordinat node {nid} tidak lengkap: {c!r}")
+
+    missing = []
+    for u, nbrs in graph.items():
+        if not isinstance(nbrs, dict):
+            fail(f"tetangga node {u} harus object")
+            continue
+        for v, w in nbrs.items():
+            if isinstance(w, bool) or not isinstance(w, (int, float)) or not math.isfinite(w) or w < 0:
+                fail(f"bobot edge {u}->{v} tidak valid: {w!r}")
+            if v not in graph:
+                if nodes and v not in nodes:
+                    fail(f"edge {u}->{v} menuju node yang tidak ada di 'nodes'")
+                missing.append(v)
+    missing.extend(n for n in nodes if n not in graph)
+    if errors:
+        raise ValueError(f"{source} tidak valid: " + "; ".join(errors))
+
+    for v in missing:
+        graph.setdefault(v, {})
+    return len(set(missing))
+
+
+def validate_query(inst, source='instance'):
+    """start_node / end_node harus ada di graf (dipanggil setelah validate_graph)."""
+    meta = inst.get('meta') or {}
+    graph = inst['graph']
+    for key in ('start_node', 'end_node'):
+        if key not in meta:
+            raise ValueError(f"{source} tidak valid: meta.{key} tidak ada")
+        if str(meta[key]) not in graph:
+            raise ValueError(f"{source} tidak valid: {key} {meta[key]} tidak ada di graf")
+
+
+def graph_hash(nodes, graph):
+    """SHA-1 dari serialisasi kanonik (key terurut) koordinat + adjacency."""
+    payload = json.dumps({'nodes': nodes, 'graph': graph}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def save_graph(data_dir, nodes, graph, extra_meta=None):
+    """Simpan graf master ke data_dir/graphs/<hash>.json. Mengembalikan (hash, path)."""
+    # Normalisasi key ke string (seperti hasil json.load) agar hash stabil,
+    # bobot & koordinat diringkas, semua node muncul eksplisit di graph
+    nodes = {str(n): {'y': round(c['y'], COORD_DECIMALS), 'x': round(c['x'], COORD_DECIMALS)}
+             for n, c in nodes.items()}
+    graph = {str(u): {str(v): compact_weight(w) for v, w in nbrs.items()} for u, nbrs in graph.items()}
+    validate_graph(nodes, graph, 'graf baru')
+    h = graph_hash(nodes, graph)
+
+    graph_dir = Path(data_dir) / GRAPH_SUBDIR
+    graph_dir.mkdir(parents=True, exist_ok=True)
+    path = graph_dir / f"{h}.json"
+    if not path.exists():
+        meta = {
+            'total_nodes': len(nodes),
+            'total_edges': sum(len(nbrs) for nbrs in graph.values()),
+        }
+        meta.update(extra_meta or {})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'hash': h, 'meta': meta, 'nodes': nodes, 'graph': graph},
+                      f, ensure_ascii=False, separators=(',', ':'))
+    return h, path
+
+
+def make_query(project, graph_h, graph_path, query_path, meta):
+    """Bangun dict file query yang merujuk graf master lewat hash."""
+    rel = Path(graph_path).resolve().relative_to(Path(query_path).resolve().parent)
+    return {
+        'project': project,
+        'meta': meta,
+        'graph_ref': {'hash': graph_h, 'file': rel.as_posix()},
+    }
+
+
+def load_graph(ref, base_dir):
+    """Muat graf master sesuai referensi; hasil di-cache per hash."""
+    h = ref['hash']
+    cached = _GRAPH_CACHE.get(h)
+    if cached is not None:
+        return cached
+
+    path = Path(base_dir) / ref['file']
+    if not path.exists() and path.with_suffix('.bin').exists():
+        # Graf sintetis besar hanya ditulis sebagai .bin (lihat generate_synthetic.py)
+        raise ValueError(f"graf {path.name} hanya tersedia dalam format biner (.bin), gunakan --engine csr")
+    with open(path, 'r', encoding='utf-8') as f:
+        master = json.load(f)
+    if master.get('hash') != h:
+        raise ValueError(f"Hash graf tidak cocok: {path} berisi {master.get('hash')}, query meminta {h}")
+    validate_graph(master.get('nodes'), master.get('graph'), str(path))
+
+    _GRAPH_CACHE[h] = master
+    return master
+
+
+def load_instance(path):
+    """
+    Muat instance dalam format lama (graf lengkap) maupun format query ringan.
+    Selalu mengembalikan dict dengan key 'project', 'meta', 'nodes', 'graph'.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    ref = data.get('graph_ref')
+    if ref is None:
+        # Format lama: graf sudah ada di dalam file
+        if 'graph' not in data:
+            raise ValueError(f"{path} tidak valid: tidak ada 'graph' maupun 'graph_ref'")
+        validate_graph(data.get('nodes'), data['graph'], str(path))
+        validate_query(data, str(path))
+        return data
+
+    master = load_graph(ref, path.parent)
+    inst = dict(data)
+    inst['nodes'] = master['nodes']
+    inst['graph'] = master['graph']
+    inst['graph_hash'] = ref['hash']
+    validate_query(inst, str(path))
+    return inst
+
+
+# --- GRAF BINER (mmap) ---
+# File .bin dikompilasi sekali dari graf master JSON dan disimpan di sebelahnya
+# (data/graphs/<hash>.bin). Pemanggilan berikutnya -- termasuk proses lain --
+# cukup me-mmap file tersebut tanpa json.load sama sekali.
+def binary_path_for(ref, base_dir):
+    return (Path(base_dir) / ref['file']).with_suffix('.bin')
+
+
+def compile_binary(ref, base_dir, force=False):
+    """Pastikan file .bin untuk graf ini ada dan sesuai hash. Mengembalikan path-nya."""
+    bin_path = binary_path_for(ref, base_dir)
+    header = read_binary_header(bin_path)
+    if force or header is None or header['source_hash'] != ref['hash']:
+        master = load_graph(ref, base_dir)
+        csr = build_csr(master['graph'], master.get('nodes'))
+        save_binary(csr, bin_path, ref['hash'])
+        print(f"[INFO] Graf biner dikompilasi: {bin_path}")
+    return bin_path
+
+
+def load_instance_csr(path):
+    """
+    Muat query + graf dalam bentuk CSRGraph. Untuk format query ringan graf
+    dibaca dari file .bin via mmap (tanpa parse JSON graf). Mengembalikan
+    (instance, csr); instance hanya berisi 'project', 'meta' (+ 'graph_hash').
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    ref = data.get('graph_ref')
+    if ref is None:
+        # Format lama: validasi lalu bangun CSR dari JSON
+        if 'graph' not in data:
+            raise ValueError(f"{path} tidak valid: tidak ada 'graph' maupun 'graph_ref'")
+        validate_graph(data.get('nodes'), data['graph'], str(path))
+        validate_query(data, str(path))
+        return data, from_instance(data)
+
+    csr = _CSR_CACHE.get(ref['hash'])
+    if csr is None:
+        csr = open_binary(compile_binary(ref, path.parent))
+        _CSR_CACHE[ref['hash']] = csr
+    inst = dict(data)
+    inst['graph_hash'] = ref['hash']
+    meta = inst.get('meta') or {}
+    for key in ('start_node', 'end_node'):
+        if key not in meta or csr.find(meta[key]) is None:
+            raise ValueError(f"{path} tidak valid: {key} {meta.get(key)} tidak ada di graf")
+    return inst, csr
+
+
+# --- ARTEFAK PREPROCESSING (.alt, .ch, ...) ---
+# Disimpan di samping graf master (data/graphs/<hash>.<ext>) sehingga semua query
+# pada peta yang sama memakai satu hasil preprocessing.
+_LANDMARK_CACHE = {}
+_CH_CACHE = {}
+_GRID_CACHE = {}
+
+
+def artifact_path_for(path, suffix):
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        ref = json.load(f).get('graph_ref')
+    if ref is None:
+        return path.with_suffix(suffix)  # Format lama: per file instance
+    return (path.parent / ref['file']).with_suffix(suffix)
+
+
+def landmark_path_for(path, inst):
+    return artifact_path_for(path, '.alt')
+
+
+def ch_path_for(path, inst):
+    return artifact_path_for(path, '.ch')
+
+
+def grid_path_for(path, inst):
+    return artifact_path_for(path, '.grid')
+
+
+def load_landmarks(path, inst, csr, k=8):
+    """Landmark ALT untuk graf instance ini (mmap dari .alt; dibangun jika belum ada)."""
+    from landmarks import load_or_build
+
+    key = (inst.get('graph_hash') or str(Path(path).resolve()), k)
+    lm = _LANDMARK_CACHE.get(key)
+    if lm is None:
+        lm = load_or_build(csr, landmark_path_for(path, inst), k, source_hash=inst.get('graph_hash', ''))
+        _LANDMARK_CACHE[key] = lm
+    return lm
+
+
+def load_ch(path, inst, csr):
+    """Contraction Hierarchies untuk graf instance ini (mmap dari .ch; dibangun jika belum ada)."""
+    from contraction import load_or_build
+
+    key = inst.get('graph_hash') or str(Path(path).resolve())
+    ch = _CH_CACHE.get(key)
+    if ch is None:
+        ch = load_or_build(csr, ch_path_for(path, inst), source_hash=inst.get('graph_hash', ''))
+        _CH_CACHE[key] = ch
+    return ch
+
+
+def load_spatial_index(path, inst, csr):
+    """Indeks spasial grid untuk graf instance ini (mmap dari .grid; dibangun jika belum ada)."""
+    from spatial_index import load_or_build
+
+    key = inst.get('graph_hash') or str(Path(path).resolve())
+    index = _GRID_CACHE.get(key)
+    if index is None:
+        index = load_or_build(csr, grid_path_for(path, inst), source_hash=inst.get('graph_hash', ''))
+        _GRID_CACHE[key] = index
+    return index
+
+
+def clear_cache():
+    _GRAPH_CACHE.clear()
+    _CSR_CACHE.clear()
+    _LANDMARK_CACHE.clear()
+    _CH_CACHE.clear()
+    _GRID_CACHE.clear()
+
+
+# --- MIGRASI FILE LAMA ---
+def migrate_legacy(data_dir):
+    """Ubah semua instance format lama di data_dir menjadi graf master + query ringan."""
+    data_dir = Path(data_dir)
+    converted = 0
+    for json_file in sorted(data_dir.glob('*.json')):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if 'graph_ref' in data or 'graph' not in data:
+            continue
+
+        h, graph_path = save_graph(data_dir, data.get('nodes', {}), data['graph'])
+        query = make_query(data.get('project', 'unknown'), h, graph_path, json_file, data['meta'])
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(query, f, ensure_ascii=False, indent=2)
+        converted += 1
+        print(f"[MIGRASI] {json_file.name} -> graf {h[:12]}")
+
+    print(f"[SUKSES] {converted} file dikonversi.")
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Utilitas format instance (graf bersama)')
+    p.add_argument('--migrate', metavar='DATA_DIR', help='Konversi instance format lama di folder ini')
+    p.add_argument('--compile', metavar='DATA_DIR', help='Kompilasi graf biner (.bin) untuk semua query di folder ini')
+    args = p.parse_args()
+
+    if args.migrate:
+        migrate_legacy(args.migrate)
+    if args.compile:
+        seen = set()
+        for json_file in sorted(Path(args.compile).glob('*.json')):
+            with open(json_file, 'r', encoding='utf-8') as f:
+                ref = json.load(f).get('graph_ref')
+            if ref and ref['hash'] not in seen:
+                seen.add(ref['hash'])
+                print(f"[SUKSES] {compile_binary(ref, json_file.parent, force=True)}")
+    if not (args.migrate or args.compile):
+        p.print_help()
@@ -0,0 +1,288 @@
+import cProfile
+import copy
+import heapq
+import io
+import math
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import routing
+
+# --- INSTRUMENTASI HOT PATH (OPT-IN) ---
+# Loop pencarian di run.py / routing.py TIDAK diubah sama sekali: saat
+# instrumentasi mati biayanya nol. Penghitungan dilakukan pada run terpisah
+# (di luar pengukuran waktu) dengan membungkus struktur datanya:
+#   heap push/pop  : heapq.heappush/heappop diganti versi penghitung selama run
+#                    (atau backend --pq dibungkus CountingQueue)
+#   relaksasi edge : buffer targets CSR / dict tetangga dibungkus penghitung
+#   pop basi       : pop - visited
+#   decrease sukses: push - push awal (lazy heap: tiap decrease = satu push)
+#   scan linear    : algo B memindai seluruh 'unvisited' tiap ekstraksi,
+#                    sehingga jumlahnya bisa dihitung eksak dari V dan visited
+
+# Parameter sampling profiler (detik)
+SAMPLE_INTERVAL = 0.001
+
+
+class OpCounters:
+    """Counter operasi satu run."""
+
+    FIELDS = ('pushes', 'pops', 'relaxations', 'scans')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for f in self.FIELDS:
+            setattr(self, f, 0)
+
+
+# --- PEMBUNGKUS PENGHITUNG ---
+class _CountingBuffer:
+    """Buffer read-only yang menghitung setiap akses indeks (= satu edge discan)."""
+
+    __slots__ = ('buf', 'counters')
+
+    def __init__(self, buf, counters):
+        self.buf = buf
+        self.counters = counters
+
+    def __getitem__(self, i):
+        self.counters.relaxations += 1
+        return self.buf[i]
+
+    def __len__(self):
+        return len(self.buf)
+
+
+class _InstrumentedCSR:
+    """CSRGraph dengan targets penghitung; atribut & method lain diteruskan ke graf asli."""
+
+    def __init__(self, csr, counters):
+        self._csr = csr
+        self._counters = counters
+        self.targets = _CountingBuffer(csr.targets, counters)
+
+    def __getattr__(self, name):
+        return getattr(self._csr, name)
+
+    @property
+    def num_nodes(self):
+        return self._csr.num_nodes
+
+    @property
+    def num_edges(self):
+        return self._csr.num_edges
+
+    def reverse(self):
+        return _InstrumentedCSR(self._csr.reverse(), self._counters)
+
+
+class _CountingNeighbors(dict):
+    """Dict tetangga {v: w}; .items() menambah counter sebanyak tetangga yang discan."""
+
+    __slots__ = ('counters',)
+
+    def items(self):
+        self.counters.relaxations += len(self)
+        return dict.items(self)
+
+
+def wrap_adjacency(graph, counters):
+    wrapped = {}
+    for u, neighbors in graph.items():
+        nb = _CountingNeighbors(neighbors)
+        nb.counters = counters
+        wrapped[u] = nb
+    return wrapped
+
+
+def wrap_csr(csr, counters):
+    return _InstrumentedCSR(csr, counters)
+
+
+def wrap_ch(ch, counters):
+    """Salinan dangkal CHGraph dengan targets overlay naik/turun penghitung."""
+    wrapped = copy.copy(ch)
+    for side in ('up', 'down'):
+        offsets, targets, weights, mid = getattr(ch, side)
+        setattr(wrapped, side, (offsets, _CountingBuffer(targets, counters), weights, mid))
+    return wrapped
+
+
+class CountingQueue:
+    """Pembungkus backend pqueue.py: hitung push/pop (+ panjang scan untuk backend linear)."""
+
+    def __init__(self, inner, counters):
+        self.inner = inner
+        self.counters = counters
+        self.linear = type(inner).__name__ == 'LinearArrayQueue'
+
+    def __len__(self):
+        return len(self.inner)
+
+    def push(self, node, key):
+        self.counters.pushes += 1
+        self.inner.push(node, key)
+
+    def pop(self):
+        self.counters.pops += 1
+        if self.linear:
+            self.counters.scans += len(self.inner)
+        return self.inner.pop()
+
+
+@contextmanager
+def counting(counters, pq=False):
+    """
+    Aktifkan penghitung push/pop selama blok: heapq global diganti (semua
+    algoritma membaca heapq.heappush/heappop saat dipanggil), atau untuk --pq
+    backend di routing dibungkus CountingQueue.
+    """
+    if pq:
+        original = routing.make_queue
+        routing.make_queue = lambda name, csr: CountingQueue(original(name, csr), counters)
+        try:
+            yield counters
+        finally:
+            routing.make_queue = original
+        return
+
+    push, pop = heapq.heappush, heapq.heappop
+
+    def counting_push(heap, item):
+        counters.pushes += 1
+        push(heap, item)
+
+    def counting_pop(heap):
+        counters.pops += 1
+        return pop(heap)
+
+    heapq.heappush, heapq.heappop = counting_push, counting_pop
+    try:
+        yield counters
+    finally:
+        heapq.heappush, heapq.heappop = push, pop
+
+
+def linear_scans(V, visited):
+    """Jumlah entri yang discan algo B: ekstraksi ke-i memindai V - i node 'unvisited'."""
+    return visited * V - visited * (visited - 1) // 2
+
+
+# --- LAPORAN: TERUKUR vs ESTIMASI TEORITIS ---
+def report(counters, algo, V, E, visited, initial_pushes=1):
+    """Cetak counter terukur + bandingkan dengan estimasi E log V / V^2 dari analyze_complexity."""
+    c = counters
+    log_v = math.log2(V) if V > 1 else 1.0
+    print("\n--- [OPERASI TERUKUR] ---")
+    print(f"  Visited (settle)   : {visited:,}")
+    if algo == 'B' and c.pops == 0:
+        print(f"  Scan linear        : {c.scans:,}  (ekstraksi min O(V) per node)")
+        print(f"  Relaksasi edge     : {c.relaxations:,}")
+        measured, estimate, label = c.scans + c.relaxations, V * V, "V^2"
+    else:
+        print(f"  Heap push          : {c.pushes:,}")
+        print(f"  Heap pop           : {c.pops:,}  (basi: {max(0, c.pops - visited):,})")
+        print(f"  Relaksasi edge     : {c.relaxations:,}")
+        print(f"  Decrease sukses    : {max(0, c.pushes - initial_pushes):,}")
+        if c.scans:
+            print(f"  Scan linear        : {c.scans:,}")
+        measured = (c.pushes + c.pops) * log_v + c.relaxations + c.scans
+        estimate, label = E * log_v, "E log V"
+    ratio = measured / estimate if estimate else 0.0
+    print(f"  Terukur ~ {int(measured):,} vs estimasi {label} ~ {int(estimate):,}  ({ratio:.1%} dari estimasi)")
+
+
+# --- PENGUKURAN PER FASE ---
+class PhaseTimer:
+    """Akumulasi waktu (ms) per fase: load, preprocessing, search, path, ..."""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - t0) * 1000.0
+
+    def add(self, name, ms):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    def report(self):
+        total = sum(self.phases.values())
+        print("\n--- [WAKTU PER FASE] ---")
+        for name, ms in self.phases.items():
+            share = ms / total if total > 0 else 0.0
+            print(f"  {name:<18} : {ms:10.2f} ms  ({share:5.1%})")
+
+
+# --- PROFILER ---
+class _Sampler(threading.Thread):
+    """Sampling profiler: ambil stack thread utama tiap interval -> folded stacks."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+
+def profile_call(fn, mode, out_path):
+    """
+    Jalankan fn() di bawah profiler lalu tulis hasilnya ke out_path:
+      cprofile : file .prof (pstats; bisa dibuka snakeviz / flameprof / gprof2dot)
+      sample   : folded stacks 'a;b;c N' (flamegraph.pl, speedscope, inferno)
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if mode == 'cprofile':
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            return fn()
+        finally:
+            prof.disable()
+            prof.dump_stats(out_path)
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats('cumulative').print_stats(12)
+            print(buf.getvalue())
+            print(f"[SUKSES] Profil cProfile disimpan di: {out_path}")
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(SAMPLE_INTERVAL / 2)  # beri thread sampler kesempatan merebut GIL
+    sampler = _Sampler(threading.get_ident(), SAMPLE_INTERVAL)
+    sampler.start()
+    try:
+        return fn()
+    finally:
+        sampler.running = False
+        sampler.join()
+        sys.setswitchinterval(old_interval)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(sampler.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        total = sum(sampler.stacks.values())
+        print(f"[SUKSES] {total} sampel stack (folded) disimpan di: {out_path}")
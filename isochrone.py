@@ -0,0 +1,131 @@
+import argparse
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from routing import INF, bounded_dijkstra, dijkstra
+
+# --- ISOCHRONE: SEMUA YANG TERJANGKAU DALAM T DETIK ---
+# Satu pencarian Dijkstra berbatas (radius = anggaran terbesar) menghasilkan
+# semua pita sekaligus: node di-settle terurut naik menurut jarak, sehingga
+# node dalam anggaran ke-k adalah PREFIX urutan settle (cukup simpan panjangnya).
+# Edge batas anggaran b: u terjangkau (d(u) <= b) tetapi d(u) + w > b dan v tidak
+# terjangkau dalam b; `frac` = bagian edge yang masih bisa ditempuh ((b - d(u)) / w).
+# Semua hasil berupa array kompak; biaya sebanding area yang dicapai, bukan V.
+# Catatan: bounded_dijkstra memakai dict jarak (bukan array sepanjang V), sehingga
+# biaya per node yang di-settle kira-kira 2x Dijkstra penuh; isochrone baru lebih
+# murah bila anggaran mencakup kurang dari ~setengah graf.
+
+# Default yang benar-benar membatasi pencarian di peta Solo (10 menit sudah mencakup semua node)
+DEFAULT_BUDGETS_MIN = (1, 2, 3)
+
+
+class Isochrone:
+    """Hasil isochrone multi-anggaran dari satu sumber (anggaran dalam satuan bobot, detik)."""
+
+    __slots__ = ('source', 'budgets', 'nodes', 'dist', 'counts', 'boundary')
+
+    def __init__(self, source, budgets, nodes, dist, counts, boundary):
+        self.source = source
+        self.budgets = budgets    # tuple anggaran, terurut naik
+        self.nodes = nodes        # array('i') node terjangkau, urutan jarak naik
+        self.dist = dist          # array('d') jarak tiap node di `nodes`
+        self.counts = counts      # counts[k] = jumlah node dengan jarak <= budgets[k]
+        self.boundary = boundary  # per anggaran: (array u, array v, array frac)
+
+    def reachable(self, k):
+        """Node (array indeks) yang terjangkau dalam anggaran ke-k."""
+        return self.nodes[:self.counts[k]]
+
+    def band_of(self):
+        """dict node -> indeks anggaran terkecil yang menjangkaunya."""
+        bands = {}
+        start = 0
+        for k, end in enumerate(self.counts):
+            for u in self.nodes[start:end]:
+                bands[u] = k
+            start = end
+        return bands
+
+
+def isochrone(csr, source, budgets):
+    """Isochrone untuk semua `budgets` (detik) dari indeks `source` dalam satu pass."""
+    budgets = tuple(sorted(budgets))
+    nodes, dist = bounded_dijkstra(csr, source, budgets[-1])
+    counts = array('q', (bisect_right(dist, b) for b in budgets))
+
+    # Satu pass atas edge keluar node terjangkau: edge (u, v) menjadi batas untuk
+    # setiap anggaran b dengan d(u) <= b < min(d(u) + w, d(v))
+    reached = dict(zip(nodes, dist))
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    boundary = [(array('i'), array('i'), array('d')) for _ in budgets]
+    n_budgets = len(budgets)
+    for u, du in zip(nodes, dist):
+        first = bisect_left(budgets, du)
+        if first == n_budgets:
+            continue
+        b_first = budgets[first]
+        for i in range(offsets[u], offsets[u + 1]):
+            w = weights[i]
+            if du + w <= b_first:
+                continue  # edge selesai ditempuh sebelum anggaran terdekat
+            v = targets[i]
+            hi = min(du + w, reached.get(v, INF))
+            for k in range(first, bisect_left(budgets, hi)):
+                edge_u, edge_v, frac = boundary[k]
+                edge_u.append(u)
+                edge_v.append(v)
+                frac.append((budgets[k] - du) / w if w > 0 else 1.0)
+    return Isochrone(source, budgets, nodes, dist, counts, tuple(boundary))
+
+
+def report(iso):
+    """Cetak ringkasan per pita anggaran."""
+    for k, b in enumerate(iso.budgets):
+        print(f"  <= {b / 60:5.1f} menit : {iso.counts[k]:6,} node terjangkau, "
+              f"{len(iso.boundary[k][0]):5,} edge batas")
+
+
+# --- BENCHMARK: ISOCHRONE BERBATAS vs DIJKSTRA PENUH ---
+def benchmark(instance_path, budgets_min, repeat):
+    from instance_io import load_instance_csr
+
+    inst, csr = load_instance_csr(instance_path)
+    source = csr.to_index(inst['meta']['start_node'])
+    budgets = [m * 60.0 for m in budgets_min]
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        iso = isochrone(csr, source, budgets)
+    t_iso = (time.perf_counter() - t0) * 1000.0 / repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        spt = dijkstra(csr, source)
+    t_full = (time.perf_counter() - t0) * 1000.0 / repeat
+
+    print(f"=== ISOCHRONE {'/'.join(f'{m:g}' for m in budgets_min)} menit dari "
+          f"{inst['meta']['start_node']} ({Path(instance_path).name}, V={csr.num_nodes:,}) ===")
+    report(iso)
+    print(f"Isochrone berbatas : Time_ms={t_iso:.2f} Visited={len(iso.nodes)}")
+    print(f"Dijkstra penuh     : Time_ms={t_full:.2f} Visited={spt.visited}")
+
+    wrong = sum(1 for k, b in enumerate(budgets)
+                if set(iso.reachable(k)) != {u for u, d in enumerate(spt.dist) if d <= b})
+    if wrong:
+        print(f"[ERROR] {wrong} pita berbeda dari Dijkstra penuh!")
+        return 1
+    print("[SUKSES] Semua pita identik dengan Dijkstra penuh.")
+    return 0
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Isochrone multi-anggaran (semua node terjangkau dalam T menit)')
+    p.add_argument('--instance', default='data/solo_route_G01.json', help='File instance (sumber = meta.start_node)')
+    p.add_argument('--budgets', type=float, nargs='+', default=list(DEFAULT_BUDGETS_MIN), help='Anggaran (menit)')
+    p.add_argument('--repeat', type=int, default=5, help='Pengulangan untuk rata-rata waktu')
+    args = p.parse_args()
+
+    sys.exit(benchmark(args.instance, args.budgets, args.repeat))
@@ -0,0 +1,257 @@
+import argparse
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from routing import sssp_distances
+
+# --- ALT: A*, LANDMARKS & TRIANGLE INEQUALITY ---
+# Preprocessing (sekali per peta):
+#   1. Pilih K landmark (farthest-point: tiap landmark baru = node terjauh
+#      dari landmark yang sudah dipilih).
+#   2. Untuk tiap landmark L simpan d(L, v) (maju) dan d(v, L) (mundur) untuk semua v.
+# Query s -> t memakai batas bawah dari ketidaksamaan segitiga:
+#   d(v, t) >= d(L, t) - d(L, v)   dan   d(v, t) >= d(v, L) - d(t, L)
+# h(v) = maksimum semua batas tersebut -> heuristik A* yang admissible & konsisten.
+#
+# File .alt (di samping graf biner, data/graphs/<hash>.alt), little-endian:
+#   header (64 byte) : magic, versi, K, V, hash graf sumber
+#   landmarks int32[K] (rata 8 byte)
+#   forward  float64[K*V]   d(L_k, v) di posisi k*V + v
+#   backward float64[K*V]   d(v, L_k) di posisi k*V + v
+
+ALT_MAGIC = b'SPALT\0\0\0'
+ALT_VERSION = 1
+ALT_HEADER = struct.Struct('<8sIIq40s')
+ALT_HEADER_SIZE = 64
+
+
+class Landmarks:
+    """Tabel jarak landmark (array biasa setelah preprocessing, atau memoryview hasil mmap)."""
+
+    def __init__(self, landmarks, forward, backward, num_nodes, source_hash=''):
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.num_nodes = num_nodes
+        self.source_hash = source_hash
+
+    @property
+    def k(self):
+        return len(self.landmarks)
+
+    def nbytes(self):
+        return ALT_HEADER_SIZE + 8 * ((4 * self.k + 7) // 8) + 16 * self.k * self.num_nodes
+
+    def heuristic_fn(self, target):
+        """
+        Fungsi h(v) untuk target tertentu. Suku yang melibatkan inf (node tidak
+        terjangkau dari/ke landmark) dilewati agar tidak menghasilkan NaN.
+        """
+        n = self.num_nodes
+        fwd, bwd = self.forward, self.backward
+        # Pasangan (offset landmark, d(L,t), d(t,L)) dihitung sekali per query
+        terms = []
+        for k in range(self.k):
+            base = k * n
+            terms.append((base, fwd[base + target], bwd[base + target]))
+        inf = math.inf
+
+        def h(v):
+            best = 0.0
+            for base, d_lt, d_tl in terms:
+                d_lv = fwd[base + v]
+                if d_lt != inf and d_lv != inf:
+                    diff = d_lt - d_lv
+                    if diff > best:
+                        best = diff
+                d_vl = bwd[base + v]
+                if d_vl != inf and d_tl != inf:
+                    diff = d_vl - d_tl
+                    if diff > best:
+                        best = diff
+            return best
+        return h
+
+
+def select_landmarks(csr, k, method='farthest', seed=42):
+    """
+    Pilih k landmark. 'farthest': node awal acak, lalu berulang kali ambil node
+    dengan jarak minimum (maju+mundur) terbesar ke landmark yang sudah ada.
+    'random': k node acak. Mengembalikan (landmarks, forward, backward).
+    """
+    n = csr.num_nodes
+    rev = csr.reverse()
+    rnd = random.Random(seed)
+    k = min(k, n)
+
+    landmarks, forward, backward = [], array('d'), array('d')
+
+    def add(lm):
+        landmarks.append(lm)
+        forward.extend(sssp_distances(csr, lm))
+        backward.extend(sssp_distances(rev, lm))
+
+    if method == 'random':
+        for lm in rnd.sample(range(n), k):
+            add(lm)
+        return landmarks, forward, backward
+
+    if method != 'farthest':
+        raise ValueError(f"Metode landmark tidak dikenal: {method}")
+
+    # Node awal: terjauh dari node acak (agar landmark pertama ada di pinggir peta)
+    seed_dist = sssp_distances(csr, rnd.randrange(n))
+    add(_argmax_finite(seed_dist, range(n)))
+
+    # min_sep[v] = min_L (d(L, v) + d(v, L)), hanya suku yang finite
+    min_sep = [math.inf] * n
+    while len(landmarks) < k:
+        base = (len(landmarks) - 1) * n
+        for v in range(n):
+            s = forward[base + v] + backward[base + v]
+            if s < min_sep[v]:
+                min_sep[v] = s
+        chosen = set(landmarks)
+        add(_argmax_finite(min_sep, (v for v in range(n) if v not in chosen)))
+    return landmarks, forward, backward
+
+
+def _argmax_finite(values, candidates):
+    best, best_val = None, -1.0
+    for v in candidates:
+        val = values[v]
+        if val != math.inf and val > best_val:
+            best, best_val = v, val
+    return best if best is not None else 0
+
+
+def build_landmarks(csr, k=8, method='farthest', source_hash=''):
+    lms, fwd, bwd = select_landmarks(csr, k, method)
+    return Landmarks(array('i', lms), fwd, bwd, csr.num_nodes, source_hash)
+
+
+# --- PERSISTENSI (.alt) ---
+def save_landmarks(lm, path):
+    path = Path(path)
+    k, n = lm.k, lm.num_nodes
+    cols = [array('i', lm.landmarks), array('d', lm.forward), array('d', lm.backward)]
+    if sys.byteorder != 'little':
+        for col in cols:
+            col.byteswap()
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        header = ALT_HEADER.pack(ALT_MAGIC, ALT_VERSION, k, n, lm.source_hash.encode('ascii')[:40])
+        f.write(header.ljust(ALT_HEADER_SIZE, b'\0'))
+        raw = cols[0].tobytes()
+        f.write(raw.ljust(8 * ((len(raw) + 7) // 8), b'\0'))
+        f.write(cols[1].tobytes())
+        f.write(cols[2].tobytes())
+    tmp.replace(path)
+
+
+def open_landmarks(path):
+    """Buka file .alt via mmap (zero-copy). None jika file tidak ada / versi berbeda."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        raw = f.read(ALT_HEADER.size)
+        if len(raw) < ALT_HEADER.size:
+            return None
+        magic, version, k, n, h = ALT_HEADER.unpack(raw)
+        if magic != ALT_MAGIC or version != ALT_VERSION:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mm)
+    pos = ALT_HEADER_SIZE
+    lm_bytes = 4 * k
+    cols = []
+    for code, size in (('i', lm_bytes), ('d', 8 * k * n), ('d', 8 * k * n)):
+        chunk = view[pos:pos + size]
+        if sys.byteorder == 'little':
+            cols.append(chunk.cast(code))
+        else:
+            col = array(code, chunk.tobytes())
+            col.byteswap()
+            cols.append(col)
+        pos += 8 * ((size + 7) // 8)
+
+    lm = Landmarks(cols[0], cols[1], cols[2], n, h.rstrip(b'\0').decode('ascii'))
+    lm._mmap = mm
+    return lm
+
+
+def load_or_build(csr, path, k=8, method='farthest', source_hash=''):
+    """Buka .alt jika cocok dengan graf (hash & K), jika tidak bangun lalu simpan."""
+    lm = open_landmarks(path)
+    if lm is not None and lm.k == k and lm.num_nodes == csr.num_nodes and lm.source_hash == source_hash:
+        return lm
+    lm = build_landmarks(csr, k, method, source_hash)
+    save_landmarks(lm, path)
+    return open_landmarks(path)
+
+
+# --- LAPORAN PREPROCESSING & SPEEDUP ---
+def report(data_dir, k, method):
+    from instance_io import load_instance_csr, landmark_path_for
+    from run import algo_A_Heap_CSR, algo_E_ALT_CSR
+
+    files = sorted(Path(data_dir).glob('*.json'))
+    if not files:
+        print(f"[ERROR] Tidak ada file .json di folder {data_dir}")
+        return
+
+    inst, csr = load_instance_csr(files[0])
+    path = landmark_path_for(files[0], inst)
+
+    t0 = time.perf_counter()
+    lm = build_landmarks(csr, k, method, inst.get('graph_hash', ''))
+    t_pre = (time.perf_counter() - t0) * 1000.0
+    save_landmarks(lm, path)
+    lm = open_landmarks(path)
+
+    print("=== LAPORAN ALT (LANDMARK) ===")
+    print(f"  Landmark (K)    : {k} ({method})")
+    print(f"  Preprocessing   : {t_pre:.1f} ms")
+    print(f"  Ukuran file     : {Path(path).stat().st_size / 1024:.1f} KB ({path})")
+    print("-" * 80)
+    print(f"{'Instance':<20} | {'Heap (ms)':>10} | {'ALT (ms)':>10} | {'Vis Heap':>8} | {'Vis ALT':>8} | {'Speedup':>7}")
+    print("-" * 80)
+
+    total_heap = total_alt = 0.0
+    for json_file in files:
+        q, csr = load_instance_csr(json_file)
+        t0 = time.perf_counter()
+        d_heap, v_heap = algo_A_Heap_CSR(q, csr)
+        t1 = time.perf_counter()
+        d_alt, v_alt = algo_E_ALT_CSR(q, csr, lm)
+        t2 = time.perf_counter()
+        if abs(d_heap - d_alt) > 1e-9 * max(1.0, d_heap):
+            print(f"[ERROR] {json_file.name}: hasil ALT {d_alt} != Heap {d_heap}")
+        ms_heap, ms_alt = (t1 - t0) * 1000.0, (t2 - t1) * 1000.0
+        total_heap += ms_heap
+        total_alt += ms_alt
+        print(f"{json_file.name:<20} | {ms_heap:10.3f} | {ms_alt:10.3f} | {v_heap:>8} | {v_alt:>8} | {ms_heap / ms_alt:6.2f}x")
+
+    print("-" * 80)
+    print(f"Rata-rata speedup (total waktu): {total_heap / total_alt:.2f}x")
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Preprocessing landmark ALT + laporan speedup')
+    p.add_argument('--data', default='data', help='Folder instance (query) yang memakai graf yang sama')
+    p.add_argument('--k', type=int, default=8, help='Jumlah landmark')
+    p.add_argument('--method', choices=['farthest', 'random'], default='farthest')
+    args = p.parse_args()
+
+    report(args.data, args.k, args.method)
@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from bench_stats import percentile
+from server import DEFAULT_PORT
+
+# --- LOAD GENERATOR: SERVER ROUTING vs CLI PER PROSES ---
+# Mengirim query shortest path ke server.py (asyncio, graf hangat) dengan
+# sejumlah koneksi keep-alive paralel, lalu membandingkan throughput & latency
+# dengan cara lama: satu proses `python run.py --algo A --engine csr` per query.
+#
+# Workload:
+#   instances : start/end dari file query di data/ (diulang sampai --requests)
+#   random    : pasangan acak; --sources membatasi jumlah sumber berbeda
+#               sehingga efek batching/cache per sumber terlihat
+
+READY_TIMEOUT = 60.0
+
+
+def build_queries(instance_paths, n, mode, n_sources, seed):
+    """List (params query string, file instance untuk baseline CLI atau None)."""
+    rnd = random.Random(seed)
+    if mode == 'instances':
+        base = [f"instance={p.stem}" for p in instance_paths]
+        return [(base[i % len(base)], instance_paths[i % len(base)]) for i in range(n)]
+
+    from instance_io import load_instance_csr
+    _, csr = load_instance_csr(instance_paths[0])
+    sources = rnd.sample(range(csr.num_nodes), min(n_sources, csr.num_nodes))
+    return [(f"source={csr.to_osm(rnd.choice(sources))}&target={csr.to_osm(rnd.randrange(csr.num_nodes))}", None)
+            for _ in range(n)]
+
+
+# --- KLIEN HTTP ---
+async def _request(reader, writer, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        k, _, v = line.decode('latin-1').partition(':')
+        if k.strip().lower() == 'content-length':
+            length = int(v)
+    body = json.loads(await reader.readexactly(length))
+    return status, body
+
+
+async def _connect(host, port, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+
+async def run_load(host, port, unix, queries, concurrency, with_path):
+    """Kirim semua query lewat `concurrency` koneksi keep-alive. Mengembalikan (latency ms, durasi detik, error)."""
+    latencies, errors = [], []
+    it = iter(queries)
+    suffix = '&path=1' if with_path else ''
+
+    async def client():
+        reader, writer = await _connect(host, port, unix)
+        try:
+            for params, _ in it:  # iterator bersama: tiap koneksi mengambil query berikutnya
+                t0 = time.perf_counter()
+                status, body = await _request(reader, writer, f"/route?{params}{suffix}")
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+                if status != 200:
+                    errors.append(body.get('error'))
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - t0, errors
+
+
+async def fetch(host, port, unix, path):
+    reader, writer = await _connect(host, port, unix)
+    try:
+        return (await _request(reader, writer, path))[1]
+    finally:
+        writer.close()
+
+
+async def wait_ready(host, port, unix, proc):
+    deadline = time.perf_counter() + READY_TIMEOUT
+    while time.perf_counter() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError("server berhenti sebelum siap")
+        try:
+            return await fetch(host, port, unix, '/health')
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server tidak siap dalam batas waktu")
+
+
+# --- BASELINE: SATU PROSES run.py PER QUERY ---
+def run_cli(queries):
+    """Jalankan run.py per query (hanya query bertipe instance). Mengembalikan (latency ms, durasi detik)."""
+    latencies = []
+    t0 = time.perf_counter()
+    for _, inst_path in queries:
+        t1 = time.perf_counter()
+        out = subprocess.run([sys.executable, 'run.py', '--instance', str(inst_path), '--algo', 'A',
+                              '--engine', 'csr'], capture_output=True, text=True, check=True).stdout
+        latencies.append((time.perf_counter() - t1) * 1000.0)
+        if not re.search(r"Time_ms", out):
+            raise RuntimeError(f"output run.py tidak dikenali untuk {inst_path}")
+    return latencies, time.perf_counter() - t0
+
+
+def print_result(label, latencies, seconds):
+    n = len(latencies)
+    print(f"{label:<8}: {n:5d} query dalam {seconds:8.2f} s | {n / seconds:9.1f} query/s | "
+          f"p50 {percentile(latencies, 50):8.2f} ms | p95 {percentile(latencies, 95):8.2f} ms | "
+          f"p99 {percentile(latencies, 99):8.2f} ms")
+    return n / seconds
+
+
+def main():
+    p = argparse.ArgumentParser(description='Load generator: server routing vs run.py per proses')
+    p.add_argument('--data', default='data', help='Folder file query (instance)')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    p.add_argument('--unix', metavar='PATH', help='Hubungi server lewat Unix socket')
+    p.add_argument('--spawn', action='store_true', help='Jalankan server.py sendiri selama benchmark')
+    p.add_argument('--workers', type=int, help='Jumlah worker server (dengan --spawn)')
+    p.add_argument('--requests', type=int, default=500, help='Jumlah query ke server')
+    p.add_argument('--concurrency', type=int, default=8, help='Jumlah koneksi paralel')
+    p.add_argument('--workload', choices=['instances', 'random'], default='instances')
+    p.add_argument('--sources', type=int, default=10, help='Jumlah sumber berbeda (workload random)')
+    p.add_argument('--path', action='store_true', help='Minta jalur lengkap, bukan hanya jarak')
+    p.add_argument('--cli-requests', type=int, default=10,
+                   help='Jumlah query baseline run.py per proses (0 = lewati)')
+    p.add_argument('--seed', type=int, default=42)
+    args = p.parse_args()
+
+    instance_paths = sorted(Path(args.data).glob('*.json'))
+    if not instance_paths:
+        print(f"[ERROR] Tidak ada file query di {args.data}/")
+        return 1
+    queries = build_queries(instance_paths, args.requests, args.workload, args.sources, args.seed)
+
+    proc = None
+    if args.spawn:
+        cmd = [sys.executable, 'server.py', '--instance', str(instance_paths[0]), '--host', args.host,
+               '--port', str(args.port)]
+        if args.unix:
+            cmd += ['--unix', args.unix]
+        if args.workers:
+            cmd += ['--workers', str(args.workers)]
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+    try:
+        asyncio.run(wait_ready(args.host, args.port, args.unix, proc))
+        latencies, seconds, errors = asyncio.run(
+            run_load(args.host, args.port, args.unix, queries, args.concurrency, args.path))
+        stats = asyncio.run(fetch(args.host, args.port, args.unix, '/stats'))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"=== LOAD TEST: {len(queries)} query ({args.workload}), {args.concurrency} koneksi ===")
+    server_qps = print_result('Server', latencies, seconds)
+    lat, b = stats['latency'], stats['batching']
+    print(f"[INFO] Latency sisi server: p50 {lat['p50_ms']:.3f} ms | p90 {lat['p90_ms']:.3f} ms | "
+          f"p99 {lat['p99_ms']:.3f} ms")
+    print(f"[INFO] Batching: {b['requests']} request -> {b['searches']} pencarian "
+          f"({b['requests_per_search']:.2f} request/pencarian)")
+    if errors:
+        print(f"[WARN] {len(errors)} request gagal, contoh: {errors[0]}")
+
+    cli_queries = [q for q in queries if q[1] is not None][:args.cli_requests]
+    if cli_queries:
+        cli_lat, cli_seconds = run_cli(cli_queries)
+        cli_qps = print_result('CLI', cli_lat, cli_seconds)
+        print(f"[SUKSES] Throughput server {server_qps / cli_qps:.1f}x dibanding run.py per proses.")
+    elif args.cli_requests:
+        print("[INFO] Baseline CLI hanya untuk workload 'instances', dilewati.")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
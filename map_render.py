@@ -0,0 +1,183 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+from matplotlib.lines import Line2D
+
+# --- RENDER PETA JALAN (VEKTORISASI + CACHE BACKGROUND) ---
+# Jaringan jalan digambar sebagai SATU LineCollection dari array segmen
+# (numpy, shape (n, 2, 2)), bukan satu ax.plot (Line2D) per edge.
+# Untuk render massal, background (semua jalan) dirender sekali per peta ke
+# buffer Agg; tiap query cukup me-restore buffer tsb lalu menggambar overlay
+# rute (blitting), sehingga biaya per gambar hanya sebanding panjang rute.
+
+# Cache renderer per (kunci peta, parameter render) -> dipakai ulang antar instance
+_RENDERER_CACHE = {}
+
+
+def edge_segments(csr):
+    """
+    Array segmen (n, 2, 2) [[x1, y1], [x2, y2]] dari buffer CSR. Edge dua arah
+    (u->v dan v->u) cukup digambar sekali; edge ke node tanpa koordinat dibuang.
+    """
+    V = csr.num_nodes
+    offsets = np.asarray(csr.offsets, dtype=np.int64)
+    src = np.repeat(np.arange(V, dtype=np.int64), np.diff(offsets))
+    dst = np.asarray(csr.targets, dtype=np.int64)
+    pairs = np.unique(np.minimum(src, dst) * V + np.maximum(src, dst))
+    a, b = pairs // V, pairs % V
+
+    xs = np.asarray(csr.xs, dtype=np.float64)
+    ys = np.asarray(csr.ys, dtype=np.float64)
+    keep = np.isfinite(xs[a]) & np.isfinite(ys[a]) & np.isfinite(xs[b]) & np.isfinite(ys[b])
+    a, b = a[keep], b[keep]
+
+    segments = np.empty((len(a), 2, 2))
+    segments[:, 0, 0], segments[:, 0, 1] = xs[a], ys[a]
+    segments[:, 1, 0], segments[:, 1, 1] = xs[b], ys[b]
+    return segments
+
+
+def add_network(ax, csr, color='#d9d9d9', linewidth=0.8, segments=None):
+    """Tambahkan seluruh jaringan jalan ke axes sebagai satu LineCollection."""
+    if segments is None:
+        segments = edge_segments(csr)
+    lc = LineCollection(segments, colors=color, linewidths=linewidth, zorder=1)
+    ax.add_collection(lc)
+    ax.autoscale_view()
+    return lc
+
+
+def path_coords(csr, path_nodes):
+    """Koordinat (xs, ys) urutan node rute; node tanpa koordinat dilewati."""
+    xs, ys = np.asarray(csr.xs), np.asarray(csr.ys)
+    idx = np.asarray(path_nodes, dtype=np.int64)
+    px, py = xs[idx], ys[idx]
+    keep = np.isfinite(px) & np.isfinite(py)
+    return px[keep], py[keep]
+
+
+class MapRenderer:
+    """
+    Figure Agg off-screen dengan background jalan yang sudah dirasterisasi.
+    render() hanya menggambar rute, titik start/end dan judul di atasnya.
+    """
+
+    def __init__(self, csr, figsize=(8, 8), dpi=100, color='#e0e0e0', linewidth=0.5,
+                 route_color='red', route_width=2, marker_size=100, title_size=12):
+        self.dpi = dpi
+        self.route_color = route_color
+        self.route_width = route_width
+        self.marker_size = marker_size
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = ax = self.fig.add_subplot()
+        add_network(ax, csr, color=color, linewidth=linewidth)
+        # Kunci batas sumbu agar overlay tidak memicu autoscale
+        ax.set_xlim(ax.get_xlim())
+        ax.set_ylim(ax.get_ylim())
+        ax.axis('off')
+
+        # Layout dihitung dengan judul placeholder, lalu judul dikosongkan
+        # supaya tidak ikut terekam di background (posisinya tetap dihitung)
+        ax.set_title('placeholder', fontsize=title_size)
+        self.fig.tight_layout()
+        ax.title.set_text('')
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def render(self, path_x, path_y, title, output_file):
+        """Restore background, gambar overlay rute, simpan PNG ke output_file."""
+        ax = self.ax
+        self.canvas.restore_region(self.background)
+
+        overlay = []
+        if len(path_x):
+            overlay.append(ax.add_line(Line2D(path_x, path_y, color=self.route_color,
+                                              linewidth=self.route_width, label='Rute', zorder=2)))
+            overlay.append(ax.scatter(path_x[0], path_y[0], c='green', s=self.marker_size, zorder=3))
+            overlay.append(ax.scatter(path_x[-1], path_y[-1], c='blue', s=self.marker_size, zorder=3))
+        ax.title.set_text(title)
+
+        for artist in overlay:
+            ax.draw_artist(artist)
+        ax.draw_artist(ax.title)
+        imsave(output_file, np.asarray(self.canvas.buffer_rgba()), dpi=self.dpi)
+
+        for artist in overlay:
+            artist.remove()
+
+
+def get_renderer(key, csr, **params):
+    """MapRenderer untuk peta `key` (mis. hash graf); dibuat sekali lalu di-cache."""
+    cache_key = (key, tuple(sorted(params.items())))
+    renderer = _RENDERER_CACHE.get(cache_key)
+    if renderer is None:
+        renderer = MapRenderer(csr, **params)
+        _RENDERER_CACHE[cache_key] = renderer
+    return renderer
+
+
+def clear_cache():
+    _RENDERER_CACHE.clear()
+
+
+def add_isochrone(ax, csr, iso, cmap='plasma', linewidth=1.6, alpha=0.9):
+    """
+    Gambar pita isochrone di atas peta: ruas yang seluruhnya terjangkau diwarnai
+    menurut anggaran terkecil yang mencakup kedua ujungnya, ruas batas dipotong
+    sampai titik sisa anggaran (frac). Pita dalam digambar di atas pita luar,
+    semuanya di bawah rute (zorder < 2).
+    Mengembalikan handle legenda (satu per anggaran).
+    """
+    from matplotlib import colormaps
+
+    xs, ys = np.asarray(csr.xs, dtype=np.float64), np.asarray(csr.ys, dtype=np.float64)
+    nodes = np.frombuffer(iso.nodes, dtype=np.int32).astype(np.int64)
+    n_bands = len(iso.budgets)
+    band = np.full(csr.num_nodes, n_bands, dtype=np.int64)  # n_bands = tidak terjangkau
+    band[nodes] = np.searchsorted(np.asarray(iso.counts), np.arange(len(nodes)), side='right')
+
+    # Ruas penuh: kedua ujung terjangkau, pita = pita ujung yang lebih jauh
+    offsets = np.asarray(csr.offsets, dtype=np.int64)
+    src = np.repeat(np.arange(csr.num_nodes, dtype=np.int64), np.diff(offsets))
+    dst = np.asarray(csr.targets, dtype=np.int64)
+    edge_band = np.maximum(band[src], band[dst])
+    full = edge_band < n_bands
+
+    colors = colormaps[cmap](np.linspace(0.1, 0.85, n_bands))
+    handles = []
+    for k in reversed(range(n_bands)):
+        sel = full & (edge_band == k)
+        segs = [np.stack([np.column_stack([xs[src[sel]], ys[src[sel]]]),
+                          np.column_stack([xs[dst[sel]], ys[dst[sel]]])], axis=1)]
+        # Ruas batas anggaran k: dari u sampai u + frac * (v - u)
+        edge_u, edge_v, frac = (np.asarray(a) for a in iso.boundary[k])
+        if len(edge_u):
+            f = frac[:, None]
+            a = np.column_stack([xs[edge_u], ys[edge_u]])
+            b = np.column_stack([xs[edge_v], ys[edge_v]])
+            segs.append(np.stack([a, a + f * (b - a)], axis=1))
+        segs = np.concatenate(segs)
+        segs = segs[np.isfinite(segs).all(axis=(1, 2))]
+        ax.add_collection(LineCollection(segs, colors=[colors[k]], linewidths=linewidth, alpha=alpha,
+                                         zorder=1 + 0.9 * (n_bands - k) / n_bands))
+        handles.append(Line2D([], [], color=colors[k], linewidth=3,
+                              label=f"<= {iso.budgets[k] / 60:g} menit ({iso.counts[k]:,} node)"))
+    return handles[::-1]
+
+
+def add_routes(ax, csr, routes, best_cost, colors=('#1f77b4', '#ff7f0e', '#9467bd', '#2ca02c', '#8c564b'),
+               linewidth=2.2):
+    """
+    Gambar rute alternatif (list alternatives.Route) dengan warna berbeda, di
+    bawah rute utama (zorder < 2) dan di atas jaringan jalan. Label legenda
+    memuat selisih biaya terhadap rute terpendek (best_cost).
+    """
+    for i, route in enumerate(routes):
+        px, py = path_coords(csr, route.nodes)
+        ax.plot(px, py, c=colors[i % len(colors)], linewidth=linewidth, alpha=0.85,
+                zorder=1.95 - 0.01 * i,
+                label=f"Alternatif {i + 1} (+{route.cost / best_cost - 1:.1%})")
@@ -0,0 +1,496 @@
+import argparse
+import json
+import math
+import random
+import re
+from array import array
+from pathlib import Path
+
+from geo import haversine_m
+from graph_csr import write_binary
+from instance_io import GRAPH_SUBDIR, build_adjacency, save_graph, make_query
+
+# --- IMPORT OSM OFFLINE (TANPA osmnx / NetworkX / Overpass) ---
+# Sumber yang didukung:
+#   cache/<hash>.json  : respons Overpass yang di-cache osmnx (format JSON "elements")
+#   *.osm / *.osm.xml  : ekstrak OSM XML, dibaca streaming (iterparse, dua pass)
+#   *.osm.pbf / *.pbf  : ekstrak PBF, dua pass lewat pyosmium (opsional)
+#
+# Pipeline meniru graph_from_point(..., network_type='drive') + add_edge_speeds +
+# add_edge_travel_times milik osmnx, tetapi semua data antara disimpan di buffer
+# array kompak (bukan MultiDiGraph):
+#   1. pass way  : filter 'drive', simpan referensi node + atribut way
+#   2. pass node : koordinat HANYA untuk node yang dirujuk way terpilih
+#   3. segmen berarah (oneway / reverse / roundabout)
+#   4. potong ke bbox + buffer 500 m, ambil komponen terhubung (lemah) terbesar
+#   5. simplifikasi topologi (gabung node interstitial, aturan endpoint osmnx)
+#   6. potong ke bbox asli, komponen terbesar lagi
+#   7. kecepatan: rata-rata maxspeed per tipe highway, travel_time = panjang / kecepatan
+# Urutan iterasi selalu deterministik (urutan file + OSM ID terurut), sehingga
+# input yang sama menghasilkan file graf yang identik byte-per-byte.
+
+OUT_DIR = Path(__file__).resolve().parent / 'data' / 'osm'
+
+# Filter jaringan 'drive' (sama dengan osmnx 2.x)
+_EXCLUDED_HIGHWAY = re.compile(
+    r'abandoned|bridleway|bus_guideway|construction|corridor|cycleway|elevator|escalator|'
+    r'footway|no|path|pedestrian|planned|platform|proposed|raceway|razed|service|steps|track')
+_EXCLUDED_SERVICE = re.compile(r'alley|driveway|emergency_access|parking|parking_aisle|private')
+ONEWAY_VALUES = {'yes', 'true', '1', '-1', 'reverse', 'T', 'F'}
+REVERSED_VALUES = {'-1', 'reverse', 'T'}
+
+# Parser maxspeed osmnx: minimal 2 karakter angka, satuan opsional
+_MAXSPEED = re.compile(r'^([0-9][\.,0-9]+?)(?:[ ]?(?:km/h|kmh|kph|mph|knots))?$')
+MPH_TO_KPH = 1.60934
+FALLBACK_KPH = 50.0     # jika tidak ada satu pun maxspeed di seluruh graf
+
+BUFFER_M = 500.0        # buffer bbox sebelum simplifikasi (seperti osmnx)
+EARTH_RADIUS_M = 6371009.0
+
+
+def is_drivable(tags):
+    hwy = tags.get('highway')
+    if hwy is None or tags.get('area') == 'yes' or tags.get('access') == 'private':
+        return False
+    if _EXCLUDED_HIGHWAY.search(hwy):
+        return False
+    if tags.get('motor_vehicle') == 'no' or tags.get('motorcar') == 'no':
+        return False
+    return not (tags.get('service') and _EXCLUDED_SERVICE.search(tags['service']))
+
+
+def clean_maxspeed(value):
+    """String maxspeed -> km/jam (float), atau None jika tidak bisa diparse."""
+    m = _MAXSPEED.match(str(value).strip())
+    if m is None:
+        return None
+    speed = float(m.group(1).replace(',', '.'))
+    return speed * MPH_TO_KPH if 'mph' in str(value) else speed
+
+
+def bbox_from_point(lat, lon, dist):
+    """(north, south, east, west) persegi berjarak `dist` meter dari titik (rumus osmnx)."""
+    delta_lat = dist / EARTH_RADIUS_M * 180 / math.pi
+    delta_lon = delta_lat / math.cos(math.radians(lat))
+    return lat + delta_lat, lat - delta_lat, lon + delta_lon, lon - delta_lon
+
+
+# --- SUMBER DATA (generator way & node) ---
+def _overpass_elements(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['elements']
+
+
+def _xml_ways(path):
+    import xml.etree.ElementTree as ET
+    for _, elem in ET.iterparse(path, events=('end',)):
+        if elem.tag == 'way':
+            refs = [int(nd.get('ref')) for nd in elem.iter('nd')]
+            tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+            yield int(elem.get('id')), refs, tags
+            elem.clear()
+        elif elem.tag == 'node':
+            elem.clear()
+
+
+def _xml_nodes(path, wanted):
+    import xml.etree.ElementTree as ET
+    for _, elem in ET.iterparse(path, events=('end',)):
+        if elem.tag == 'node':
+            nid = int(elem.get('id'))
+            if nid in wanted:
+                yield nid, float(elem.get('lat')), float(elem.get('lon'))
+            elem.clear()
+        elif elem.tag == 'way':
+            elem.clear()
+
+
+def _pbf_ways(path):
+    try:
+        import osmium
+    except ImportError as e:
+        raise RuntimeError("Membaca .pbf membutuhkan paket 'osmium' (pip install osmium)") from e
+    # FileProcessor meng-stream objek satu per satu; data disalin sebelum objek berikutnya
+    for obj in osmium.FileProcessor(str(path), osmium.osm.WAY):
+        yield obj.id, [n.ref for n in obj.nodes], {t.k: t.v for t in obj.tags}
+
+
+def _pbf_nodes(path, wanted):
+    import osmium
+    for obj in osmium.FileProcessor(str(path), osmium.osm.NODE):
+        if obj.id in wanted:
+            yield obj.id, obj.location.lat, obj.location.lon
+
+
+def open_source(path):
+    """(iter_ways(), iter_nodes(wanted)) untuk file sumber sesuai ekstensinya."""
+    path = Path(path)
+    name = path.name.lower()
+    if name.endswith('.pbf'):
+        return (lambda: _pbf_ways(path)), (lambda wanted: _pbf_nodes(path, wanted))
+    if name.endswith('.osm') or name.endswith('.xml'):
+        return (lambda: _xml_ways(path)), (lambda wanted: _xml_nodes(path, wanted))
+    if name.endswith('.json'):
+        elements = _overpass_elements(path)
+        ways = lambda: ((e['id'], e['nodes'], e.get('tags', {})) for e in elements if e['type'] == 'way')
+        nodes = lambda wanted: ((e['id'], e['lat'], e['lon']) for e in elements
+                                if e['type'] == 'node' and e['id'] in wanted)
+        return ways, nodes
+    raise ValueError(f"Format sumber tidak dikenal: {path}")
+
+
+# --- LANGKAH 1-3: WAY, NODE, SEGMEN ---
+class _Segments:
+    """List edge berarah dalam buffer paralel (src/dst = indeks node kompak)."""
+
+    def __init__(self):
+        self.src = array('i')
+        self.dst = array('i')
+        self.length = array('d')
+        self.way = array('i')       # indeks way (segmen) / way pertama (edge hasil simplifikasi)
+        self.speed = array('d')     # maxspeed km/jam (nan = tidak ada), diisi saat simplifikasi
+
+    def __len__(self):
+        return len(self.src)
+
+    def select(self, keep):
+        out = _Segments()
+        for name in ('src', 'dst', 'length', 'way', 'speed'):
+            col = getattr(self, name)
+            if len(col):
+                setattr(out, name, array(col.typecode, (col[i] for i in range(len(keep)) if keep[i])))
+        return out
+
+
+def read_network(path):
+    """Pass way + pass node. Mengembalikan (osm_ids, lat, lon, ways) dalam bentuk kompak."""
+    iter_ways, iter_nodes = open_source(path)
+
+    index = {}                          # OSM ID -> indeks kompak
+    osm_ids = array('q')
+    refs, way_offsets = array('i'), array('q', [0])
+    way_oneway = array('b')             # 0 dua arah, 1 searah, -1 searah terbalik
+    way_highway, way_maxspeed = array('h'), array('d')
+    highway_codes = {}
+
+    for _, nodes, tags in iter_ways():
+        if len(nodes) < 2 or not is_drivable(tags):
+            continue
+        for nid in nodes:
+            idx = index.get(nid)
+            if idx is None:
+                idx = index[nid] = len(osm_ids)
+                osm_ids.append(nid)
+            refs.append(idx)
+        way_offsets.append(len(refs))
+
+        oneway = tags.get('oneway')
+        if oneway in ONEWAY_VALUES or tags.get('junction') == 'roundabout':
+            way_oneway.append(-1 if oneway in REVERSED_VALUES else 1)
+        else:
+            way_oneway.append(0)
+        way_highway.append(highway_codes.setdefault(tags['highway'], len(highway_codes)))
+        speed = clean_maxspeed(tags['maxspeed']) if 'maxspeed' in tags else None
+        way_maxspeed.append(math.nan if speed is None else speed)
+
+    lat = array('d', [math.nan]) * len(osm_ids)
+    lon = array('d', [math.nan]) * len(osm_ids)
+    for nid, y, x in iter_nodes(index):
+        i = index[nid]
+        lat[i], lon[i] = y, x
+
+    ways = {'refs': refs, 'offsets': way_offsets, 'oneway': way_oneway,
+            'highway': way_highway, 'maxspeed': way_maxspeed,
+            'highway_names': sorted(highway_codes, key=highway_codes.get)}
+    return osm_ids, lat, lon, ways
+
+
+def build_segments(lat, lon, ways):
+    """Segmen berarah antar node berurutan di setiap way (node tanpa koordinat dilewati)."""
+    seg = _Segments()
+    refs, offsets, oneway = ways['refs'], ways['offsets'], ways['oneway']
+    for w in range(len(oneway)):
+        for i in range(offsets[w], offsets[w + 1] - 1):
+            a, b = refs[i], refs[i + 1]
+            if a == b or math.isnan(lat[a]) or math.isnan(lat[b]):
+                continue
+            d = haversine_m(lat[a], lon[a], lat[b], lon[b])
+            direction = oneway[w]
+            if direction == -1:
+                a, b = b, a
+            seg.src.append(a)
+            seg.dst.append(b)
+            seg.length.append(d)
+            seg.way.append(w)
+            if direction == 0:
+                seg.src.append(b)
+                seg.dst.append(a)
+                seg.length.append(d)
+                seg.way.append(w)
+    return seg
+
+
+# --- LANGKAH 4 & 6: TRUNCATE + KOMPONEN TERBESAR ---
+def truncate_bbox(seg, lat, lon, bbox):
+    north, south, east, west = bbox
+    inside = bytearray(south <= lat[i] <= north and west <= lon[i] <= east for i in range(len(lat)))
+    return seg.select([inside[seg.src[i]] and inside[seg.dst[i]] for i in range(len(seg))])
+
+
+def largest_component(seg, n):
+    """Pertahankan edge di komponen terhubung lemah terbesar (union-find)."""
+    parent = array('i', range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    present = bytearray(n)
+    for i in range(len(seg)):
+        a, b = find(seg.src[i]), find(seg.dst[i])
+        present[seg.src[i]] = present[seg.dst[i]] = 1
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    size = {}
+    for v in range(n):
+        if present[v]:
+            r = find(v)
+            size[r] = size.get(r, 0) + 1
+    if not size:
+        return seg
+    # Seri ukuran diputus oleh akar terkecil -> deterministik
+    best = min(size, key=lambda r: (-size[r], r))
+    return seg.select([find(seg.src[i]) == best for i in range(len(seg))])
+
+
+# --- LANGKAH 5: SIMPLIFIKASI TOPOLOGI ---
+def simplify(seg, n, ways):
+    """
+    Gabungkan rantai node interstitial menjadi satu edge (panjang dijumlahkan).
+    Endpoint mengikuti osmnx: self-loop, tanpa edge masuk/keluar, atau tidak
+    tepat 2 tetangga berbeda dengan derajat 2 / 4. Siklus tanpa endpoint tidak diubah.
+    """
+    m = len(seg)
+    src, dst = seg.src, seg.dst
+    in_deg, out_deg = array('i', bytes(4 * n)), array('i', bytes(4 * n))
+    nb1, nb2 = array('i', [-1]) * n, array('i', [-1]) * n
+    many, self_loop = bytearray(n), bytearray(n)
+
+    def add_neighbor(u, v):
+        if u == v:
+            self_loop[u] = 1
+        elif nb1[u] in (-1, v):
+            nb1[u] = v
+        elif nb2[u] in (-1, v):
+            nb2[u] = v
+        else:
+            many[u] = 1
+
+    for i in range(m):
+        u, v = src[i], dst[i]
+        out_deg[u] += 1
+        in_deg[v] += 1
+        add_neighbor(u, v)
+        add_neighbor(v, u)
+
+    def is_endpoint(v):
+        if self_loop[v] or in_deg[v] == 0 or out_deg[v] == 0:
+            return True
+        two_neighbors = nb2[v] != -1 and not many[v]
+        return not (two_neighbors and in_deg[v] + out_deg[v] in (2, 4))
+
+    # Adjacency keluar segmen (counting sort per src)
+    start = array('q', bytes(8 * (n + 1)))
+    for i in range(m):
+        start[src[i] + 1] += 1
+    for v in range(n):
+        start[v + 1] += start[v]
+    fill = array('q', start[:n])
+    out = array('i', bytes(4 * m))
+    for i in range(m):
+        out[fill[src[i]]] = i
+        fill[src[i]] += 1
+
+    maxspeed = ways['maxspeed']
+    used = bytearray(m)
+    edges = _Segments()
+
+    def emit(path):
+        first = path[0]
+        speeds = sorted({maxspeed[seg.way[i]] for i in path if not math.isnan(maxspeed[seg.way[i]])})
+        edges.src.append(src[first])
+        edges.dst.append(dst[path[-1]])
+        edges.length.append(sum(seg.length[i] for i in path))
+        edges.way.append(seg.way[first])
+        edges.speed.append(sum(speeds) / len(speeds) if speeds else math.nan)
+
+    for u in range(n):
+        if in_deg[u] + out_deg[u] == 0 or not is_endpoint(u):
+            continue
+        for k in range(start[u], start[u + 1]):
+            s = out[k]
+            if used[s]:
+                continue
+            used[s] = 1
+            path, prev, cur = [s], u, dst[s]
+            while not is_endpoint(cur):
+                nxt = -1
+                for j in range(start[cur], start[cur + 1]):
+                    t = out[j]
+                    if not used[t] and (nxt == -1 or dst[t] != prev):
+                        nxt = t
+                        if dst[t] != prev:
+                            break
+                if nxt == -1:
+                    break
+                used[nxt] = 1
+                path.append(nxt)
+                prev, cur = cur, dst[nxt]
+            emit(path)
+
+    # Sisa segmen = siklus murni tanpa endpoint, disalin apa adanya
+    for i in range(m):
+        if not used[i]:
+            emit([i])
+    return edges
+
+
+# --- LANGKAH 7: KECEPATAN & TRAVEL TIME ---
+def travel_times(edges, ways):
+    """Imputasi kecepatan per tipe highway (rata-rata maxspeed), lalu detik tempuh per edge."""
+    highway = ways['highway']
+    sums, counts = {}, {}
+    for i in range(len(edges)):
+        h, sp = highway[edges.way[i]], edges.speed[i]
+        sums.setdefault(h, 0.0)
+        counts.setdefault(h, 0)
+        if not math.isnan(sp):
+            sums[h] += sp
+            counts[h] += 1
+    hwy_avg = {h: sums[h] / counts[h] for h in sums if counts[h]}
+    fallback = sum(hwy_avg.values()) / len(hwy_avg) if hwy_avg else FALLBACK_KPH
+
+    times = array('d')
+    for i in range(len(edges)):
+        sp = edges.speed[i]
+        if math.isnan(sp):
+            sp = hwy_avg.get(highway[edges.way[i]], fallback)
+        times.append(edges.length[i] / (sp * 1000 / 3600))
+    return times
+
+
+def import_osm(path, point=None, dist=None):
+    """
+    Jalankan pipeline penuh. Mengembalikan (node_ids terurut, lat, lon, src, dst, weight)
+    dengan indeks node 0..V-1 mengikuti urutan OSM ID; edge paralel -> bobot minimum.
+    """
+    osm_ids, lat, lon, ways = read_network(path)
+    n = len(osm_ids)
+    seg = build_segments(lat, lon, ways)
+
+    bbox = None
+    if point is not None and dist is not None:
+        bbox = bbox_from_point(point[0], point[1], dist)
+        north, south, east, west = bbox
+        d_lat = BUFFER_M / EARTH_RADIUS_M * 180 / math.pi
+        d_lon = d_lat / math.cos(math.radians(point[0]))
+        seg = truncate_bbox(seg, lat, lon, (north + d_lat, south - d_lat, east + d_lon, west - d_lon))
+    seg = largest_component(seg, n)
+    edges = simplify(seg, n, ways)
+    if bbox is not None:
+        edges = truncate_bbox(edges, lat, lon, bbox)
+        edges = largest_component(edges, n)
+    weights = travel_times(edges, ways)
+
+    # Node akhir = semua ujung edge, diurutkan menurut OSM ID
+    used = sorted({edges.src[i] for i in range(len(edges))} | {edges.dst[i] for i in range(len(edges))},
+                  key=osm_ids.__getitem__)
+    remap = {old: new for new, old in enumerate(used)}
+    best = {}
+    for i in range(len(edges)):
+        key = (remap[edges.src[i]], remap[edges.dst[i]])
+        w = weights[i]
+        if key not in best or w < best[key]:
+            best[key] = w
+    order = sorted(best)
+    return (array('q', (osm_ids[v] for v in used)), array('d', (lat[v] for v in used)),
+            array('d', (lon[v] for v in used)),
+            array('i', (k[0] for k in order)), array('i', (k[1] for k in order)),
+            array('d', (best[k] for k in order)))
+
+
+# --- OUTPUT ---
+def save_json(out_dir, node_ids, lat, lon, src, dst, weight, meta):
+    nodes = {node_ids[i]: {'y': lat[i], 'x': lon[i]} for i in range(len(node_ids))}
+    edges = ((node_ids[src[i]], node_ids[dst[i]], weight[i]) for i in range(len(src)))
+    return save_graph(out_dir, nodes, build_adjacency(edges, node_ids), meta)
+
+
+def save_bin(out_dir, node_ids, lat, lon, src, dst, weight, meta):
+    import hashlib
+    import sys
+    n, e = len(node_ids), len(src)
+    offsets = array('q', bytes(8 * (n + 1)))
+    for u in src:
+        offsets[u + 1] += 1
+    for u in range(n):
+        offsets[u + 1] += offsets[u]
+    columns = {'offsets': offsets, 'node_ids': node_ids, 'xs': lon, 'ys': lat,
+               'weights': weight, 'targets': dst}
+    if sys.byteorder != 'little':
+        for col in columns.values():
+            col.byteswap()
+    sha = hashlib.sha1(f"{n}:{e}".encode('ascii'))
+    for name in ('offsets', 'node_ids', 'xs', 'ys', 'weights', 'targets'):
+        sha.update(columns[name].tobytes())
+    h = sha.hexdigest()
+
+    graph_dir = Path(out_dir) / GRAPH_SUBDIR
+    graph_dir.mkdir(parents=True, exist_ok=True)
+    write_binary(graph_dir / f"{h}.bin", n, e, columns, h)
+    with open(graph_dir / f"{h}.meta.json", 'w', encoding='utf-8') as f:
+        json.dump({'hash': h, 'meta': meta}, f, indent=2)
+    return h, graph_dir / f"{h}.json"
+
+
+def write_queries(out_dir, graph_h, graph_path, node_ids, num_edges, count, seed=42, prefix='osm_route'):
+    rnd = random.Random(seed)
+    nodes_list = list(node_ids)
+    for i in range(1, count + 1):
+        start = rnd.choice(nodes_list)
+        end = rnd.choice(nodes_list)
+        while start == end:
+            end = rnd.choice(nodes_list)
+        name = Path(out_dir) / f'{prefix}_G{i:02d}.json'
+        meta = {'start_node': start, 'end_node': end, 'total_nodes': len(nodes_list), 'total_edges': num_edges}
+        with open(name, 'w', encoding='utf-8') as f:
+            json.dump(make_query('shortest_path_osm', graph_h, graph_path, name, meta), f,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Import graf jalan dari cache Overpass / ekstrak .osm / .pbf (offline)')
+    p.add_argument('source', help='cache/<hash>.json, file .osm, atau .osm.pbf')
+    p.add_argument('--point', nargs=2, type=float, metavar=('LAT', 'LON'),
+                   help='Pusat area (seperti ox.graph_from_point); tanpa ini seluruh ekstrak dipakai')
+    p.add_argument('--dist', type=float, default=2000, help='Jarak bbox dari --point (meter)')
+    p.add_argument('--out', default=str(OUT_DIR), help='Folder output (query + graphs/)')
+    p.add_argument('--format', choices=['json', 'bin'], default='json',
+                   help='json = graf master biasa, bin = langsung file .bin (region besar, engine csr)')
+    p.add_argument('--queries', type=int, default=15, help='Jumlah file query acak (0 = tidak ada)')
+    p.add_argument('--seed', type=int, default=42)
+    args = p.parse_args()
+
+    node_ids, lat, lon, src, dst, weight = import_osm(args.source, args.point, args.dist if args.point else None)
+    meta = {'source': Path(args.source).name, 'total_nodes': len(node_ids), 'total_edges': len(src)}
+    if args.point:
+        meta.update({'point': args.point, 'dist': args.dist})
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    saver = save_json if args.format == 'json' else save_bin
+    graph_h, graph_path = saver(args.out, node_ids, lat, lon, src, dst, weight, meta)
+    print(f"[SUKSES] V={len(node_ids)} E={len(src)} -> {graph_path.with_suffix('.' + args.format)}")
+    if args.queries:
+        write_queries(args.out, graph_h, graph_path, node_ids, len(src), args.queries, args.seed)
+        print(f"[SUKSES] {args.queries} query ditulis ke {args.out}")
@@ -45,11 +45,19 @@ def generate_advanced_plots():
     
     # Scatter plot: Titik-titik data
     sns.scatterplot(data=df, x='visited', y='time_ms', hue='algo', style='algo', s=100, palette='deep')
+
+    # Error bar vertikal = CI 95% median waktu (kolom dari run_batch --repeat)
+    if {'time_ci_low_ms', 'time_ci_high_ms'} <= set(df.columns):
+        plt.errorbar(df['visited'], df['time_ms'],
+                     yerr=[df['time_ms'] - df['time_ci_low_ms'], df['time_ci_high_ms'] - df['time_ms']],
+                     fmt='none', ecolor='gray', elinewidth=1, capsize=3, alpha=0.7)
     
     # Tambahkan garis regresi (tren) tipis untuk memperjelas arah
     # (Opsional: Matikan ci=None jika ingin melihat area confidence)
     sns.regplot(data=df[df['algo']=='Array'], x='visited', y='time_ms', scatter=False, color='orange', label='Tren Array (Linear/Quad)', ci=None)
     sns.regplot(data=df[df['algo']=='Heap'], x='visited', y='time_ms', scatter=False, color='blue', label='Tren Heap (Log/Flat)', ci=None)
+    if 'Bidir' in df['algo'].unique():
+        sns.regplot(data=df[df['algo']=='Bidir'], x='visited', y='time_ms', scatter=False, color='green', label='Tren Bidirectional', ci=None)
 
     plt.title('Scatter Plot: Hubungan Beban Kerja (Visited) vs Waktu', fontsize=14, fontweight='bold')
     plt.xlabel('Jumlah Node yang Dikunjungi (Visited)', fontsize=12)
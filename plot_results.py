@@ -8,6 +8,24 @@ import sys
 RESULTS_DIR = Path('results')
 DATA_FILE = RESULTS_DIR / 'experiment_results.csv'
 
+def add_error_bars(ax, df, value_col, low_col, high_col):
+    """
+    Gambar error bar asimetris di atas barplot seaborn (hue = algo).
+    Bar dicocokkan lewat urutan kategori sumbu x dan urutan hue di legenda.
+    """
+    instances = [t.get_text() for t in ax.get_xticklabels()]
+    algos = list(df['algo'].unique())
+    rows = df.set_index(['instance', 'algo'])
+    for algo, container in zip(algos, ax.containers):
+        for instance, bar in zip(instances, container):
+            if (instance, algo) not in rows.index:
+                continue
+            row = rows.loc[(instance, algo)]
+            x = bar.get_x() + bar.get_width() / 2
+            y = row[value_col]
+            ax.errorbar(x, y, yerr=[[y - row[low_col]], [row[high_col] - y]],
+                        fmt='none', ecolor='black', elinewidth=1, capsize=2)
+
 def generate_plots():
     print("=== MEMULAI PEMBUATAN GRAFIK ===")
     
@@ -38,7 +56,11 @@ def generate_plots():
         plt.figure(figsize=(12, 6))
         
         # Barplot membandingkan Waktu Heap vs Array
-        sns.barplot(data=df, x='instance', y='time_ms', hue='algo', palette='viridis')
+        ax = sns.barplot(data=df, x='instance', y='time_ms', hue='algo', palette='viridis')
+
+        # Error bar = CI 95% median dari repetisi (jika CSV berasal dari run_batch --repeat)
+        if {'time_ci_low_ms', 'time_ci_high_ms'} <= set(df.columns):
+            add_error_bars(ax, df, 'time_ms', 'time_ci_low_ms', 'time_ci_high_ms')
         
         # PENTING: Gunakan Skala Logaritmik (Log Scale)
         # Karena Array (200ms) jauh lebih besar dari Heap (5ms). 
@@ -46,7 +68,7 @@ def generate_plots():
         plt.yscale('log') 
         
         plt.title('Perbandingan Waktu Eksekusi: Heap vs Array (Skala Log)', fontsize=14, fontweight='bold')
-        plt.ylabel('Waktu (ms) - Log Scale', fontsize=12)
+        plt.ylabel('Waktu Median (ms) - Log Scale', fontsize=12)
         plt.xlabel('Instance (Kasus Uji)', fontsize=12)
         plt.xticks(rotation=45, ha='right')
         plt.legend(title="Algoritma")
@@ -125,5 +147,32 @@ def generate_plots():
     except Exception as e:
         print(f"[ERROR] Gagal membuat plot memori: {e}")
 
+    # =========================================================
+    # GAMBAR 4: PLOT VISITED (plot_visited_reduction.png)
+    # Berapa node yang di-settle tiap algoritma (Heap vs Bidirectional)
+    # =========================================================
+    try:
+        if 'visited' in df.columns and 'Bidir' in df['algo'].unique():
+            plt.figure(figsize=(12, 6))
+            sns.barplot(data=df, x='instance', y='visited', hue='algo', palette='muted')
+
+            pivot_vis = df.pivot(index='instance', columns='algo', values='visited')
+            reduction = 100.0 * (1 - pivot_vis['Bidir'] / pivot_vis['Heap'])
+
+            plt.title(f'Jumlah Node yang Di-settle (Bidir rata-rata {reduction.mean():.1f}% lebih sedikit dari Heap)',
+                      fontsize=14, fontweight='bold')
+            plt.ylabel('Visited (node)', fontsize=12)
+            plt.xlabel('Instance', fontsize=12)
+            plt.xticks(rotation=45, ha='right')
+            plt.legend(title="Algoritma")
+            plt.tight_layout()
+
+            out_vis = RESULTS_DIR / 'plot_visited_reduction.png'
+            plt.savefig(out_vis, dpi=300)
+            print(f"[SUKSES] Grafik Visited disimpan di: {out_vis.name}")
+            plt.close()
+    except Exception as e:
+        print(f"[ERROR] Gagal membuat plot visited: {e}")
+
 if __name__ == "__main__":
     generate_plots()
\ No newline at end of file
@@ -34,11 +34,13 @@ def generate_scalability_plot():
     # 4. Analisis Titik Divergensi (Kapan mulai beda jauh?)
     # Kita cari titik di mana Array mulai lebih lambat > 10ms dari Heap
     # Pivot dulu biar mudah dibandingkan
-    pivot = df_sorted.pivot(index='visited', columns='algo', values='time_ms')
-    pivot['diff'] = pivot['Array'] - pivot['Heap']
-    
-    # Cari titik pertama di mana bedanya signifikan (> 10ms)
-    divergence_point = pivot[pivot['diff'] > 10].iloc[0] if not pivot[pivot['diff'] > 10].empty else None
+    pivot = df_sorted.pivot_table(index='visited', columns='algo', values='time_ms')
+    divergence_point = None
+    if {'Array', 'Heap'} <= set(pivot.columns):
+        pivot['diff'] = pivot['Array'] - pivot['Heap']
+
+        # Cari titik pertama di mana bedanya signifikan (> 10ms)
+        divergence_point = pivot[pivot['diff'] > 10].iloc[0] if not pivot[pivot['diff'] > 10].empty else None
     
     if divergence_point is not None:
         x_div = divergence_point.name # Nilai visited
@@ -65,5 +67,37 @@ def generate_scalability_plot():
     plt.savefig(output_path, dpi=300)
     print(f"[SUKSES] Grafik tersimpan di: {output_path}")
 
+def generate_nodes_plot():
+    """
+    Waktu vs ukuran graf (V) -- hanya bermakna jika CSR berisi beberapa ukuran
+    graf, misalnya hasil run_batch --data data/synthetic (generate_synthetic.py).
+    """
+    if not DATA_FILE.exists():
+        return
+    df = pd.read_csv(DATA_FILE)
+    if df['n_nodes'].nunique() < 2:
+        print("[INFO] Semua instance berukuran sama; plot waktu vs V dilewati.")
+        return
+
+    # Median antar query pada ukuran graf yang sama
+    agg = df.groupby(['n_nodes', 'algo'], as_index=False)['time_ms'].median()
+
+    sns.set_theme(style="whitegrid")
+    plt.figure(figsize=(12, 7))
+    sns.lineplot(data=agg, x='n_nodes', y='time_ms', hue='algo', style='algo',
+                 markers=True, dashes=False, linewidth=2.5, markersize=8)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.title('Skalabilitas: Waktu Median per Query vs Ukuran Graf (log-log)', fontsize=14, fontweight='bold')
+    plt.xlabel('Jumlah Node Graf (V)', fontsize=12)
+    plt.ylabel('Waktu Eksekusi Median (ms)', fontsize=12)
+    plt.legend(title='Algoritma', loc='upper left')
+
+    output_path = RESULTS_DIR / 'plot_scalability_nodes.png'
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=300)
+    print(f"[SUKSES] Grafik tersimpan di: {output_path}")
+
 if __name__ == "__main__":
-    generate_scalability_plot()
\ No newline at end of file
+    generate_scalability_plot()
+    generate_nodes_plot()
\ No newline at end of file
@@ -0,0 +1,320 @@
+import argparse
+import heapq
+import time
+
+# --- PRIORITY QUEUE BACKEND UNTUK DIJKSTRA ---
+# Semua backend memakai antarmuka yang sama:
+#   push(node, key)  -> insert, atau decrease-key jika node sudah ada
+#   pop()            -> (key, node) dengan key terkecil
+#   len(q)           -> jumlah entri (termasuk entri basi pada backend lazy)
+# Backend "lazy" boleh mengembalikan entri basi (key > jarak terbaru);
+# driver Dijkstra cukup melewatinya seperti Lazy Deletion di algo_A_Heap.
+# Tie-break semua backend berbasis heap = (key, node), sama seperti heapq.
+
+
+class LazyBinaryHeap:
+    """heapq + entri duplikat (perilaku algo_A_Heap saat ini)."""
+
+    lazy = True
+
+    def __init__(self, n=0, **_):
+        self.heap = []
+
+    def push(self, node, key):
+        heapq.heappush(self.heap, (key, node))
+
+    def pop(self):
+        return heapq.heappop(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class IndexedBinaryHeap:
+    """Binary heap dengan indeks posisi per node -> decrease-key sejati, tanpa duplikat."""
+
+    lazy = False
+
+    def __init__(self, n, **_):
+        self.heap = []              # node
+        self.keys = [0.0] * n       # key per node
+        self.pos = [-1] * n         # posisi node di heap, -1 = tidak ada
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _less(self, a, b):
+        ka, kb = self.keys[a], self.keys[b]
+        return ka < kb or (ka == kb and a < b)
+
+    def _sift_up(self, i):
+        heap, pos, less = self.heap, self.pos, self._less
+        node = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            p = heap[parent]
+            if not less(node, p):
+                break
+            heap[i] = p
+            pos[p] = i
+            i = parent
+        heap[i] = node
+        pos[node] = i
+
+    def _sift_down(self, i):
+        heap, pos, less = self.heap, self.pos, self._less
+        n = len(heap)
+        node = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and less(heap[right], heap[child]):
+                child = right
+            c = heap[child]
+            if not less(c, node):
+                break
+            heap[i] = c
+            pos[c] = i
+            i = child
+        heap[i] = node
+        pos[node] = i
+
+    def push(self, node, key):
+        i = self.pos[node]
+        if i < 0:
+            self.keys[node] = key
+            self.heap.append(node)
+            self._sift_up(len(self.heap) - 1)
+        elif key < self.keys[node]:
+            self.keys[node] = key
+            self._sift_up(i)
+
+    def pop(self):
+        heap = self.heap
+        root = heap[0]
+        last = heap.pop()
+        self.pos[root] = -1
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return self.keys[root], root
+
+
+class PairingHeap:
+    """Pairing heap; decrease-key O(1) amortized lewat handle per node."""
+
+    lazy = False
+    # Handle node: [key, node, child, sibling, prev]
+    KEY, ITEM, CHILD, SIB, PREV = range(5)
+
+    def __init__(self, n, **_):
+        self.root = None
+        self.handles = [None] * n
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def _meld(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if (b[0], b[1]) < (a[0], a[1]):
+            a, b = b, a
+        # b menjadi anak pertama a
+        b[4] = a
+        b[3] = a[2]
+        if a[2] is not None:
+            a[2][4] = b
+        a[2] = b
+        a[3] = None
+        a[4] = None
+        return a
+
+    def push(self, node, key):
+        h = self.handles[node]
+        if h is None:
+            h = [key, node, None, None, None]
+            self.handles[node] = h
+            self.root = self._meld(self.root, h)
+            self.size += 1
+            return
+        if key >= h[0]:
+            return
+        h[0] = key
+        if h is self.root:
+            return
+        # Potong subtree h dari parent/sibling lalu meld ke root
+        prev, sib = h[4], h[3]
+        if prev[2] is h:
+            prev[2] = sib
+        else:
+            prev[3] = sib
+        if sib is not None:
+            sib[4] = prev
+        h[3] = h[4] = None
+        self.root = self._meld(self.root, h)
+
+    def pop(self):
+        root = self.root
+        self.handles[root[1]] = None
+        self.size -= 1
+
+        # Two-pass merge anak-anak root
+        pairs = []
+        child = root[2]
+        while child is not None:
+            a = child
+            b = a[3]
+            child = b[3] if b is not None else None
+            a[3] = a[4] = None
+            if b is not None:
+                b[3] = b[4] = None
+            pairs.append(self._meld(a, b))
+        merged = None
+        for h in reversed(pairs):
+            merged = self._meld(h, merged)
+        self.root = merged
+        return root[0], root[1]
+
+
+class BucketQueue:
+    """
+    Bucket queue ala Dial: key dikelompokkan ke bucket selebar `width`
+    (default = bobot edge positif terkecil). Karena Dijkstra monoton, semua key
+    aktif berada dalam rentang [min, min + max_weight], jadi cukup array
+    bucket melingkar. Tiap bucket berisi heap kecil sehingga urutan pop tetap
+    eksak (tidak ada kuantisasi jarak) dan aman untuk bobot float maupun 0.
+    Untuk bobot integer dengan width=1 ini persis algoritma Dial.
+    """
+
+    lazy = True
+    MAX_BUCKETS = 1 << 16
+
+    def __init__(self, n=0, width=1.0, max_weight=1.0, **_):
+        width = max(width, max_weight / self.MAX_BUCKETS, 1e-12)
+        self.width = width
+        self.nb = int(max_weight / width) + 2
+        self.buckets = [[] for _ in range(self.nb)]
+        self.cursor = 0     # indeks bucket absolut dengan key terkecil
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, node, key):
+        b = int(key / self.width)
+        if b < self.cursor:
+            self.cursor = b
+        heapq.heappush(self.buckets[b % self.nb], (key, node))
+        self.size += 1
+
+    def pop(self):
+        buckets, nb = self.buckets, self.nb
+        cur = self.cursor
+        while not buckets[cur % nb]:
+            cur += 1
+        self.cursor = cur
+        self.size -= 1
+        return heapq.heappop(buckets[cur % nb])
+
+
+class LinearArrayQueue:
+    """Scan linear O(V) seperti algo_B_Array (dict node -> key, min via C-level scan)."""
+
+    lazy = False
+
+    def __init__(self, n=0, **_):
+        self.keys = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def push(self, node, key):
+        old = self.keys.get(node)
+        if old is None or key < old:
+            self.keys[node] = key
+
+    def pop(self):
+        keys = self.keys
+        node = min(keys, key=keys.__getitem__)
+        return keys.pop(node), node
+
+
+BACKENDS = {
+    'lazy': LazyBinaryHeap,
+    'indexed': IndexedBinaryHeap,
+    'pairing': PairingHeap,
+    'bucket': BucketQueue,
+    'linear': LinearArrayQueue,
+}
+
+
+def make_queue(name, csr):
+    """Buat backend untuk graf ini (BucketQueue butuh statistik bobot, di-cache pada csr)."""
+    cls = BACKENDS[name]
+    if cls is BucketQueue:
+        stats = getattr(csr, '_weight_stats', None)
+        if stats is None:
+            positive = [w for w in csr.weights if w > 0]
+            stats = (min(positive) if positive else 1.0, max(csr.weights, default=1.0))
+            csr._weight_stats = stats
+        return cls(csr.num_nodes, width=stats[0], max_weight=stats[1])
+    return cls(csr.num_nodes)
+
+
+# --- BENCHMARK SIDE-BY-SIDE ---
+def benchmark(data_dir, backends, repeat):
+    from pathlib import Path
+    from instance_io import load_instance_csr
+    from run import algo_PQ_CSR
+
+    files = sorted(Path(data_dir).glob('*.json'))
+    if not files:
+        print(f"[ERROR] Tidak ada file .json di folder {data_dir}")
+        return
+
+    print("=== BENCHMARK PRIORITY QUEUE (Dijkstra CSR) ===")
+    header = f"{'Instance':<20} | " + " | ".join(f"{b:>9}" for b in backends)
+    print("-" * len(header))
+    print(header + "   (ms, median dari repetisi)")
+    print("-" * len(header))
+
+    totals = {b: 0.0 for b in backends}
+    for json_file in files:
+        inst, csr = load_instance_csr(json_file)
+        reference = None
+        cells = []
+        for b in backends:
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                dist, _ = algo_PQ_CSR(inst, csr, b)
+                times.append((time.perf_counter() - t0) * 1000.0)
+            if reference is None:
+                reference = dist
+            elif abs(dist - reference) > 1e-9 * max(1.0, reference):
+                print(f"[ERROR] {json_file.name}: backend {b} menghasilkan {dist}, bukan {reference}")
+            med = sorted(times)[len(times) // 2]
+            totals[b] += med
+            cells.append(f"{med:9.3f}")
+        print(f"{json_file.name:<20} | " + " | ".join(cells))
+
+    print("-" * len(header))
+    print(f"{'TOTAL':<20} | " + " | ".join(f"{totals[b]:9.3f}" for b in backends))
+    fastest = min(totals, key=totals.get)
+    print(f"\nBackend tercepat: {fastest}")
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Benchmark backend priority queue untuk Dijkstra')
+    p.add_argument('--data', default='data', help='Folder instance')
+    p.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS))
+    p.add_argument('--repeat', type=int, default=5)
+    args = p.parse_args()
+
+    benchmark(args.data, args.backends, max(1, args.repeat))
@@ -0,0 +1,295 @@
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+from bench_stats import percentile
+
+# --- REGRESSION GATE: BASELINE vs RUN BARU ---
+# Baseline disimpan per mesin & revisi git:
+#   results/baselines/<fingerprint mesin>/<revisi>_<engine>.json
+# Isinya sampel waktu mentah + peak memory per (instance, algoritma), sehingga
+# run berikutnya bisa dibandingkan dengan uji Mann-Whitney U (satu sisi:
+# "run baru lebih lambat"). Sebuah pasangan dianggap regresi bila:
+#   waktu  : median naik > threshold DAN p-value < alpha
+#   memori : peak naik > threshold (tracemalloc deterministik, tanpa uji)
+# Baseline dari mesin lain tidak pernah dipakai: angka lintas mesin tidak sebanding.
+# Folder instance (data_dir) ikut dicatat; baseline hanya cocok untuk folder yang sama.
+
+BASELINE_DIR = Path('results') / 'baselines'
+DATA_DIR = 'data'
+
+TIME_THRESHOLD = 0.10
+MEM_THRESHOLD = 0.10
+ALPHA = 0.05
+
+# Di bawah batas ini distribusi U dihitung eksak, di atasnya pakai aproksimasi normal
+EXACT_LIMIT = 400
+
+
+def machine_fingerprint():
+    """(hash pendek, detail) dari CPU, OS, versi Python & jumlah core."""
+    info = {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'cpu_count': os.cpu_count(),
+    }
+    raw = json.dumps(info, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:12], info
+
+
+def git_revision():
+    """Revisi git pendek (+ '-dirty' jika ada perubahan belum di-commit); 'unknown' tanpa git."""
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{rev}-dirty" if dirty else rev
+
+
+# --- UJI MANN-WHITNEY U ---
+def _ranks(values):
+    """Rank rata-rata (1-based) untuk nilai kembar + jumlah (t^3 - t) untuk koreksi tie."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    tie_term = 0.0
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        avg = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = avg
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    return ranks, tie_term
+
+
+def _exact_upper_tail(u, n1, n2):
+    """P(U >= u) eksak di bawah H0 (tanpa tie), DP jumlah susunan per nilai U."""
+    # counts[i][j] = list frekuensi U untuk sampel berukuran (i, j)
+    prev = [[1] for _ in range(n2 + 1)]
+    for i in range(1, n1 + 1):
+        cur = [[1]]
+        for j in range(1, n2 + 1):
+            # Elemen terbesar dari sampel 1 (menambah j ke U) atau dari sampel 2
+            a, b = prev[j], cur[j - 1]
+            size = max(len(a) + j, len(b))
+            freq = [0] * size
+            for k, c in enumerate(a):
+                freq[k + j] += c
+            for k, c in enumerate(b):
+                freq[k] += c
+            cur.append(freq)
+        prev = cur
+    freq = prev[n2]
+    total = sum(freq)
+    start = math.ceil(u - 1e-9)
+    return sum(freq[start:]) / total
+
+
+def mann_whitney_greater(new, old):
+    """
+    p-value satu sisi H1: sampel `new` cenderung lebih besar dari `old`.
+    Eksak untuk sampel kecil tanpa tie, selain itu aproksimasi normal
+    dengan koreksi tie dan koreksi kontinuitas.
+    """
+    n1, n2 = len(new), len(old)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    ranks, tie_term = _ranks(list(new) + list(old))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+    if tie_term == 0 and n1 * n2 <= EXACT_LIMIT:
+        return _exact_upper_tail(u, n1, n2)
+
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    var = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(var)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# --- PENYIMPANAN BASELINE ---
+def _entries(results, samples):
+    """Gabungkan baris hasil (list dict) + sampel mentah menjadi entri baseline."""
+    times = {}
+    for s in samples:
+        times.setdefault((s['instance'], s['algo']), []).append(s['time_ms'])
+    return [{
+        'instance': r['instance'], 'algo': r['algo'], 'memory_mb': r['memory_mb'],
+        'visited': r['visited'], 'result': r['result'],
+        'time_samples': times.get((r['instance'], r['algo']), [r['time_ms']]),
+    } for r in results]
+
+
+def _norm_dir(data_dir):
+    return os.path.normpath(str(data_dir))
+
+
+def save_baseline(results, samples, engine, data_dir=DATA_DIR, base_dir=BASELINE_DIR):
+    fp, info = machine_fingerprint()
+    rev = git_revision()
+    path = Path(base_dir) / fp / f"{rev}_{engine}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'fingerprint': fp, 'machine': info, 'revision': rev, 'engine': engine, 'data_dir': _norm_dir(data_dir),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'entries': _entries(results, samples),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    return path
+
+
+def find_baseline(engine, revision=None, data_dir=DATA_DIR, base_dir=BASELINE_DIR):
+    """
+    Path baseline mesin ini untuk engine & folder instance tsb: revisi tertentu,
+    atau yang terbaru. Baseline lama tanpa 'data_dir' dianggap dari folder default.
+    """
+    fp, _ = machine_fingerprint()
+    folder = Path(base_dir) / fp
+    if revision:
+        candidates = [folder / f"{revision}_{engine}.json"]
+    else:
+        candidates = sorted(folder.glob(f"*_{engine}.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in candidates:
+        if path.exists() and load_baseline(path).get('data_dir', _norm_dir(DATA_DIR)) == _norm_dir(data_dir):
+            return path
+    return None
+
+
+def load_baseline(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# --- PERBANDINGAN ---
+def compare(baseline, results, samples, time_threshold=TIME_THRESHOLD,
+            mem_threshold=MEM_THRESHOLD, alpha=ALPHA):
+    """
+    Bandingkan run baru dengan baseline. Mengembalikan list baris diff
+    (dict) untuk semua pasangan (instance, algo) yang ada di keduanya.
+    """
+    old = {(e['instance'], e['algo']): e for e in baseline['entries']}
+    rows = []
+    for e in _entries(results, samples):
+        ref = old.get((e['instance'], e['algo']))
+        if ref is None:
+            continue
+        t_old = percentile(ref['time_samples'], 50)
+        t_new = percentile(e['time_samples'], 50)
+        t_delta = t_new / t_old - 1 if t_old > 0 else 0.0
+        p = mann_whitney_greater(e['time_samples'], ref['time_samples'])
+        m_old, m_new = ref['memory_mb'], e['memory_mb']
+        m_delta = m_new / m_old - 1 if m_old > 0 else 0.0
+
+        status = []
+        if t_delta > time_threshold and p < alpha:
+            status.append('TIME')
+        if m_delta > mem_threshold:
+            status.append('MEM')
+        if abs(e['result'] - ref['result']) > 1e-9 * max(1.0, abs(ref['result'])):
+            status.append('RESULT')
+        rows.append({
+            'instance': e['instance'], 'algo': e['algo'], 'time_old': t_old, 'time_new': t_new,
+            'time_delta': t_delta, 'p_value': p, 'mem_old': m_old, 'mem_new': m_new,
+            'mem_delta': m_delta, 'status': status,
+        })
+    return rows
+
+
+def print_diff(rows, only_regressions=False):
+    print("-" * 118)
+    print(f"{'Instance':<20} | {'Algo':<6} | {'Old (ms)':>9} | {'New (ms)':>9} | {'dTime':>7} | "
+          f"{'p-value':>7} | {'Old MB':>8} | {'New MB':>8} | {'dMem':>7} | Status")
+    print("-" * 118)
+    for r in rows:
+        if only_regressions and not r['status']:
+            continue
+        status = ','.join(r['status']) or 'OK'
+        print(f"{r['instance']:<20} | {r['algo']:<6} | {r['time_old']:9.3f} | {r['time_new']:9.3f} | "
+              f"{r['time_delta']:+7.1%} | {r['p_value']:7.4f} | {r['mem_old']:8.4f} | {r['mem_new']:8.4f} | "
+              f"{r['mem_delta']:+7.1%} | {status}")
+    print("-" * 118)
+
+
+def gate(baseline_path, results, samples, time_threshold=TIME_THRESHOLD,
+         mem_threshold=MEM_THRESHOLD, alpha=ALPHA):
+    """Cetak tabel diff; kembalikan exit code (0 = lolos, 1 = ada regresi, 2 = tidak bisa dibandingkan)."""
+    baseline = load_baseline(baseline_path)
+    fp, _ = machine_fingerprint()
+    if baseline['fingerprint'] != fp:
+        print(f"[ERROR] Baseline {baseline_path} berasal dari mesin lain ({baseline['fingerprint']} != {fp}).")
+        return 2
+
+    print(f"\n=== REGRESSION GATE vs {baseline['revision']} ({baseline['created']}, engine {baseline['engine']}) ===")
+    print(f"[INFO] Threshold waktu {time_threshold:.0%} (Mann-Whitney alpha {alpha}), memori {mem_threshold:.0%}")
+    rows = compare(baseline, results, samples, time_threshold, mem_threshold, alpha)
+    if not rows:
+        # Gate yang tidak membandingkan apa pun tidak boleh dianggap lolos (salah --data / --algos?)
+        print("[ERROR] Tidak ada pasangan (instance, algo) yang sama dengan baseline.")
+        return 2
+
+    print_diff(rows)
+    regressions = [r for r in rows if r['status']]
+    if regressions:
+        print(f"[ERROR] {len(regressions)} dari {len(rows)} pasangan mengalami regresi.")
+        return 1
+    print(f"[SUKSES] Tidak ada regresi ({len(rows)} pasangan dibandingkan).")
+    return 0
+
+
+def _read_results(results_csv, samples_csv):
+    import csv
+    with open(results_csv, newline='', encoding='utf-8') as f:
+        results = [{**r, 'memory_mb': float(r['memory_mb']), 'result': float(r['result']),
+                    'time_ms': float(r['time_ms'])} for r in csv.DictReader(f)]
+    samples = []
+    if Path(samples_csv).exists():
+        with open(samples_csv, newline='', encoding='utf-8') as f:
+            samples = [{**s, 'time_ms': float(s['time_ms'])} for s in csv.DictReader(f)]
+    return results, samples
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Bandingkan hasil run_batch terakhir dengan baseline tersimpan')
+    p.add_argument('--results', default='results/experiment_results.csv')
+    p.add_argument('--samples', default='results/experiment_samples.csv')
+    p.add_argument('--engine', choices=['dict', 'csr'], default='dict')
+    p.add_argument('--data', default=DATA_DIR, help='Folder instance yang dipakai run tsb (harus sama dengan baseline)')
+    p.add_argument('--baseline', help='Revisi baseline (default: baseline terbaru mesin ini)')
+    p.add_argument('--save', action='store_true', help='Simpan hasil sebagai baseline revisi saat ini')
+    p.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD)
+    p.add_argument('--mem-threshold', type=float, default=MEM_THRESHOLD)
+    p.add_argument('--alpha', type=float, default=ALPHA)
+    args = p.parse_args()
+
+    results, samples = _read_results(args.results, args.samples)
+    if args.save:
+        print(f"[SUKSES] Baseline tersimpan di: {save_baseline(results, samples, args.engine, args.data)}")
+        sys.exit(0)
+
+    path = find_baseline(args.engine, args.baseline, args.data)
+    if path is None:
+        print(f"[ERROR] Baseline tidak ditemukan untuk mesin ini (engine {args.engine}, data {args.data}). "
+              "Jalankan dengan --save dulu.")
+        sys.exit(2)
+    sys.exit(gate(path, results, samples, args.time_threshold, args.mem_threshold, args.alpha))
@@ -0,0 +1,224 @@
+import heapq
+from array import array
+
+from pqueue import make_queue
+
+# --- LIBRARY ROUTING: SATU INTI DIJKSTRA UNTUK SEMUA SCRIPT ---
+# Semua pencarian Dijkstra di atas CSRGraph (benchmark CSR, visualisasi,
+# batch query, preprocessing landmark) memakai dijkstra() di bawah ini, jadi
+# optimasi graf / priority queue otomatis dinikmati semua pemanggil.
+# Sengaja ringan: hanya stdlib + pqueue (tanpa pandas/matplotlib saat import).
+#
+# Mode hasil:
+#   shortest_distance  -> (jarak, visited)              tanpa predecessor
+#   shortest_path      -> (jarak, [node...], visited)   predecessor array
+#   shortest_path_tree -> ShortestPathTree penuh (dist + pred semua node)
+#   bounded_dijkstra   -> node + jarak dalam radius tertentu (isochrone)
+
+INF = float('inf')
+
+
+class ShortestPathTree:
+    """
+    Hasil (dan state) pencarian dari satu sumber: array jarak, predecessor
+    (opsional), jumlah visited, dan frontier heap. Frontier disimpan agar
+    pencarian bisa dilanjutkan (resume) ke target lain; frontier kosong
+    berarti SPT sudah lengkap.
+    """
+
+    __slots__ = ('source', 'dist', 'pred', 'visited', 'frontier', 'children')
+
+    def __init__(self, source, dist, pred, visited, frontier=None):
+        self.source = source
+        self.dist = dist          # list jarak per indeks node (inf = tak terjangkau / belum dicapai)
+        self.pred = pred          # list parent per indeks (-1 = tidak ada), None jika tidak dilacak
+        self.visited = visited    # jumlah node yang di-settle
+        self.frontier = frontier  # heap (jarak, node) sisa; None jika tidak bisa di-resume
+        self.children = None      # list anak per node, dibangun saat repair pertama (dynamic_sssp)
+
+    def is_final(self, target):
+        """True jika jarak target sudah pasti (tidak bisa membaik lagi)."""
+        if self.frontier is None:
+            raise ValueError("Pencarian tanpa frontier heapq tidak bisa di-resume")
+        if not self.frontier:
+            return True  # SPT lengkap
+        # Relaksasi berikutnya berasal dari entri >= minimum frontier, jadi tidak bisa lebih kecil
+        return self.dist[target] <= self.frontier[0][0]
+
+    def path_to(self, target):
+        """Urutan indeks node source -> target ([] jika tak terjangkau)."""
+        if self.pred is None:
+            raise ValueError("Predecessor tidak dilacak; jalankan dijkstra(..., with_pred=True)")
+        if self.dist[target] == INF:
+            return []
+        path = []
+        curr = target
+        while curr != -1:
+            path.append(curr)
+            curr = self.pred[curr]
+        return path[::-1]
+
+
+def dijkstra(csr, source, targets=None, with_pred=False, queue=None, limit=INF):
+    """
+    Inti Dijkstra (lazy deletion) di atas CSRGraph dari indeks `source`.
+    targets   : None -> SPT penuh; iterable indeks -> berhenti begitu semua di-settle
+    with_pred : lacak predecessor (untuk rekonstruksi jalur)
+    queue     : None/'lazy' -> heapq inline (jalur tercepat, bisa di-resume); nama
+                backend pqueue.py lainnya ('indexed', 'pairing', 'bucket', 'linear')
+    limit     : hanya heapq; berhenti sebelum men-settle node berjarak > limit
+    Jarak target yang tak terjangkau = inf (PQ habis sebelum target di-settle).
+    """
+    dist = [INF] * csr.num_nodes
+    dist[source] = 0
+    pred = [-1] * csr.num_nodes if with_pred else None
+
+    if queue is None or queue == 'lazy':
+        spt = ShortestPathTree(source, dist, pred, 0, [(0, source)])
+        return resume(csr, spt, targets, limit)
+
+    # Backend pluggable (push = insert / decrease-key), lihat pqueue.py
+    offsets, targets_buf, weights = csr.offsets, csr.targets, csr.weights
+    remaining = set(targets) if targets is not None else None
+    visited_count = 0
+    if remaining is not None and not remaining:
+        return ShortestPathTree(source, dist, pred, visited_count)
+    pq = make_queue(queue, csr)
+    push, pop = pq.push, pq.pop
+    push(source, 0)
+    while pq:
+        curr_dist, u = pop()
+
+        # Entri basi hanya muncul di backend lazy
+        if curr_dist > dist[u]:
+            continue
+
+        visited_count += 1
+        if remaining is not None and u in remaining:
+            remaining.discard(u)
+            if not remaining:
+                break
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets_buf[i]
+            new_dist = curr_dist + weights[i]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                if pred is not None:
+                    pred[v] = u
+                push(v, new_dist)
+
+    return ShortestPathTree(source, dist, pred, visited_count)
+
+
+def resume(csr, spt, targets=None, limit=INF):
+    """
+    Lanjutkan pencarian heapq dari frontier `spt` sampai semua `targets`
+    di-settle (None -> sampai frontier habis) atau minimum frontier > limit.
+    Node yang di-settle selalu diekspansi sebelum berhenti, sehingga frontier
+    tetap valid untuk resume berikutnya. spt.visited bertambah sebanyak node
+    yang baru di-settle.
+    """
+    offsets, targets_buf, weights = csr.offsets, csr.targets, csr.weights
+    dist, pred, pq = spt.dist, spt.pred, spt.frontier
+    remaining = set(targets) if targets is not None else None
+    if remaining is not None and not remaining:
+        return spt
+    heappop, heappush = heapq.heappop, heapq.heappush
+    visited_count = 0
+
+    while pq:
+        curr_dist, u = heappop(pq)
+
+        # Lazy Deletion Check
+        if curr_dist > dist[u]:
+            continue
+        if curr_dist > limit:
+            heappush(pq, (curr_dist, u))  # kembalikan agar frontier tetap lengkap
+            break
+
+        visited_count += 1
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets_buf[i]
+            new_dist = curr_dist + weights[i]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                if pred is not None:
+                    pred[v] = u
+                heappush(pq, (new_dist, v))
+
+        if remaining is not None and u in remaining:
+            remaining.discard(u)
+            if not remaining:
+                break
+
+    spt.visited += visited_count
+    return spt
+
+
+# --- MODE HASIL ---
+def shortest_distance(csr, source, target, queue=None):
+    """Jarak source -> target (indeks). Mengembalikan (jarak, visited); target None -> inf."""
+    if target is None:
+        return INF, dijkstra(csr, source, queue=queue).visited
+    spt = dijkstra(csr, source, (target,), queue=queue)
+    return spt.dist[target], spt.visited
+
+
+def shortest_path(csr, source, target, queue=None):
+    """Jarak + jalur source -> target. Mengembalikan (jarak, [indeks node], visited)."""
+    spt = dijkstra(csr, source, (target,), with_pred=True, queue=queue)
+    return spt.dist[target], spt.path_to(target), spt.visited
+
+
+def shortest_path_tree(csr, source, queue=None):
+    """Shortest-path tree penuh dari source (dist + pred semua node)."""
+    return dijkstra(csr, source, with_pred=True, queue=queue)
+
+
+def sssp_distances(csr, source):
+    """Array jarak ('d') Dijkstra penuh dari source, untuk preprocessing (landmark)."""
+    return array('d', dijkstra(csr, source).dist)
+
+
+def one_to_many(csr, source, targets):
+    """
+    Jarak terpendek dari satu sumber ke banyak target (indeks integer CSR).
+    Mengembalikan (list jarak sesuai urutan targets, jumlah node visited).
+    """
+    spt = dijkstra(csr, source, targets)
+    return [spt.dist[t] for t in targets], spt.visited
+
+
+def bounded_dijkstra(csr, source, limit):
+    """
+    Dijkstra dari source yang dibatasi radius `limit`: entri berjarak > limit
+    tidak pernah masuk heap, jadi pencarian berhenti begitu frontier melewati
+    batas. Jarak disimpan di dict (bukan list berukuran V) sehingga biaya
+    sebanding dengan area yang dicapai. Mengembalikan (array node, array jarak) dalam urutan
+    settle, yaitu terurut naik menurut jarak.
+    """
+    offsets, targets_buf, weights = csr.offsets, csr.targets, csr.weights
+    dist = {source: 0.0}
+    order, order_dist = array('i'), array('d')
+    pq = [(0.0, source)]
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    while pq:
+        curr_dist, u = heappop(pq)
+
+        # Lazy Deletion Check
+        if curr_dist > dist[u]:
+            continue
+        order.append(u)
+        order_dist.append(curr_dist)
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets_buf[i]
+            new_dist = curr_dist + weights[i]
+            if new_dist <= limit and new_dist < dist.get(v, INF):
+                dist[v] = new_dist
+                heappush(pq, (new_dist, v))
+
+    return order, order_dist
@@ -6,6 +6,17 @@ import heapq
 import math  # [BARU] Import math untuk logaritma
 from typing import Any
 import sys
+from instance_io import load_instance, load_instance_csr, load_landmarks, load_ch, load_spatial_index
+from batch_query import many_to_many, load_queries, save_matrix
+from geo import build_geo_index, cached_max_speed, haversine_m
+from pqueue import BACKENDS
+from pathlib import Path
+import instrument
+from routing import dijkstra, shortest_distance
+from spatial_index import MAX_SNAP_M, parse_latlon
+from isochrone import isochrone, report as report_isochrone
+from alternatives import DEFAULT_OVERLAP, DEFAULT_STRETCH, METHODS as ALT_METHODS, alternatives, report as report_alternatives
+from spt_cache import DEFAULT_MAX_MB, SPTCache, cache_key
 
 # --- FUNGSI ANALISIS TEORITIS (Fitur Presentasi) ---
 def analyze_complexity(graph, algo_type):
@@ -13,9 +24,13 @@ def analyze_complexity(graph, algo_type):
     Menghitung estimasi operasi teoritis untuk 'pamer' ke dosen.
     Ini membuktikan kita paham bedanya V^2 dan E log V.
     """
-    V = len(graph)
-    # Menghitung total Edges (E)
-    E = sum(len(neighbors) for neighbors in graph.values())
+    if hasattr(graph, 'num_nodes'):
+        # CSRGraph: V dan E sudah tersedia tanpa iterasi
+        V, E = graph.num_nodes, graph.num_edges
+    else:
+        V = len(graph)
+        # Menghitung total Edges (E)
+        E = sum(len(neighbors) for neighbors in graph.values())
     
     print(f"\n--- [STATISTIK GRAF & ANALISIS] ---")
     print(f"  Nodes (V) : {V}")
@@ -33,6 +48,35 @@ def analyze_complexity(graph, algo_type):
         else:
             print("  Est. Operasi : 0")
             
+    elif algo_type == 'C':
+        print(f"  Algoritma : C (Dijkstra Bidirectional, Min-Heap)")
+        print(f"  Kompleksitas : O(E log V) worst case, area pencarian ~2 x setengah radius")
+
+        # Dua pencarian yang masing-masing kira-kira mencapai separuh jarak:
+        # pada graf jalan (planar) area ~ r^2, jadi total ~ 2 * (1/4) = 1/2 beban Heap
+        if V > 0:
+            est_ops = E * math.log2(V) / 2
+            print(f"  Est. Operasi : (E * log2(V)) / 2 ≈ {int(est_ops):,} instruksi dasar")
+        else:
+            print("  Est. Operasi : 0")
+
+    elif algo_type == 'E':
+        print(f"  Algoritma : E (ALT: A* + Landmark, preprocessing sekali per peta)")
+        print(f"  Kompleksitas : O(E log V) worst case, heuristik O(K) per node")
+
+    elif algo_type == 'F':
+        print(f"  Algoritma : F (Contraction Hierarchies, query dua arah naik-rank)")
+        print(f"  Kompleksitas : preprocessing sekali per peta, query ~ O(k log k) untuk k << V node")
+
+    elif algo_type == 'D':
+        print(f"  Algoritma : D (A* Min-Heap, heuristik haversine / v_max)")
+        print(f"  Kompleksitas : O(E log V) worst case, praktis jauh lebih sedikit node di-settle")
+        if V > 0:
+            est_ops = E * math.log2(V)
+            print(f"  Est. Operasi : <= {E} * log2({V}) ≈ {int(est_ops):,} instruksi dasar (batas atas)")
+        else:
+            print("  Est. Operasi : 0")
+
     else:
         print(f"  Algoritma : B (Dijkstra Array/Linear)")
         print(f"  Kompleksitas : O(V^2)")
@@ -134,46 +178,612 @@ def algo_B_Array(instance: Any):
                     
     return distances.get(end, float('inf')), visited_count
 
+# --- IMPLEMENTASI ALGORITMA C: DIJKSTRA BIDIRECTIONAL ---
+# Cache graf terbalik: id(graph) -> (graph, reversed_graph). Graf asli ikut
+# disimpan agar id() tidak dipakai ulang oleh objek lain selama cache hidup.
+_REVERSE_GRAPHS = {}
+
+def reverse_graph(graph):
+    """Adjacency terbalik {v: {u: w}} dari instance['graph'], dibangun sekali per graf."""
+    cached = _REVERSE_GRAPHS.get(id(graph))
+    if cached is not None and cached[0] is graph:
+        return cached[1]
+
+    rev = {}
+    for u, neighbors in graph.items():
+        for v, weight in neighbors.items():
+            rev.setdefault(v, {})[u] = weight
+    _REVERSE_GRAPHS[id(graph)] = (graph, rev)
+    return rev
+
+def algo_C_Bidirectional(instance: Any):
+    """
+    Dijkstra dua arah: maju dari start (graph) dan mundur dari end (graph terbalik).
+    Berhenti ketika top_maju + top_mundur >= mu (jarak jalur terbaik yang sudah ditemukan).
+    Visited = total node yang di-settle di kedua arah.
+    """
+    graph = instance['graph']
+    rev = reverse_graph(graph)
+    start = str(instance['meta']['start_node'])
+    end = str(instance['meta']['end_node'])
+
+    if start == end:
+        return 0, 1
+
+    inf = float('inf')
+    dist = ({start: 0}, {end: 0})      # [0] = maju, [1] = mundur
+    pqs = ([(0, start)], [(0, end)])
+    adjs = (graph, rev)
+
+    mu = inf
+    visited_count = 0
+
+    while pqs[0] and pqs[1]:
+        # Kriteria berhenti: tidak ada jalur yang lebih pendek dari mu lagi
+        if pqs[0][0][0] + pqs[1][0][0] >= mu:
+            break
+
+        # Ekspansi sisi dengan frontier yang lebih kecil (jarak teratas lebih kecil)
+        side = 0 if pqs[0][0][0] <= pqs[1][0][0] else 1
+        pq, d_this, d_other = pqs[side], dist[side], dist[1 - side]
+
+        curr_dist, curr_node = heapq.heappop(pq)
+
+        # Lazy Deletion Check
+        if curr_dist > d_this.get(curr_node, inf):
+            continue
+
+        visited_count += 1
+
+        for neighbor, weight in adjs[side].get(curr_node, {}).items():
+            new_dist = curr_dist + weight
+
+            if new_dist < d_this.get(neighbor, inf):
+                d_this[neighbor] = new_dist
+                heapq.heappush(pq, (new_dist, neighbor))
+
+            # Update jalur terbaik jika tetangga sudah dijangkau dari sisi lain
+            other = d_other.get(neighbor)
+            if other is not None and new_dist + other < mu:
+                mu = new_dist + other
+
+    return mu, visited_count
+
+# --- IMPLEMENTASI ALGORITMA D: A* (HEURISTIK GEOGRAFIS) ---
+def algo_D_AStar(instance: Any):
+    """
+    A* dengan h(u) = haversine(u, end) / v_max, v_max = kecepatan tertinggi yang
+    tersirat dari bobot travel_time graf (lihat geo.py). Admissible, sehingga
+    biaya jalur sama dengan Dijkstra.
+    """
+    graph = instance['graph']
+    coords = instance['nodes']
+    start = str(instance['meta']['start_node'])
+    end = str(instance['meta']['end_node'])
+
+    v_max = cached_max_speed(graph, coords)
+    target = coords.get(end)
+    t_lat, t_lon = (target['y'], target['x']) if target else (None, None)
+
+    # Nilai h dihitung sekali per node lalu disimpan
+    h_cache = {}
+    def h(node):
+        val = h_cache.get(node)
+        if val is None:
+            c = coords.get(node)
+            val = haversine_m(c['y'], c['x'], t_lat, t_lon) / v_max if (c and target) else 0.0
+            h_cache[node] = val
+        return val
+
+    inf = float('inf')
+    distances = {start: 0}
+    pq = [(h(start), 0, start)]
+    visited_count = 0
+
+    while pq:
+        _, curr_dist, curr_node = heapq.heappop(pq)
+
+        # Lazy Deletion Check
+        if curr_dist > distances.get(curr_node, inf):
+            continue
+
+        visited_count += 1
+
+        if curr_node == end:
+            return curr_dist, visited_count
+
+        for neighbor, weight in graph.get(curr_node, {}).items():
+            new_dist = curr_dist + weight
+            if new_dist < distances.get(neighbor, inf):
+                distances[neighbor] = new_dist
+                heapq.heappush(pq, (new_dist + h(neighbor), new_dist, neighbor))
+
+    return distances.get(end, inf), visited_count
+
+# --- VARIAN CSR: GRAF BERINDEKS INTEGER ---
+# Logika identik dengan algo_A_Heap / algo_B_Array, tetapi berjalan di atas
+# buffer CSR (offsets/targets/weights) sehingga relaksasi tidak lagi
+# meng-hash string OSM ID panjang.
+def algo_A_Heap_CSR(instance: Any, csr):
+    """Dijkstra Min-Heap di atas CSRGraph (inti di routing.dijkstra)"""
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.find(instance['meta']['end_node'])
+    return shortest_distance(csr, start, end)
+
+def algo_B_Array_CSR(instance: Any, csr):
+    """Dijkstra Array/Linear Scan di atas CSRGraph"""
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.find(instance['meta']['end_node'])
+
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    inf = float('inf')
+    distances = [inf] * csr.num_nodes
+    distances[start] = 0
+
+    # Sama seperti versi dict: semua node (graf tervalidasi memuat setiap node,
+    # termasuk yang tanpa edge keluar), dengan urutan scan yang sama.
+    unvisited = {u: inf for u in range(csr.num_nodes)}
+    unvisited[start] = 0
+
+    visited_count = 0
+
+    while unvisited:
+        # Linear Scan: O(V)
+        current_node = None
+        min_val = inf
+
+        for node, dist in unvisited.items():
+            if dist < min_val:
+                min_val = dist
+                current_node = node
+
+        if current_node is None:
+            break
+
+        visited_count += 1
+
+        if current_node == end:
+            return distances[end], visited_count
+
+        del unvisited[current_node]
+
+        curr_dist = distances[current_node]
+        for i in range(offsets[current_node], offsets[current_node + 1]):
+            v = targets[i]
+            if v in unvisited:
+                new_dist = curr_dist + weights[i]
+                if new_dist < distances[v]:
+                    distances[v] = new_dist
+                    unvisited[v] = new_dist
+
+    return (distances[end] if end is not None else inf), visited_count
+
+def algo_C_Bidirectional_CSR(instance: Any, csr):
+    """Dijkstra Bidirectional di atas CSRGraph (graf terbalik dari csr.reverse())"""
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.to_index(instance['meta']['end_node'])
+
+    if start == end:
+        return 0, 1
+
+    inf = float('inf')
+    n = csr.num_nodes
+    dist = ([inf] * n, [inf] * n)
+    dist[0][start] = 0
+    dist[1][end] = 0
+    pqs = ([(0, start)], [(0, end)])
+    bufs = (csr, csr.reverse())
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    mu = inf
+    visited_count = 0
+
+    while pqs[0] and pqs[1]:
+        if pqs[0][0][0] + pqs[1][0][0] >= mu:
+            break
+
+        side = 0 if pqs[0][0][0] <= pqs[1][0][0] else 1
+        pq, d_this, d_other = pqs[side], dist[side], dist[1 - side]
+        g = bufs[side]
+        offsets, targets, weights = g.offsets, g.targets, g.weights
+
+        curr_dist, u = heappop(pq)
+        if curr_dist > d_this[u]:
+            continue
+
+        visited_count += 1
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            new_dist = curr_dist + weights[i]
+            if new_dist < d_this[v]:
+                d_this[v] = new_dist
+                heappush(pq, (new_dist, v))
+            if new_dist + d_other[v] < mu:
+                mu = new_dist + d_other[v]
+
+    return mu, visited_count
+
+def algo_D_AStar_CSR(instance: Any, csr):
+    """
+    A* di atas CSRGraph. Nilai h disimpan di array memo (-1 = belum dihitung),
+    jadi setiap node dihitung paling banyak sekali dan hanya jika disentuh.
+    """
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.to_index(instance['meta']['end_node'])
+
+    h_of = build_geo_index(csr).heuristic_fn(end)
+    hs = [-1.0] * csr.num_nodes
+    hs[start] = h_of(start)
+
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    inf = float('inf')
+    distances = [inf] * csr.num_nodes
+    distances[start] = 0
+    pq = [(hs[start], 0, start)]
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    visited_count = 0
+
+    while pq:
+        _, curr_dist, u = heappop(pq)
+        if curr_dist > distances[u]:
+            continue
+
+        visited_count += 1
+
+        if u == end:
+            return curr_dist, visited_count
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            new_dist = curr_dist + weights[i]
+            if new_dist < distances[v]:
+                distances[v] = new_dist
+                hv = hs[v]
+                if hv < 0:
+                    hv = hs[v] = h_of(v)
+                heappush(pq, (new_dist + hv, new_dist, v))
+
+    return distances[end], visited_count
+
+def algo_E_ALT_CSR(instance: Any, csr, landmarks):
+    """
+    ALT: A* dengan heuristik landmark (ketidaksamaan segitiga). Tabel jarak
+    landmark berasal dari preprocessing (landmarks.py), dimuat via mmap.
+    """
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.to_index(instance['meta']['end_node'])
+
+    h_of = landmarks.heuristic_fn(end)
+    hs = [-1.0] * csr.num_nodes
+    hs[start] = h_of(start)
+
+    offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+    inf = float('inf')
+    distances = [inf] * csr.num_nodes
+    distances[start] = 0
+    pq = [(hs[start], 0, start)]
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    visited_count = 0
+
+    while pq:
+        _, curr_dist, u = heappop(pq)
+        if curr_dist > distances[u]:
+            continue
+
+        visited_count += 1
+
+        if u == end:
+            return curr_dist, visited_count
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            new_dist = curr_dist + weights[i]
+            if new_dist < distances[v]:
+                distances[v] = new_dist
+                hv = hs[v]
+                if hv < 0:
+                    hv = hs[v] = h_of(v)
+                heappush(pq, (new_dist + hv, new_dist, v))
+
+    return distances[end], visited_count
+
+def algo_PQ_CSR(instance: Any, csr, backend='lazy'):
+    """
+    Dijkstra CSR dengan priority queue yang bisa diganti (lihat pqueue.py):
+    lazy (heapq, = algo A), indexed (decrease-key), pairing, bucket (Dial), linear (= algo B).
+    """
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.find(instance['meta']['end_node'])
+    return shortest_distance(csr, start, end, queue=backend)
+
+def algo_F_CH_CSR(instance: Any, csr, ch):
+    """Query Contraction Hierarchies (hierarki dari contraction.py, dimuat via mmap)"""
+    start = csr.to_index(instance['meta']['start_node'])
+    end = csr.to_index(instance['meta']['end_node'])
+    return ch.query(start, end)
+
 # --- EVALUATOR ---
 def evaluate(instance, result, project):
     if result == float('inf'):
         return 1.0 
     return 0.0
 
+# --- MODE BATCH QUERY (--queries) ---
+def run_queries(instance_path, queries_path, out_path, cache=None):
+    """Matriks jarak many-to-many: satu pencarian per sumber di atas graf CSR."""
+    inst, csr = load_instance_csr(instance_path)
+    project = inst.get("project", "unknown")
+    sources, targets = load_queries(queries_path)
+    graph_key = cache_key(inst) if cache is not None else None
+
+    t0 = time.perf_counter()
+    matrix, visited = many_to_many(csr, sources, targets, cache, graph_key)
+    dt = (time.perf_counter() - t0) * 1000.0
+
+    out_file = save_matrix(out_path, sources, targets, matrix)
+    print(f"Project={project} Mode=Batch Sources={len(sources)} Targets={len(targets)} "
+          f"Time_ms={dt:.2f} Visited={visited}")
+    print(f"[SUKSES] Matriks jarak disimpan di: {out_file}")
+
+# --- QUERY BERBASIS KOORDINAT (--from / --to) ---
+def snap_endpoints(args, inst, csr):
+    """Salinan instance dengan start/end diganti node hasil snap koordinat GPS (indeks grid .grid)."""
+    ginst, gcsr = (inst, csr) if csr is not None else load_instance_csr(args.instance)
+    index = load_spatial_index(args.instance, ginst, gcsr)
+    meta = dict(inst['meta'])
+    for key, text in (('start_node', args.origin), ('end_node', args.dest)):
+        if not text:
+            continue
+        lat, lon = parse_latlon(text)
+        t0 = time.perf_counter()
+        node = index.snap(lat, lon, args.snap, args.snap_radius)
+        us = (time.perf_counter() - t0) * 1e6
+        if node < 0:
+            raise ValueError(f"tidak ada node/ruas jalan dalam {args.snap_radius:g} m dari koordinat {text}")
+        meta[key] = gcsr.to_osm(node)
+        print(f"[INFO] {text} -> node {meta[key]} (snap {args.snap}, {us:.1f} us)")
+    inst = dict(inst)
+    inst['meta'] = meta
+    return inst
+
+# --- MODE ISOCHRONE (--isochrone) ---
+def run_isochrone(inst, csr, budgets_min, project):
+    """Semua node terjangkau dalam tiap anggaran (menit) dari start_node, satu pencarian berbatas."""
+    source = csr.to_index(inst['meta']['start_node'])
+    t0 = time.perf_counter()
+    iso = isochrone(csr, source, [m * 60.0 for m in budgets_min])
+    dt = (time.perf_counter() - t0) * 1000.0
+    budgets = '/'.join(f"{b / 60:g}" for b in iso.budgets)
+    reached = '/'.join(str(c) for c in iso.counts)
+    print(f"Project={project} Mode=Isochrone Budgets_min={budgets} Time_ms={dt:.2f} "
+          f"Visited={len(iso.nodes)} Reached={reached}")
+    report_isochrone(iso)
+
+# --- MODE RUTE ALTERNATIF (--alternatives) ---
+def run_alternatives(inst, csr, args, project):
+    """Hingga K rute start -> end dengan batas stretch & overlap; biaya query dalam format Time_ms/Visited."""
+    start, end = csr.to_index(inst['meta']['start_node']), csr.to_index(inst['meta']['end_node'])
+    t0 = time.perf_counter()
+    routes, visited = alternatives(csr, start, end, args.alternatives, args.max_stretch,
+                                   args.max_overlap, args.alt_method)
+    dt = (time.perf_counter() - t0) * 1000.0
+    result = f"{routes[0].cost:.2f}" if routes else "INF"
+    print(f"Project={project} Mode=Alternatives Method={args.alt_method} K={args.alternatives} "
+          f"Result={result} Time_ms={dt:.2f} Visited={visited} Routes={len(routes)}")
+    report_alternatives(routes)
+
+# --- PREPROCESSING & DISPATCH ---
+def preprocess(args, inst, csr):
+    """Preprocessing per graf (sekali), di luar pengukuran waktu. Mengembalikan (landmarks, ch)."""
+    lm = ch = None
+    if args.algo == 'C':
+        if csr is None:
+            reverse_graph(inst['graph'])
+        else:
+            csr.reverse()
+    elif args.algo == 'D':
+        if csr is None:
+            cached_max_speed(inst['graph'], inst['nodes'])
+        else:
+            build_geo_index(csr)
+    elif args.algo == 'E':
+        lm = load_landmarks(args.instance, inst, csr, args.landmarks)
+    elif args.algo == 'F':
+        ch = load_ch(args.instance, inst, csr)
+    return lm, ch
+
+def search(args, inst, csr, lm=None, ch=None):
+    """Jalankan algoritma terpilih. Mengembalikan (hasil, visited)."""
+    if args.pq:
+        return algo_PQ_CSR(inst, csr, args.pq)
+    if args.algo == 'A':
+        return algo_A_Heap(inst) if csr is None else algo_A_Heap_CSR(inst, csr)
+    if args.algo == 'C':
+        return algo_C_Bidirectional(inst) if csr is None else algo_C_Bidirectional_CSR(inst, csr)
+    if args.algo == 'D':
+        return algo_D_AStar(inst) if csr is None else algo_D_AStar_CSR(inst, csr)
+    if args.algo == 'E':
+        return algo_E_ALT_CSR(inst, csr, lm)
+    if args.algo == 'F':
+        return algo_F_CH_CSR(inst, csr, ch)
+    return algo_B_Array(inst) if csr is None else algo_B_Array_CSR(inst, csr)
+
+def count_operations(args, inst, csr, lm, ch):
+    """
+    Run tambahan (tidak diukur waktunya) di atas graf terbungkus penghitung.
+    Algoritma yang dijalankan persis sama dengan run utama.
+    """
+    counters = instrument.OpCounters()
+    winst, wcsr = dict(inst), None
+    if csr is None:
+        winst['graph'] = instrument.wrap_adjacency(inst['graph'], counters)
+        if args.algo == 'C':
+            # Graf terbalik versi penghitung didaftarkan di cache agar tidak dibangun ulang
+            rev = instrument.wrap_adjacency(reverse_graph(inst['graph']), counters)
+            _REVERSE_GRAPHS[id(winst['graph'])] = (winst['graph'], rev)
+    else:
+        wcsr = instrument.wrap_csr(csr, counters)
+    wch = instrument.wrap_ch(ch, counters) if ch is not None else None
+
+    # Warm-up preprocessing untuk graf terbungkus (cache v_max dsb.) lalu counter di-nol-kan
+    preprocess(args, winst, wcsr)
+    counters.reset()
+    with instrument.counting(counters, pq=bool(args.pq)):
+        _, visited = search(args, winst, wcsr, lm, wch)
+
+    g = inst['graph'] if csr is None else csr
+    V, E = (g.num_nodes, g.num_edges) if csr is not None else (len(g), sum(len(n) for n in g.values()))
+    if args.algo == 'B' and not args.pq:
+        counters.scans = instrument.linear_scans(V, visited)
+    instrument.report(counters, args.algo, V, E, visited, initial_pushes=2 if args.algo in ('C', 'F') else 1)
+
 # --- MAIN DRIVER ---
 def main():
     p = argparse.ArgumentParser()
     p.add_argument('--instance', required=True, help='Path ke file JSON')
-    p.add_argument('--algo', choices=['A', 'B'], default='A', help='A=Heap, B=Array')
+    p.add_argument('--algo', choices=['A', 'B', 'C', 'D', 'E', 'F'], default='A',
+                   help='A=Heap, B=Array, C=Bidirectional, D=A* (heuristik geografis), '
+                        'E=ALT (landmark, selalu CSR), F=Contraction Hierarchies (selalu CSR)')
+    p.add_argument('--landmarks', type=int, default=8, help='Jumlah landmark untuk --algo E')
+    p.add_argument('--pq', choices=list(BACKENDS),
+                   help='Backend priority queue untuk Dijkstra (A/B), selalu CSR. '
+                        'lazy=heapq, indexed=decrease-key, pairing, bucket=Dial, linear=scan O(V)')
+    p.add_argument('--engine', choices=['dict', 'csr'], default='dict',
+                   help='dict=adjacency JSON asli, csr=graf integer CSR (mmap dari cache .bin)')
+    p.add_argument('--from', dest='origin', metavar='LAT,LON',
+                   help='Titik awal berupa koordinat GPS (di-snap ke graf, menggantikan meta.start_node)')
+    p.add_argument('--to', dest='dest', metavar='LAT,LON',
+                   help='Titik tujuan berupa koordinat GPS (menggantikan meta.end_node)')
+    p.add_argument('--snap', choices=['node', 'road'], default='node',
+                   help='node=node terdekat, road=ujung terdekat dari ruas jalan terdekat')
+    p.add_argument('--snap-radius', type=float, default=MAX_SNAP_M, metavar='METER',
+                   help='Jarak maksimum titik GPS ke node/ruas jalan (default %(default)s m)')
+    p.add_argument('--isochrone', type=float, nargs='+', metavar='MENIT',
+                   help='Mode isochrone: semua node terjangkau dari start dalam tiap anggaran (menit), '
+                        'misal --isochrone 1 2 3')
+    p.add_argument('--alternatives', type=int, metavar='K',
+                   help='Mode rute alternatif: hingga K rute start -> end yang cukup berbeda')
+    p.add_argument('--alt-method', choices=list(ALT_METHODS), default='plateau',
+                   help='plateau=dua shortest-path tree (default), penalty=Dijkstra berulang dengan penalti bobot')
+    p.add_argument('--max-stretch', type=float, default=DEFAULT_STRETCH,
+                   help='Rute alternatif maksimal (1 + stretch) x rute terpendek (default %(default)s)')
+    p.add_argument('--max-overlap', type=float, default=DEFAULT_OVERLAP,
+                   help='Bagian biaya rute yang boleh dipakai bersama rute lain (default %(default)s)')
+    p.add_argument('--queries', help='File JSON/CSV berisi daftar sources & targets (mode matriks jarak)')
+    p.add_argument('--out', default='results/distance_matrix.csv',
+                   help='Output matriks untuk --queries (.csv atau .npy)')
+    p.add_argument('--spt-cache', metavar='FILE',
+                   help='Cache shortest-path tree per (graf, sumber) yang dimuat & disimpan antar run '
+                        '(algo A / --queries, selalu CSR)')
+    p.add_argument('--spt-cache-mb', type=float, default=DEFAULT_MAX_MB, help='Batas memori cache SPT (MB)')
+    p.add_argument('--stats', action='store_true',
+                   help='Hitung operasi (push/pop/relaksasi/...) lewat run terpisah + waktu per fase')
+    p.add_argument('--profile', choices=['cprofile', 'sample'],
+                   help='Bungkus run dengan cProfile (.prof) atau sampling profiler (folded stacks)')
+    p.add_argument('--profile-out', help='File output profiler (default: results/profile_<instance>_<algo>.prof/.folded)')
     args = p.parse_args()
+    if args.pq and args.algo not in ('A', 'B'):
+        p.error(f"--pq hanya berlaku untuk --algo A/B (algo {args.algo} memakai heapq bawaannya)")
+
+    if args.profile:
+        ext = 'prof' if args.profile == 'cprofile' else 'folded'
+        out = args.profile_out or f"results/profile_{Path(args.instance).stem}_{args.algo}.{ext}"
+        instrument.profile_call(lambda: execute(args), args.profile, out)
+    else:
+        execute(args)
+
+def execute(args):
+    phases = instrument.PhaseTimer()
+    cache = None
+    if args.spt_cache:
+        if args.algo != 'A' or args.pq:
+            print("Error: --spt-cache hanya berlaku untuk --algo A (Dijkstra heap) tanpa --pq.")
+            sys.exit(1)
+        cache = SPTCache.load(args.spt_cache, args.spt_cache_mb)
+        args.engine = 'csr'
+
+    if args.queries:
+        try:
+            run_queries(args.instance, args.queries, args.out, cache)
+        except FileNotFoundError as e:
+            print(f"Error: File {e.filename} tidak ditemukan.")
+            sys.exit(1)
+        except KeyError as e:
+            print(f"Error: Node {e} tidak ada di graf.")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if cache is not None:
+            print(f"[INFO] {cache.summary()}")
+            cache.save(args.spt_cache)
+        return
     
+    # ALT, CH, isochrone & rute alternatif membutuhkan struktur berindeks integer -> selalu engine CSR
+    if args.algo in ('E', 'F') or args.pq or args.isochrone or args.alternatives:
+        args.engine = 'csr'
+
+    csr = None
     try:
-        with open(args.instance, 'r') as f:
-            inst = json.load(f)
+        t_load = time.perf_counter()
+        if args.engine == 'csr':
+            inst, csr = load_instance_csr(args.instance)
+        else:
+            inst = load_instance(args.instance)
+        phases.add('load', (time.perf_counter() - t_load) * 1000.0)
+        print(f"[INFO] Load instance: {phases.phases['load']:.2f} ms")
+        if args.origin or args.dest:
+            with phases.phase('snap'):
+                inst = snap_endpoints(args, inst, csr)
     except FileNotFoundError:
         print(f"Error: File {args.instance} tidak ditemukan.")
         sys.exit(1)
     except json.JSONDecodeError:
         print(f"Error: File {args.instance} bukan JSON yang valid.")
         sys.exit(1)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     project = inst.get("project", "unknown")
 
+    if args.isochrone:
+        run_isochrone(inst, csr, args.isochrone, project)
+        return
+    if args.alternatives:
+        run_alternatives(inst, csr, args, project)
+        return
+
     # [BARU] Panggil Analisis Kompleksitas sebelum eksekusi
     # Ini akan mencetak estimasi beban kerja ke layar
-    analyze_complexity(inst['graph'], args.algo)
+    analyze_complexity(inst['graph'] if csr is None else csr, args.algo)
+
+    # Preprocessing per graf (sekali): dilakukan di luar pengukuran waktu
+    t_pre = time.perf_counter()
+    lm, ch = preprocess(args, inst, csr)
+    phases.add('preprocessing', (time.perf_counter() - t_pre) * 1000.0)
+    if lm is not None:
+        print(f"[INFO] Landmark ALT siap (K={lm.k}) dalam {phases.phases['preprocessing']:.2f} ms")
+    elif ch is not None:
+        print(f"[INFO] Contraction Hierarchies siap ({ch.num_edges:,} edge overlay) "
+              f"dalam {phases.phases['preprocessing']:.2f} ms")
 
     tracemalloc.start()
     
     t0 = time.perf_counter()
     
-    if args.algo == 'A':
-        out, visited = algo_A_Heap(inst)
+    if args.algo == 'A' and cache is not None:
+        start, end = csr.to_index(inst['meta']['start_node']), csr.to_index(inst['meta']['end_node'])
+        out, visited, cache_status = cache.distance(csr, cache_key(inst), start, end)
     else:
-        out, visited = algo_B_Array(inst)
-        
+        out, visited = search(args, inst, csr, lm, ch)
+
     t1 = time.perf_counter()
     dt = (t1 - t0) * 1000.0 
+    phases.add('search', dt)
 
     current, peak = tracemalloc.get_traced_memory()
     tracemalloc.stop()
@@ -182,7 +792,21 @@ def main():
     
     gap = evaluate(inst, out, project)
     
-    print(f"Project={project} Algo={args.algo} Time_ms={dt:.2f} Peak_Memory_MB={peak_mb:.6f} Visited={visited} Result={out:.2f}")
+    algo_label = f"{args.algo}/{args.pq}" if args.pq else args.algo
+    print(f"Project={project} Algo={algo_label} Time_ms={dt:.2f} Peak_Memory_MB={peak_mb:.6f} Visited={visited} Result={out:.2f}")
+    if cache is not None:
+        print(f"[INFO] {cache.summary()} (query ini: {cache_status})")
+        cache.save(args.spt_cache)
+
+    if args.stats:
+        if csr is not None:
+            # Rekonstruksi jalur dari array predecessor (pencarian ulang tidak diukur)
+            start, end = csr.to_index(inst['meta']['start_node']), csr.to_index(inst['meta']['end_node'])
+            spt = dijkstra(csr, start, (end,), with_pred=True)
+            with phases.phase('path'):
+                spt.path_to(end)
+        phases.report()
+        count_operations(args, inst, csr, lm, ch)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,88 +1,188 @@
+import gc
 import os
-import json
 import time
+import argparse
+import sys
 import pandas as pd
 import tracemalloc
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 # Pastikan run.py ada di folder yang sama dan memiliki fungsi ini
-from run import algo_A_Heap, algo_B_Array
+from run import (algo_A_Heap, algo_B_Array, algo_C_Bidirectional, algo_D_AStar,
+                 algo_A_Heap_CSR, algo_B_Array_CSR, algo_C_Bidirectional_CSR, algo_D_AStar_CSR,
+                 algo_E_ALT_CSR, algo_F_CH_CSR, reverse_graph)
+from instance_io import load_instance, load_instance_csr, load_landmarks, load_ch
+from geo import build_geo_index, cached_max_speed
+from bench_stats import summarize, NOISE_CV
+import regression
 
 # Konfigurasi Folder
 DATA_DIR = Path('data')
 RESULTS_DIR = Path('results')
 RESULTS_DIR.mkdir(exist_ok=True)
 
-def run_experiments():
+# --- PREPROCESSING PER GRAF (di luar pengukuran waktu) ---
+# prepare(json_file, inst, csr) -> argumen tambahan untuk fungsi algoritma.
+# Hasilnya di-cache per proses, jadi hanya job pertama tiap worker yang membayar.
+def _prepare_bidir(json_file, inst, csr):
+    reverse_graph(inst['graph']) if csr is None else csr.reverse()
+    return ()
+
+def _prepare_astar(json_file, inst, csr):
+    cached_max_speed(inst['graph'], inst['nodes']) if csr is None else build_geo_index(csr)
+    return ()
+
+def _prepare_alt(json_file, inst, csr):
+    return (load_landmarks(json_file, inst, csr),)
+
+def _prepare_ch(json_file, inst, csr):
+    return (load_ch(json_file, inst, csr),)
+
+# --- REGISTRY ALGORITMA ---
+# Nama (kolom 'algo' di CSV) -> (label pendek untuk tabel, fungsi engine dict,
+# fungsi engine csr, prepare). fungsi engine dict = None -> algoritma selalu memakai CSR.
+ALGORITHMS = {
+    'Heap': ('Heap', algo_A_Heap, algo_A_Heap_CSR, None),
+    'Array': ('Arr', algo_B_Array, algo_B_Array_CSR, None),
+    'Bidir': ('Bidir', algo_C_Bidirectional, algo_C_Bidirectional_CSR, _prepare_bidir),
+    'AStar': ('A*', algo_D_AStar, algo_D_AStar_CSR, _prepare_astar),
+    'ALT': ('ALT', None, algo_E_ALT_CSR, _prepare_alt),
+    'CH': ('CH', None, algo_F_CH_CSR, _prepare_ch),
+}
+
+# Pasangan (file, algo, engine) yang sudah di-warmup di proses ini
+_WARMED = set()
+
+def _make_runner(json_file, algo, engine):
+    """Muat graf (lewat cache instance_io) + preprocessing, kembalikan callable tanpa argumen."""
+    _, fn_dict, fn_csr, prepare = ALGORITHMS[algo]
+    if engine == 'csr' or fn_dict is None:
+        inst, csr = load_instance_csr(json_file)
+        extra = prepare(json_file, inst, csr) if prepare else ()
+        return inst, lambda: fn_csr(inst, csr, *extra)
+    inst = load_instance(json_file)
+    extra = prepare(json_file, inst, None) if prepare else ()
+    return inst, lambda: fn_dict(inst, *extra)
+
+def run_job(job):
+    """
+    Satu job (instance, algoritma, repetisi, pass). Dipanggil langsung (sekuensial)
+    maupun di dalam worker ProcessPoolExecutor. Graf dimuat lewat cache instance_io,
+    jadi tiap proses hanya mem-parse / mmap graf sekali.
+
+    pass 'time' : tracemalloc MATI (instrumentasi alokasi memperlambat algoritma),
+                  GC dimatikan selama pengukuran, warmup sekali per proses.
+    pass 'mem'  : satu run dengan tracemalloc untuk peak memory (waktu diabaikan).
+    """
+    json_file, algo, rep, engine, phase, warmup = job
+    try:
+        inst, run = _make_runner(json_file, algo, engine)
+
+        if phase == 'mem':
+            tracemalloc.start()
+            dist, visited = run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            elapsed = None
+        else:
+            key = (json_file, algo, engine)
+            if key not in _WARMED:
+                for _ in range(warmup):
+                    run()
+                _WARMED.add(key)
+            gc.collect()
+            gc.disable()
+            try:
+                t0 = time.perf_counter()
+                dist, visited = run()
+                t1 = time.perf_counter()
+            finally:
+                gc.enable()
+            elapsed, peak = (t1 - t0) * 1000.0, None
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {'instance': Path(json_file).name, 'algo': algo, 'rep': rep, 'phase': phase, 'error': str(e)}
+
+    return {
+        'instance': Path(json_file).name, 'n_nodes': inst['meta']['total_nodes'], 'algo': algo,
+        'rep': rep, 'phase': phase, 'time_ms': elapsed,
+        'memory_mb': peak / (1024 * 1024) if peak is not None else None,
+        'visited': visited, 'result': dist
+    }
+
+def run_experiments(engine='dict', workers=1, repeat=5, warmup=1, algos=None, noise_cv=NOISE_CV,
+                    data_dir=DATA_DIR):
     print("=== MEMULAI EKSPERIMEN BATCH (DEBUG MODE + VISITED COUNT) ===")
+    print(f"[INFO] Engine graf: {engine} | Workers: {workers} | Repetisi: {repeat} | Warmup: {warmup}")
     
     # Cek apakah folder data ada isinya
-    instance_files = sorted(list(DATA_DIR.glob('*.json')))
+    instance_files = sorted(list(Path(data_dir).glob('*.json')))
     if not instance_files:
-        print(f"[ERROR] Tidak ada file .json di folder {DATA_DIR.absolute()}")
+        print(f"[ERROR] Tidak ada file .json di folder {Path(data_dir).absolute()}")
         print("Solusi: Jalankan 'generate_instances.py' terlebih dahulu.")
         return
 
-    results = []
+    # Urutan job deterministik: instance -> algoritma -> (pass memori, repetisi waktu)
+    algos = algos or list(ALGORITHMS)
+    jobs = []
+    for f in instance_files:
+        for algo in algos:
+            jobs.append((str(f), algo, 0, engine, 'mem', warmup))
+            jobs.extend((str(f), algo, rep, engine, 'time', warmup) for rep in range(repeat))
+
+    if workers > (os.cpu_count() or 1):
+        print(f"[WARN] Workers ({workers}) > jumlah core ({os.cpu_count()}): timing akan terdistorsi kontensi CPU.")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() mempertahankan urutan input walaupun job selesai acak
+            raw = list(pool.map(run_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        raw = [run_job(job) for job in jobs]
+
+    # Kelompokkan per (instance, algo): 1 hasil memori + `repeat` sampel waktu
+    groups = {}
+    for r in raw:
+        groups.setdefault((r['instance'], r['algo']), []).append(r)
+
+    results, samples, noisy = [], [], []
     
     # [UBAH] Header diperlebar untuk kolom Visited
     print("-" * 115)
-    print(f"{'Instance':<20} | {'Algo':<5} | {'Time (ms)':<10} | {'Mem (MB)':<10} | {'Visited':<8} | {'Result':<10}")
+    print(f"{'Instance':<20} | {'Algo':<5} | {'Median (ms)':<11} | {'p95 (ms)':<10} | {'CV':<6} | {'Mem (MB)':<10} | {'Visited':<8} | {'Result':<10}")
     print("-" * 115)
 
-    for json_file in instance_files:
-        try:
-            with open(json_file, 'r') as f:
-                inst = json.load(f)
-            
-            n_nodes = inst['meta']['total_nodes']
-            name = json_file.name
-            
-            # --- Algo A (HEAP) ---
-            tracemalloc.start()
-            t0 = time.perf_counter()
-            
-            # [UBAH] Menangkap 2 nilai return: Jarak dan Visited Count
-            dist_A, vis_A = algo_A_Heap(inst)
-            
-            t1 = time.perf_counter()
-            _, peak_A = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            
-            time_A = (t1 - t0) * 1000.0
-            mem_A = peak_A / (1024 * 1024)
-            
-            results.append({
-                'instance': name, 'n_nodes': n_nodes, 'algo': 'Heap',
-                'time_ms': time_A, 'memory_mb': mem_A, 
-                'visited': vis_A, 'result': dist_A
-            })
-            # [UBAH] Print output dengan kolom Visited
-            print(f"{name:<20} | {'Heap':<5} | {time_A:8.4f} ms | {mem_A:8.4f} MB | {vis_A:<8} | {dist_A:<10.2f}")
-
-            # --- Algo B (ARRAY) ---
-            tracemalloc.start()
-            t0 = time.perf_counter()
-            
-            # [UBAH] Menangkap 2 nilai return
-            dist_B, vis_B = algo_B_Array(inst)
-            
-            t1 = time.perf_counter()
-            _, peak_B = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            
-            time_B = (t1 - t0) * 1000.0
-            mem_B = peak_B / (1024 * 1024)
-            
-            results.append({
-                'instance': name, 'n_nodes': n_nodes, 'algo': 'Array',
-                'time_ms': time_B, 'memory_mb': mem_B, 
-                'visited': vis_B, 'result': dist_B
-            })
-            # [UBAH] Print output dengan kolom Visited
-            print(f"{name:<20} | {'Arr':<5} | {time_B:8.4f} ms | {mem_B:8.4f} MB | {vis_B:<8} | {dist_B:<10.2f}")
-            
-        except Exception as e:
-            print(f"[ERROR] Gagal memproses {json_file.name}: {e}")
+    for (instance, algo), group in groups.items():
+        failed = [r for r in group if 'error' in r]
+        if failed:
+            print(f"[ERROR] Gagal memproses {instance} ({algo}): {failed[0]['error']}")
+            continue
+
+        mem = next(r for r in group if r['phase'] == 'mem')
+        times = [r['time_ms'] for r in group if r['phase'] == 'time']
+        stats = summarize(times, noise_cv)
+        row = {
+            'instance': instance, 'n_nodes': mem['n_nodes'], 'algo': algo,
+            'time_ms': stats['median'], 'memory_mb': mem['memory_mb'],
+            'visited': mem['visited'], 'result': mem['result'],
+            'time_mean_ms': stats['mean'], 'time_std_ms': stats['std'], 'time_p95_ms': stats['p95'],
+            'time_ci_low_ms': stats['ci_low'], 'time_ci_high_ms': stats['ci_high'],
+            'time_cv': stats['cv'], 'n_reps': stats['n'], 'noisy': stats['noisy']
+        }
+        results.append(row)
+        samples.extend({'instance': instance, 'algo': algo, 'rep': r['rep'], 'time_ms': r['time_ms']}
+                       for r in group if r['phase'] == 'time')
+        if stats['noisy']:
+            noisy.append(row)
+        label = ALGORITHMS[algo][0]
+        flag = ' *' if stats['noisy'] else ''
+        # [UBAH] Print output dengan kolom Visited
+        print(f"{instance:<20} | {label:<5} | {row['time_ms']:8.4f} ms | {row['time_p95_ms']:8.4f} | {row['time_cv']:6.3f} | {row['memory_mb']:8.4f} MB | {row['visited']:<8} | {row['result']:<10.2f}{flag}")
+
+    if noisy:
+        print(f"\n[WARN] {len(noisy)} pengukuran noisy (CV > {noise_cv:.0%}, ditandai *). "
+              "Tambah --repeat / --warmup atau jalankan di mesin yang lebih tenang.")
 
     # --- PENYIMPANAN DATA (CRITICAL) ---
     if not results:
@@ -91,11 +191,15 @@ def run_experiments():
 
     df = pd.DataFrame(results)
     output_csv = RESULTS_DIR / 'experiment_results.csv'
+    samples_csv = RESULTS_DIR / 'experiment_samples.csv'
     
     try:
         df.to_csv(output_csv, index=False)
+        # Sampel mentah per repetisi (dipakai uji statistik / error bar)
+        pd.DataFrame(samples).to_csv(samples_csv, index=False)
         print("-" * 115)
         print(f"[SUKSES] Data tersimpan di: {output_csv.absolute()}")
+        print(f"[SUKSES] Sampel mentah tersimpan di: {samples_csv.absolute()}")
     except Exception as e:
         print(f"[ERROR] Gagal menyimpan CSV: {e}")
         return
@@ -103,20 +207,77 @@ def run_experiments():
     # --- RINGKASAN OUTPUT ---
     print("\n=== RINGKASAN EKSPERIMEN ===")
     try:
-        avg_heap = df[df['algo'] == 'Heap']['time_ms'].mean()
-        avg_arr = df[df['algo'] == 'Array']['time_ms'].mean()
-        
-        print(f"Rata-rata Waktu Heap : {avg_heap:.4f} ms")
-        print(f"Rata-rata Waktu Array: {avg_arr:.4f} ms")
-        
-        if avg_heap > 0:
-            speedup = avg_arr / avg_heap
-            print(f"Speedup: Heap {speedup:.2f}x lebih cepat dari Array")
-        else:
-            print("Speedup: Infinite (Heap instan)")
+        avg_time = df.groupby('algo', sort=False)['time_ms'].mean()
+        avg_vis = df.groupby('algo', sort=False)['visited'].mean()
+
+        for algo, t in avg_time.items():
+            print(f"Rata-rata Waktu {algo:<6}: {t:.4f} ms (median) | Visited {avg_vis[algo]:.0f}")
+
+        # Semua algoritma dibandingkan terhadap Heap (Dijkstra baseline)
+        if 'Heap' in avg_time:
+            avg_heap, vis_heap = avg_time['Heap'], avg_vis['Heap']
+            if 'Array' in avg_time:
+                if avg_heap > 0:
+                    print(f"Speedup: Heap {avg_time['Array'] / avg_heap:.2f}x lebih cepat dari Array")
+                else:
+                    print("Speedup: Infinite (Heap instan)")
+            for algo in avg_time.index:
+                if algo in ('Heap', 'Array') or avg_time[algo] <= 0:
+                    continue
+                print(f"{algo} vs Heap: {avg_heap / avg_time[algo]:.2f}x waktu, "
+                      f"visited {vis_heap:.0f} vs {avg_vis[algo]:.0f} "
+                      f"(reduksi {100.0 * (1 - avg_vis[algo] / vis_heap):.1f}%)")
             
     except Exception as e:
         print(f"[ERROR] Gagal menghitung ringkasan: {e}")
 
+    return results, samples
+
 if __name__ == "__main__":
-    run_experiments()
\ No newline at end of file
+    p = argparse.ArgumentParser()
+    p.add_argument('--engine', choices=['dict', 'csr'], default='dict',
+                   help='dict=adjacency JSON asli, csr=graf integer CSR (mmap dari cache .bin)')
+    p.add_argument('--workers', type=int, default=1,
+                   help='Jumlah proses paralel (ProcessPoolExecutor). 1 = sekuensial')
+    p.add_argument('--repeat', type=int, default=5, help='Jumlah repetisi pass waktu per (instance, algoritma)')
+    p.add_argument('--warmup', type=int, default=1, help='Run pemanasan (tidak diukur) per proses sebelum repetisi')
+    p.add_argument('--noise-cv', type=float, default=NOISE_CV,
+                   help='Ambang coefficient of variation untuk menandai pengukuran noisy')
+    p.add_argument('--data', default=str(DATA_DIR),
+                   help='Folder instance (mis. data/synthetic hasil generate_synthetic.py)')
+    p.add_argument('--algos', nargs='+', choices=list(ALGORITHMS), help='Subset algoritma (default: semua)')
+    # Regression gate (lihat regression.py)
+    p.add_argument('--save-baseline', action='store_true',
+                   help='Simpan hasil sebagai baseline (per fingerprint mesin + revisi git)')
+    p.add_argument('--compare', nargs='?', const='', metavar='REV',
+                   help='Bandingkan dengan baseline (default: terbaru di mesin ini); exit 1 jika regresi')
+    p.add_argument('--time-threshold', type=float, default=regression.TIME_THRESHOLD,
+                   help='Kenaikan median waktu yang dianggap regresi (0.10 = 10%%)')
+    p.add_argument('--mem-threshold', type=float, default=regression.MEM_THRESHOLD,
+                   help='Kenaikan peak memory yang dianggap regresi (0.10 = 10%%)')
+    p.add_argument('--alpha', type=float, default=regression.ALPHA, help='Tingkat signifikansi uji Mann-Whitney')
+    args = p.parse_args()
+
+    baseline_path = None
+    if args.compare is not None:
+        # Cari baseline SEBELUM eksperimen, supaya --save-baseline tidak membandingkan dengan dirinya sendiri
+        baseline_path = regression.find_baseline(args.engine, args.compare or None, args.data)
+        if baseline_path is None:
+            print(f"[ERROR] Baseline tidak ditemukan untuk mesin ini (engine {args.engine}, data {args.data}). "
+                  "Jalankan dengan --save-baseline dulu.")
+            sys.exit(2)
+
+    out = run_experiments(engine=args.engine, workers=max(1, args.workers), repeat=max(1, args.repeat),
+                          warmup=max(0, args.warmup), algos=args.algos, noise_cv=args.noise_cv,
+                          data_dir=args.data)
+    if out is None:
+        sys.exit(2 if (args.compare is not None or args.save_baseline) else 0)
+    results, samples = out
+
+    exit_code = 0
+    if baseline_path is not None:
+        exit_code = regression.gate(baseline_path, results, samples, args.time_threshold,
+                                    args.mem_threshold, args.alpha)
+    if args.save_baseline:
+        print(f"[SUKSES] Baseline tersimpan di: {regression.save_baseline(results, samples, args.engine, args.data)}")
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from bench_stats import percentile
+from spatial_index import MAX_SNAP_M, parse_latlon
+
+# --- SERVICE ROUTING (ASYNCIO, GRAF HANGAT DI MEMORI) ---
+# Satu proses server memuat graf SEKALI lalu melayani query shortest path lewat
+# HTTP/1.1 (TCP atau Unix socket, keep-alive), tanpa biaya startup interpreter,
+# import, dan load graf per query seperti `python run.py`.
+#
+#   GET /route?source=<osm>&target=<osm>[&path=1]   -> jarak (+ jalur)
+#   GET /route?instance=<nama file query>[&path=1]  -> start/end dari data/<nama>.json
+#   GET /route?from=<lat,lon>&to=<lat,lon>          -> koordinat GPS di-snap ke node terdekat (<= --snap-radius)
+#   GET /stats                                      -> histogram latency & statistik batching
+#   GET /health                                     -> status siap
+#
+# Batching: request yang tiba dalam jendela `batch_window` dikumpulkan lalu
+# dikelompokkan per SUMBER -> satu pencarian one-to-many per sumber.
+# Pencarian (CPU-bound) dijalankan di ProcessPoolExecutor agar event loop tetap
+# responsif; tiap worker memuat graf (mmap) dan punya SPTCache sendiri sehingga
+# sumber yang berulang di-resume, bukan diulang dari nol.
+
+DEFAULT_PORT = 8765
+BATCH_WINDOW_MS = 2.0
+MAX_BATCH = 256
+WORKER_CACHE_MB = 64
+
+# Bucket histogram latency (ms): batas atas 2^k, k = -4 .. 13 (0.0625 ms .. 8.2 detik)
+HIST_BOUNDS = [2.0 ** k for k in range(-4, 14)]
+# Jumlah sampel latency terakhir yang disimpan untuk persentil
+LATENCY_WINDOW = 100000
+
+
+# --- WORKER (proses terpisah) ---
+_W = {}
+
+
+def _worker_init(instance_path, cache_mb):
+    from instance_io import load_instance_csr
+    from spt_cache import SPTCache, cache_key
+
+    inst, csr = load_instance_csr(instance_path)
+    _W['csr'] = csr
+    _W['key'] = cache_key(inst)
+    _W['cache'] = SPTCache(cache_mb)
+
+
+def _worker_search(source, targets, with_path):
+    """Satu pencarian dari `source` untuk semua target batch. Mengembalikan (hasil per target, visited)."""
+    csr, cache = _W['csr'], _W['cache']
+    spt, _, visited = cache.search(csr, _W['key'], source, targets)
+    out = []
+    for t in targets:
+        d = spt.dist[t]
+        path = [csr.to_osm(u) for u in spt.path_to(t)] if with_path else None
+        out.append((d, path))
+    return out, visited
+
+
+# --- HISTOGRAM LATENCY ---
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(HIST_BOUNDS) + 1)
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+        self.total = 0
+
+    def record(self, ms):
+        self.total += 1
+        self.samples.append(ms)
+        for i, bound in enumerate(HIST_BOUNDS):
+            if ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def summary(self):
+        data = list(self.samples)
+        buckets = [{'le_ms': b, 'count': c} for b, c in zip(HIST_BOUNDS, self.counts) if c]
+        if self.counts[-1]:
+            buckets.append({'le_ms': math.inf, 'count': self.counts[-1]})
+        return {
+            'requests': self.total,
+            'p50_ms': percentile(data, 50), 'p90_ms': percentile(data, 90),
+            'p99_ms': percentile(data, 99), 'max_ms': max(data) if data else math.nan,
+            'buckets': buckets,
+        }
+
+    def print(self, title="Latency per request"):
+        s = self.summary()
+        print(f"\n--- [{title}] {s['requests']} request | p50 {s['p50_ms']:.3f} ms | "
+              f"p90 {s['p90_ms']:.3f} ms | p99 {s['p99_ms']:.3f} ms ---")
+        peak = max((b['count'] for b in s['buckets']), default=0)
+        for b in s['buckets']:
+            bar = '#' * max(1, round(40 * b['count'] / peak))
+            print(f"  <= {b['le_ms']:>9.4g} ms | {b['count']:>8} {bar}")
+
+
+# --- BATCHER ---
+class Batcher:
+    """Kumpulkan request selama jendela singkat lalu jalankan satu pencarian per sumber."""
+
+    def __init__(self, pool, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.pending = {}     # source -> list of (target, with_path, future)
+        self.size = 0
+        self.timer = None
+        self.stats = {'batches': 0, 'searches': 0, 'requests': 0, 'visited': 0}
+
+    def submit(self, source, target, with_path):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.pending.setdefault(source, []).append((target, with_path, fut))
+        self.size += 1
+        if self.size >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return fut
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, {}
+        self.stats['requests'] += self.size
+        self.size = 0
+        if not pending:
+            return
+        self.stats['batches'] += 1
+        for source, reqs in pending.items():
+            self.stats['searches'] += 1
+            asyncio.ensure_future(self._run(source, reqs))
+
+    async def _run(self, source, reqs):
+        loop = asyncio.get_running_loop()
+        targets = list(dict.fromkeys(t for t, _, _ in reqs))
+        with_path = any(p for _, p, _ in reqs)
+        try:
+            results, visited = await loop.run_in_executor(self.pool, _worker_search, source, targets, with_path)
+        except Exception as e:  # diteruskan ke setiap request dalam kelompok ini
+            for _, _, fut in reqs:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        self.stats['visited'] += visited
+        by_target = dict(zip(targets, results))
+        for t, p, fut in reqs:
+            d, path = by_target[t]
+            if not fut.done():
+                fut.set_result((d, path if p else None, len(reqs)))
+
+
+# --- SERVER HTTP ---
+class RoutingServer:
+    def __init__(self, instance_path, workers, window_ms, max_batch, cache_mb, snap_radius=MAX_SNAP_M):
+        from instance_io import load_instance_csr, load_spatial_index
+
+        self.instance_path = Path(instance_path)
+        inst, self.csr = load_instance_csr(instance_path)
+        self.graph_hash = inst.get('graph_hash')
+        self.index = load_spatial_index(instance_path, inst, self.csr) if self.csr.xs is not None else None
+        self.snap_radius = snap_radius
+        self.data_dir = self.instance_path.parent
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init,
+                                        initargs=(str(instance_path), cache_mb))
+        self.workers = workers
+        self.batcher = Batcher(self.pool, window_ms, max_batch)
+        self.hist = LatencyHistogram()
+        self.started = time.time()
+
+    def warmup(self):
+        """Pastikan semua worker sudah memuat graf sebelum menerima request."""
+        futures = [self.pool.submit(_worker_search, 0, [0], False) for _ in range(self.workers)]
+        for f in futures:
+            f.result()
+
+    def _resolve(self, params):
+        """(source_idx, target_idx) dari query string; ValueError jika tidak valid."""
+        if 'instance' in params:
+            path = self.data_dir / f"{Path(params['instance']).stem}.json"
+            if not path.exists():
+                raise ValueError(f"instance {params['instance']} tidak ditemukan")
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            ref = data.get('graph_ref') or {}
+            if self.graph_hash and ref.get('hash') != self.graph_hash:
+                raise ValueError(f"instance {params['instance']} memakai graf lain")
+            meta = data.get('meta') or {}
+            if 'start_node' not in meta or 'end_node' not in meta:
+                raise ValueError(f"instance {params['instance']} tidak memiliki meta start_node/end_node")
+            source, target = meta['start_node'], meta['end_node']
+        elif 'from' in params and 'to' in params:
+            # Koordinat GPS -> node terdekat lewat indeks grid (dimuat sekali)
+            if self.index is None:
+                raise ValueError("graf tidak memiliki koordinat, query from/to tidak didukung")
+            s = self.index.snap(*parse_latlon(params['from']), 'node', self.snap_radius)
+            t = self.index.snap(*parse_latlon(params['to']), 'node', self.snap_radius)
+            if s < 0 or t < 0:
+                raise ValueError(f"tidak ada node dalam {self.snap_radius:g} m dari koordinat "
+                                 f"{params['from' if s < 0 else 'to']}")
+            return s, t
+        elif 'source' in params and 'target' in params:
+            source, target = params['source'], params['target']
+        else:
+            raise ValueError("butuh parameter source & target, from & to (LAT,LON), atau instance")
+        s, t = self.csr.find(source), self.csr.find(target)
+        if s is None or t is None:
+            raise ValueError(f"node {source if s is None else target} tidak ada di graf")
+        return s, t
+
+    async def route(self, params):
+        s, t = self._resolve(params)
+        with_path = params.get('path') in ('1', 'true')
+        dist, path, batch = await self.batcher.submit(s, t, with_path)
+        body = {'source': self.csr.to_osm(s), 'target': self.csr.to_osm(t),
+                'distance': dist if dist != math.inf else None, 'batch': batch}
+        if with_path:
+            body['path'] = path
+        return 200, body
+
+    def stats(self):
+        b = self.batcher.stats
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'workers': self.workers,
+            'latency': self.hist.summary(),
+            'batching': {**b, 'requests_per_search': b['requests'] / b['searches'] if b['searches'] else 0.0},
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t0 = time.perf_counter()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    k, _, v = h.decode('latin-1').partition(':')
+                    headers[k.strip().lower()] = v.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                path = None
+                try:
+                    try:
+                        length = int(headers.get('content-length', 0) or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        keep_alive = False  # batas body tidak diketahui -> koneksi harus ditutup
+                        raise ValueError(f"Content-Length tidak valid: {headers['content-length']!r}")
+                    if length:
+                        await reader.readexactly(length)
+
+                    parts = line.decode('latin-1').split()
+                    url = urlsplit(parts[1] if len(parts) > 1 else '/')
+                    path = url.path
+                    params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    if path == '/route':
+                        status, body = await self.route(params)
+                    elif path == '/stats':
+                        status, body = 200, self.stats()
+                    elif path == '/health':
+                        status, body = 200, {'status': 'ok', 'graph': self.graph_hash}
+                    else:
+                        status, body = 404, {'error': f"path {path} tidak dikenal"}
+                except ValueError as e:
+                    status, body = 400, {'error': str(e)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # Misal worker mati (BrokenProcessPool): tetap jawab, jangan putus tanpa respons
+                    print(f"[ERROR] {type(e).__name__}: {e}")
+                    status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                payload = json.dumps(body).encode('utf-8')
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+                writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                             + payload)
+                await writer.drain()
+                if path == '/route':
+                    self.hist.record((time.perf_counter() - t0) * 1000.0)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    t0 = time.perf_counter()
+    app = RoutingServer(args.instance, args.workers, args.batch_window, args.max_batch, args.cache_mb,
+                        args.snap_radius)
+    app.warmup()
+    print(f"[INFO] Graf dimuat ({app.csr.num_nodes:,} node) + {args.workers} worker siap "
+          f"dalam {(time.perf_counter() - t0) * 1000.0:.0f} ms")
+
+    if args.unix:
+        Path(args.unix).unlink(missing_ok=True)  # socket basi dari run sebelumnya
+        server = await asyncio.start_unix_server(app.handle, path=args.unix)
+        print(f"[INFO] Melayani di unix:{args.unix}")
+    else:
+        server = await asyncio.start_server(app.handle, args.host, args.port)
+        print(f"[INFO] Melayani di http://{args.host}:{args.port}/route?source=..&target=..")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    async with server:
+        await stop.wait()
+    if args.unix:
+        Path(args.unix).unlink(missing_ok=True)
+
+    app.hist.print()
+    b = app.stats()['batching']
+    print(f"[INFO] Batching: {b['requests']} request -> {b['searches']} pencarian "
+          f"({b['requests_per_search']:.2f} request/pencarian, {b['batches']} batch)")
+    app.pool.shutdown()
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Server routing asyncio dengan graf hangat di memori')
+    p.add_argument('--instance', default='data/solo_route_G01.json', help='File instance yang menentukan graf')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    p.add_argument('--unix', metavar='PATH', help='Dengarkan di Unix socket, bukan TCP')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Jumlah proses pencarian')
+    p.add_argument('--batch-window', type=float, default=BATCH_WINDOW_MS,
+                   help='Jendela pengumpulan batch (ms); 0 = tanpa menunggu')
+    p.add_argument('--max-batch', type=int, default=MAX_BATCH, help='Flush batch saat mencapai ukuran ini')
+    p.add_argument('--cache-mb', type=float, default=WORKER_CACHE_MB, help='Batas cache SPT per worker (MB)')
+    p.add_argument('--snap-radius', type=float, default=MAX_SNAP_M, metavar='METER',
+                   help='Jarak maksimum titik from/to ke node terdekat (default %(default)s m)')
+    args = p.parse_args()
+
+    asyncio.run(serve(args))
@@ -0,0 +1,468 @@
+import argparse
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from geo import EARTH_RADIUS_M
+
+# --- INDEKS SPASIAL: SNAP KOORDINAT GPS KE NODE / RUAS JALAN ---
+# Grid seragam di atas proyeksi equirectangular lokal (meter):
+#   x = lon * kx - x0,  y = lat * ky - y0,  kx = R * cos(lat_tengah) * pi/180, ky = R * pi/180
+# Ukuran sel dipilih agar rata-rata ~NODES_PER_CELL node per sel.
+#   sel node    : node yang koordinatnya jatuh di sel tsb (CSR: cell_offsets/cell_nodes)
+#   sel segmen  : ruas jalan (u, v) tak berarah yang bounding box-nya menyentuh sel
+# Query node terdekat memeriksa sel dalam "cincin" yang melebar dari sel titik
+# query; berhenti begitu jarak terbaik <= r * ukuran sel (node di cincin
+# berikutnya pasti lebih jauh). Batch query memakai numpy (blok 3x3 sel sekaligus,
+# lalu 7x7 dan 15x15 untuk titik yang belum pasti, sisanya pencarian cincin).
+#
+# File .grid (data/graphs/<hash>.grid), little-endian, setiap blok rata 8 byte:
+#   header (160 byte): magic, versi, V, nx, ny, S, Vc, L, cell, x0, y0, kx, ky, hash graf sumber
+#   px, py float64[V]                          koordinat proyeksi (nan = tanpa koordinat)
+#   cell_offsets int64[nx*ny+1], cell_nodes int32[Vc]
+#   seg_u, seg_v int32[S]                      ruas jalan unik
+#   seg_offsets int64[nx*ny+1], seg_cells int32[L]
+
+GRID_MAGIC = b'SPGRID\0\0'
+GRID_VERSION = 1
+GRID_HEADER = struct.Struct('<8sIqiiqqqddddd40s')
+GRID_HEADER_SIZE = 160
+
+NODES_PER_CELL = 2.0
+# Jumlah titik per blok numpy pada batch query (membatasi memori sementara)
+BATCH_CHUNK = 4096
+# Radius blok sel (Chebyshev) yang dicoba berurutan pada batch query sebelum pencarian cincin
+BLOCK_RADII = (1, 3, 7)
+# Simpangan baku derau titik benchmark (meter), kira-kira akurasi GPS ponsel
+GPS_NOISE_M = 25.0
+# Jarak snap maksimum default (meter): titik lebih jauh dari ini dianggap di luar peta
+MAX_SNAP_M = 300.0
+
+
+class SpatialIndex:
+    """Grid seragam atas node & ruas jalan (array biasa setelah dibangun, atau memoryview hasil mmap)."""
+
+    def __init__(self, header, cols):
+        (self.num_nodes, self.nx, self.ny, self.num_segments, self.cell,
+         self.x0, self.y0, self.kx, self.ky, self.source_hash) = header
+        (self.px, self.py, self.cell_offsets, self.cell_nodes,
+         self.seg_u, self.seg_v, self.seg_offsets, self.seg_cells) = cols
+        self._padded = None
+
+    def project(self, lat, lon):
+        return lon * self.kx - self.x0, lat * self.ky - self.y0
+
+    def _cell_of(self, x, y):
+        cx = min(max(int(x // self.cell), 0), self.nx - 1)
+        cy = min(max(int(y // self.cell), 0), self.ny - 1)
+        return cx, cy
+
+    def _ring(self, cx, cy, r):
+        """Indeks sel pada cincin berjarak r (Chebyshev) dari (cx, cy), dalam batas grid."""
+        nx, ny = self.nx, self.ny
+        if r == 0:
+            yield cy * nx + cx
+            return
+        for gx in range(max(cx - r, 0), min(cx + r, nx - 1) + 1):
+            for gy in (cy - r, cy + r):
+                if 0 <= gy < ny:
+                    yield gy * nx + gx
+        for gy in range(max(cy - r + 1, 0), min(cy + r - 1, ny - 1) + 1):
+            for gx in (cx - r, cx + r):
+                if 0 <= gx < nx:
+                    yield gy * nx + gx
+
+    # --- NODE TERDEKAT ---
+    def nearest(self, lat, lon, max_dist=math.inf):
+        """
+        (indeks node terdekat, jarak meter); (-1, inf) jika graf tanpa koordinat
+        atau tidak ada node dalam radius max_dist meter.
+        """
+        x, y = self.project(lat, lon)
+        cx, cy = self._cell_of(x, y)
+        px, py = self.px, self.py
+        offsets, nodes = self.cell_offsets, self.cell_nodes
+        best, best_d2 = -1, math.inf
+        max_r = max(self.nx, self.ny)
+        r = 0
+        while r <= max_r:
+            for c in self._ring(cx, cy, r):
+                for j in range(offsets[c], offsets[c + 1]):
+                    n = nodes[j]
+                    dx, dy = px[n] - x, py[n] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2:
+                        best, best_d2 = n, d2
+            # Node di cincin r+1 berjarak >= r * cell dari titik query
+            bound = r * self.cell
+            if (best >= 0 and best_d2 <= bound * bound) or bound > max_dist:
+                break
+            r += 1
+        if best_d2 > max_dist * max_dist:
+            return -1, math.inf
+        return best, math.sqrt(best_d2)
+
+    def _padded_cells(self, np):
+        """Matriks (sel, K maks) indeks node per sel, -1 = kosong; untuk batch numpy."""
+        if self._padded is None:
+            offsets = np.frombuffer(self.cell_offsets, dtype=np.int64)
+            counts = np.diff(offsets)
+            k = max(1, int(counts.max()) if len(counts) else 1)
+            padded = np.full((len(counts), k), -1, dtype=np.int64)
+            nodes = np.frombuffer(self.cell_nodes, dtype=np.int32)
+            cell_of = np.repeat(np.arange(len(counts)), counts)
+            slot = np.arange(len(nodes)) - np.repeat(offsets[:-1], counts)
+            padded[cell_of, slot] = nodes
+            self._padded = padded
+        return self._padded
+
+    def _block_nearest(self, np, x, y, radius):
+        """Node terdekat di blok (2r+1)^2 sel sekitar tiap titik (koordinat proyeksi)."""
+        padded = self._padded_cells(np)
+        nx, ny, cell = self.nx, self.ny, self.cell
+        span = np.arange(-radius, radius + 1)
+        cx = np.clip(np.floor(x / cell), 0, nx - 1).astype(np.int64)
+        cy = np.clip(np.floor(y / cell), 0, ny - 1).astype(np.int64)
+        gx = np.broadcast_to(cx[:, None, None] + span[None, None, :], (len(x), len(span), len(span)))
+        gy = np.broadcast_to(cy[:, None, None] + span[None, :, None], (len(x), len(span), len(span)))
+        gx, gy = gx.reshape(len(x), -1), gy.reshape(len(x), -1)
+        valid = (gx >= 0) & (gx < nx) & (gy >= 0) & (gy < ny)
+        cells = np.where(valid, gy * nx + gx, 0)
+        cand = np.where(valid[:, :, None], padded[cells], -1).reshape(len(x), -1)
+
+        d2 = (self._px_np[cand] - x[:, None]) ** 2 + (self._py_np[cand] - y[:, None]) ** 2
+        pick = np.argmin(d2, axis=1)
+        rows = np.arange(len(x))
+        return cand[rows, pick], np.sqrt(d2[rows, pick])
+
+    def nearest_many(self, lats, lons):
+        """
+        Node terdekat untuk banyak titik sekaligus (numpy). Mengembalikan
+        (array indeks node, array jarak meter).
+        """
+        import numpy as np  # Hanya dibutuhkan untuk batch query
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if self._padded is None:
+            self._padded_cells(np)
+            # Indeks -1 (slot kosong) menunjuk elemen terakhir -> jarak inf
+            self._px_np = np.append(np.frombuffer(self.px, dtype=np.float64), np.inf)
+            self._py_np = np.append(np.frombuffer(self.py, dtype=np.float64), np.inf)
+
+        out_idx = np.empty(len(lats), dtype=np.int64)
+        out_dist = np.empty(len(lats), dtype=np.float64)
+        for lo in range(0, len(lats), BATCH_CHUNK):
+            x = lons[lo:lo + BATCH_CHUNK] * self.kx - self.x0
+            y = lats[lo:lo + BATCH_CHUNK] * self.ky - self.y0
+            idx = np.full(len(x), -1, dtype=np.int64)
+            dist = np.full(len(x), np.inf)
+            pending = np.arange(len(x))
+            # Blok r menjamin hasil jika jarak terbaik <= r sel; sisanya dicoba dengan blok lebih besar
+            for radius in BLOCK_RADII:
+                i, d = self._block_nearest(np, x[pending], y[pending], radius)
+                done = (i >= 0) & (d <= radius * self.cell)
+                idx[pending[done]], dist[pending[done]] = i[done], d[done]
+                pending = pending[~done]
+                if not len(pending):
+                    break
+            for q in pending:
+                idx[q], dist[q] = self.nearest(lats[lo + q], lons[lo + q])
+            out_idx[lo:lo + len(x)] = idx
+            out_dist[lo:lo + len(x)] = dist
+        return out_idx, out_dist
+
+    # --- RUAS JALAN TERDEKAT ---
+    def snap_road(self, lat, lon, max_dist=math.inf):
+        """
+        Ruas jalan terdekat: (u, v, t, jarak meter) dengan titik proyeksi di
+        u + t * (v - u), 0 <= t <= 1. (-1, -1, 0.0, inf) jika tidak ada ruas
+        dalam radius max_dist meter.
+        """
+        x, y = self.project(lat, lon)
+        cx, cy = self._cell_of(x, y)
+        px, py = self.px, self.py
+        offsets, cells, seg_u, seg_v = self.seg_offsets, self.seg_cells, self.seg_u, self.seg_v
+        best, best_t, best_d2 = -1, 0.0, math.inf
+        seen = set()
+        max_r = max(self.nx, self.ny)
+        r = 0
+        while r <= max_r:
+            for c in self._ring(cx, cy, r):
+                for j in range(offsets[c], offsets[c + 1]):
+                    s = cells[j]
+                    if s in seen:
+                        continue
+                    seen.add(s)
+                    ax, ay = px[seg_u[s]], py[seg_u[s]]
+                    dx, dy = px[seg_v[s]] - ax, py[seg_v[s]] - ay
+                    length2 = dx * dx + dy * dy
+                    t = ((x - ax) * dx + (y - ay) * dy) / length2 if length2 > 0 else 0.0
+                    t = min(max(t, 0.0), 1.0)
+                    ex, ey = ax + t * dx - x, ay + t * dy - y
+                    d2 = ex * ex + ey * ey
+                    if d2 < best_d2:
+                        best, best_t, best_d2 = s, t, d2
+            # Ruas yang belum terlihat tidak menyentuh blok cincin <= r -> jaraknya >= r * cell
+            bound = r * self.cell
+            if (best >= 0 and best_d2 <= bound * bound) or bound > max_dist:
+                break
+            r += 1
+        if best < 0 or best_d2 > max_dist * max_dist:
+            return -1, -1, 0.0, math.inf
+        return seg_u[best], seg_v[best], best_t, math.sqrt(best_d2)
+
+    def snap(self, lat, lon, mode='node', max_dist=MAX_SNAP_M):
+        """
+        Indeks node untuk titik GPS: node terdekat, atau ujung terdekat dari ruas
+        jalan terdekat. -1 jika tidak ada node/ruas dalam radius max_dist meter.
+        """
+        if mode == 'node':
+            return self.nearest(lat, lon, max_dist)[0]
+        u, v, t, _ = self.snap_road(lat, lon, max_dist)
+        if u < 0:
+            return -1
+        return u if t <= 0.5 else v
+
+
+# --- PEMBANGUNAN ---
+def build_index(csr, source_hash=''):
+    V = csr.num_nodes
+    xs, ys = csr.xs, csr.ys
+    if xs is None:
+        raise ValueError("Graf tidak memiliki koordinat node; indeks spasial tidak bisa dibangun")
+
+    has = [not (math.isnan(xs[u]) or math.isnan(ys[u])) for u in range(V)]
+    lats = [ys[u] for u in range(V) if has[u]]
+    lat_mid = (min(lats) + max(lats)) / 2 if lats else 0.0
+    ky = EARTH_RADIUS_M * math.pi / 180.0
+    kx = ky * math.cos(math.radians(lat_mid))
+    raw_x = [xs[u] * kx if has[u] else math.nan for u in range(V)]
+    raw_y = [ys[u] * ky if has[u] else math.nan for u in range(V)]
+    valid_x = [v for v in raw_x if not math.isnan(v)] or [0.0]
+    valid_y = [v for v in raw_y if not math.isnan(v)] or [0.0]
+    x0, y0 = min(valid_x), min(valid_y)
+    width, height = max(valid_x) - x0, max(valid_y) - y0
+    px = array('d', (v - x0 for v in raw_x))
+    py = array('d', (v - y0 for v in raw_y))
+
+    n_valid = max(1, sum(has))
+    cell = math.sqrt(width * height * NODES_PER_CELL / n_valid) if width > 0 and height > 0 else 0.0
+    cell = max(cell, (width + height) / n_valid, 1.0)  # peta "garis" / satu titik
+    nx, ny = int(width // cell) + 1, int(height // cell) + 1
+
+    def cell_id(x, y):
+        return min(int(y // cell), ny - 1) * nx + min(int(x // cell), nx - 1)
+
+    C = nx * ny
+    node_cells = [[] for _ in range(C)]
+    for u in range(V):
+        if has[u]:
+            node_cells[cell_id(px[u], py[u])].append(u)
+
+    # Ruas unik tak berarah (edge dua arah hanya sekali), dimasukkan ke semua sel bounding box-nya
+    seen = set()
+    seg_u, seg_v = array('i'), array('i')
+    seg_in_cells = [[] for _ in range(C)]
+    offsets, targets = csr.offsets, csr.targets
+    for u in range(V):
+        if not has[u]:
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            key = (u, v) if u < v else (v, u)
+            if u == v or not has[v] or key in seen:
+                continue
+            seen.add(key)
+            s = len(seg_u)
+            seg_u.append(u)
+            seg_v.append(v)
+            gx0, gx1 = int(min(px[u], px[v]) // cell), min(int(max(px[u], px[v]) // cell), nx - 1)
+            gy0, gy1 = int(min(py[u], py[v]) // cell), min(int(max(py[u], py[v]) // cell), ny - 1)
+            for gy in range(gy0, gy1 + 1):
+                for gx in range(gx0, gx1 + 1):
+                    seg_in_cells[gy * nx + gx].append(s)
+
+    def flatten(lists):
+        offs, flat = array('q', [0]), array('i')
+        for items in lists:
+            flat.extend(items)
+            offs.append(len(flat))
+        return offs, flat
+
+    cell_offsets, cell_nodes = flatten(node_cells)
+    seg_offsets, seg_cells = flatten(seg_in_cells)
+    header = (V, nx, ny, len(seg_u), cell, x0, y0, kx, ky, source_hash)
+    return SpatialIndex(header, (px, py, cell_offsets, cell_nodes, seg_u, seg_v, seg_offsets, seg_cells))
+
+
+# --- PERSISTENSI (.grid) ---
+_COLUMN_CODES = ('d', 'd', 'q', 'i', 'i', 'i', 'q', 'i')
+
+
+def save_index(index, path):
+    path = Path(path)
+    cols = [array(code, col) for code, col in zip(_COLUMN_CODES, (
+        index.px, index.py, index.cell_offsets, index.cell_nodes,
+        index.seg_u, index.seg_v, index.seg_offsets, index.seg_cells))]
+    if sys.byteorder != 'little':
+        for col in cols:
+            col.byteswap()
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        header = GRID_HEADER.pack(GRID_MAGIC, GRID_VERSION, index.num_nodes, index.nx, index.ny,
+                                  index.num_segments, len(index.cell_nodes), len(index.seg_cells),
+                                  index.cell, index.x0, index.y0, index.kx, index.ky,
+                                  index.source_hash.encode('ascii')[:40])
+        f.write(header.ljust(GRID_HEADER_SIZE, b'\0'))
+        for col in cols:
+            raw = col.tobytes()
+            f.write(raw.ljust(8 * ((len(raw) + 7) // 8), b'\0'))
+    tmp.replace(path)
+
+
+def open_index(path):
+    """Buka file .grid via mmap (zero-copy). None jika file tidak ada / versi berbeda."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        raw = f.read(GRID_HEADER.size)
+        if len(raw) < GRID_HEADER.size:
+            return None
+        (magic, version, V, nx, ny, S, Vc, L,
+         cell, x0, y0, kx, ky, h) = GRID_HEADER.unpack(raw)
+        if magic != GRID_MAGIC or version != GRID_VERSION:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    C = nx * ny
+    view = memoryview(mm)
+    pos = GRID_HEADER_SIZE
+    cols = []
+    for code, count in zip(_COLUMN_CODES, (V, V, C + 1, Vc, S, S, C + 1, L)):
+        size = count * array(code).itemsize
+        chunk = view[pos:pos + size]
+        if sys.byteorder == 'little':
+            cols.append(chunk.cast(code))
+        else:
+            col = array(code, chunk.tobytes())
+            col.byteswap()
+            cols.append(col)
+        pos += 8 * ((size + 7) // 8)
+
+    index = SpatialIndex((V, nx, ny, S, cell, x0, y0, kx, ky, h.rstrip(b'\0').decode('ascii')), cols)
+    index._mmap = mm
+    return index
+
+
+def load_or_build(csr, path, source_hash=''):
+    """Buka .grid jika cocok dengan graf (hash & V), jika tidak bangun lalu simpan."""
+    index = open_index(path)
+    if index is not None and index.num_nodes == csr.num_nodes and index.source_hash == source_hash:
+        return index
+    save_index(build_index(csr, source_hash), path)
+    return open_index(path)
+
+
+def parse_latlon(text):
+    """'lat,lon' -> (lat, lon) float. ValueError jika formatnya salah."""
+    try:
+        lat, lon = (float(v) for v in text.split(','))
+    except ValueError:
+        raise ValueError(f"koordinat '{text}' harus berformat LAT,LON") from None
+    return lat, lon
+
+
+# --- BENCHMARK: SCAN LINEAR vs GRID vs BATCH NUMPY ---
+def benchmark(instance_path, n_points, seed):
+    from instance_io import load_instance_csr, load_spatial_index
+
+    inst, csr = load_instance_csr(instance_path)
+    t0 = time.perf_counter()
+    index = load_spatial_index(instance_path, inst, csr)
+    t_load = (time.perf_counter() - t0) * 1000.0
+
+    # Titik mirip GPS: posisi node acak + derau normal GPS_NOISE_M meter
+    rnd = random.Random(seed)
+    with_coords = [u for u in range(csr.num_nodes) if not math.isnan(index.px[u])]
+    points = []
+    for _ in range(n_points):
+        u = rnd.choice(with_coords)
+        points.append((csr.ys[u] + rnd.gauss(0, GPS_NOISE_M / index.ky),
+                       csr.xs[u] + rnd.gauss(0, GPS_NOISE_M / index.kx)))
+
+    # Cara lama: scan linear semua koordinat node per titik
+    coords = [(index.px[u], index.py[u]) for u in range(csr.num_nodes)]
+    t0 = time.perf_counter()
+    linear = []
+    for lat, lon in points:
+        x, y = index.project(lat, lon)
+        linear.append(min(range(len(coords)), key=lambda u: (coords[u][0] - x) ** 2 + (coords[u][1] - y) ** 2))
+    t_linear = (time.perf_counter() - t0) * 1e6 / n_points
+
+    t0 = time.perf_counter()
+    grid = [index.nearest(lat, lon)[0] for lat, lon in points]
+    t_grid = (time.perf_counter() - t0) * 1e6 / n_points
+
+    index.nearest_many([points[0][0]], [points[0][1]])  # bangun struktur numpy sekali
+    t0 = time.perf_counter()
+    batch, _ = index.nearest_many([p[0] for p in points], [p[1] for p in points])
+    t_batch = (time.perf_counter() - t0) * 1e6 / n_points
+
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        index.snap_road(lat, lon)
+    t_road = (time.perf_counter() - t0) * 1e6 / n_points
+
+    print(f"=== INDEKS SPASIAL: {n_points} titik GPS acak ({Path(instance_path).name}, V={csr.num_nodes:,}) ===")
+    print(f"  Grid {index.nx}x{index.ny} sel @ {index.cell:.1f} m, {index.num_segments:,} ruas jalan "
+          f"(load/build {t_load:.1f} ms)")
+    print(f"  Scan linear O(V)   : {t_linear:10.2f} us/titik")
+    print(f"  Grid (node)        : {t_grid:10.2f} us/titik  ({t_linear / t_grid:.0f}x)")
+    print(f"  Grid batch (numpy) : {t_batch:10.2f} us/titik  ({t_linear / t_batch:.0f}x)")
+    print(f"  Grid (ruas jalan)  : {t_road:10.2f} us/titik")
+
+    # Jarak (bukan indeks) dibandingkan: dua node bisa berjarak sama persis
+    def d2(u, lat, lon):
+        x, y = index.project(lat, lon)
+        return (coords[u][0] - x) ** 2 + (coords[u][1] - y) ** 2
+
+    wrong = sum(1 for (lat, lon), a, b, c in zip(points, linear, grid, batch)
+                if not (d2(a, lat, lon) == d2(b, lat, lon) == d2(int(c), lat, lon)))
+    if wrong:
+        print(f"[ERROR] {wrong} titik berbeda dari scan linear!")
+        return 1
+    print("[SUKSES] Hasil grid & batch identik dengan scan linear.")
+    return 0
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Indeks spasial grid untuk snap koordinat GPS ke node / ruas jalan')
+    p.add_argument('--instance', default='data/solo_route_G01.json', help='File instance (menentukan graf)')
+    p.add_argument('--points', type=int, default=2000, help='Jumlah titik GPS acak benchmark')
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--snap', metavar='LAT,LON', help='Snap satu titik lalu cetak node & ruas terdekat')
+    args = p.parse_args()
+
+    if args.snap:
+        from instance_io import load_instance_csr, load_spatial_index
+        inst, csr = load_instance_csr(args.instance)
+        index = load_spatial_index(args.instance, inst, csr)
+        lat, lon = parse_latlon(args.snap)
+        t0 = time.perf_counter()
+        node, dist = index.nearest(lat, lon)
+        us = (time.perf_counter() - t0) * 1e6
+        u, v, t, road = index.snap_road(lat, lon)
+        print(f"Node terdekat : {csr.to_osm(node)} ({dist:.1f} m, {us:.1f} us)")
+        print(f"Ruas terdekat : {csr.to_osm(u)} -> {csr.to_osm(v)} (t={t:.2f}, {road:.1f} m)")
+        sys.exit(0)
+    sys.exit(benchmark(args.instance, args.points, args.seed))
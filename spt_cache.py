@@ -0,0 +1,221 @@
+import argparse
+import pickle
+import random
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from routing import INF, ShortestPathTree, dijkstra, resume
+
+# --- CACHE SHORTEST-PATH TREE PER (HASH GRAF, SUMBER) ---
+# Query dengan sumber yang sama tidak perlu mengulang Dijkstra dari nol:
+# state pencarian (jarak, predecessor, frontier heap) disimpan per
+# (hash graf, sumber). Query berikutnya ke target lain:
+#   hit    : jarak target sudah final (<= minimum frontier) -> jawab langsung
+#   resume : lanjutkan pencarian dari frontier tersimpan sampai target di-settle
+#   miss   : belum ada state -> Dijkstra baru (state-nya ikut disimpan)
+# Eviction LRU dibatasi perkiraan memori (byte) semua entri.
+# Cache bisa disimpan ke disk (pickle) dan dimuat lagi di run berikutnya;
+# kunci memuat hash graf sehingga entri milik graf lain tidak pernah terpakai.
+# Setelah update bobot live (dynamic_sssp.LiveGraph), repair() memperbaiki SPT
+# lengkap secara inkremental dan memindahkannya ke kunci versi graf yang baru.
+
+DEFAULT_MAX_MB = 256
+CACHE_VERSION = 1
+
+# Perkiraan ukuran objek CPython (64-bit) untuk estimasi memori entri
+_PTR = 8            # satu slot list
+_FLOAT = 24         # objek float jarak
+_HEAP_ENTRY = 64    # tuple (jarak, node) di frontier
+_LIST = 56          # objek list kosong (daftar anak per node untuk repair)
+
+
+def cache_key(inst):
+    """Kunci graf untuk cache: hash graf master, atau hash adjacency untuk format lama."""
+    if 'graph_hash' in inst:
+        return inst['graph_hash']
+    from instance_io import graph_hash
+    return graph_hash(inst.get('nodes') or {}, inst['graph'])
+
+
+def entry_bytes(spt):
+    """Perkiraan memori satu entri: list jarak + predecessor + frontier + float yang tercapai."""
+    V = len(spt.dist)
+    size = _PTR * V + _FLOAT * (spt.visited + len(spt.frontier))
+    if spt.pred is not None:
+        size += _PTR * V
+    if spt.children is not None:
+        size += (_PTR + _LIST) * V + _PTR * V
+    return size + (_PTR + _HEAP_ENTRY) * len(spt.frontier)
+
+
+class SPTCache:
+    """Cache LRU state Dijkstra per (hash graf, sumber) dengan statistik hit/resume/miss."""
+
+    def __init__(self, max_mb=DEFAULT_MAX_MB, with_pred=True):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.with_pred = with_pred
+        self.entries = OrderedDict()   # (graph_hash, source) -> ShortestPathTree
+        self.sizes = {}
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'resumes': 0, 'misses': 0, 'evictions': 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _store(self, key, spt):
+        self.total_bytes -= self.sizes.get(key, 0)
+        size = entry_bytes(spt)
+        self.entries[key] = spt
+        self.entries.move_to_end(key)
+        self.sizes[key] = size
+        self.total_bytes += size
+        # Entri yang baru dipakai tidak pernah di-evict, walau sendirian melebihi batas
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            old_key, _ = self.entries.popitem(last=False)
+            self.total_bytes -= self.sizes.pop(old_key)
+            self.stats['evictions'] += 1
+
+    def search(self, csr, graph_hash, source, targets):
+        """
+        State pencarian dari `source` dengan jarak semua `targets` sudah final.
+        Mengembalikan (spt, status, visited baru) dengan status 'hit'/'resume'/'miss'.
+        """
+        key = (graph_hash, source)
+        spt = self.entries.get(key)
+        if spt is None:
+            spt = dijkstra(csr, source, targets, with_pred=self.with_pred)
+            status, visited = 'miss', spt.visited
+        else:
+            pending = [t for t in targets if not spt.is_final(t)]
+            if not pending:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return spt, 'hit', 0
+            before = spt.visited
+            resume(csr, spt, pending)
+            status, visited = 'resume', spt.visited - before
+        self.stats['resumes' if status == 'resume' else 'misses'] += 1
+        self._store(key, spt)
+        return spt, status, visited
+
+    def distance(self, csr, graph_hash, source, target):
+        """(jarak, visited baru, status) source -> target."""
+        spt, status, visited = self.search(csr, graph_hash, source, (target,))
+        return spt.dist[target], visited, status
+
+    def path(self, csr, graph_hash, source, target):
+        """(jarak, [indeks node], visited baru, status) source -> target."""
+        spt, status, visited = self.search(csr, graph_hash, source, (target,))
+        return spt.dist[target], spt.path_to(target), visited, status
+
+    def summary(self):
+        s = self.stats
+        total = s['hits'] + s['resumes'] + s['misses']
+        reuse = (s['hits'] + s['resumes']) / total if total else 0.0
+        return (f"SPT cache: {total} query | hit {s['hits']} | resume {s['resumes']} | miss {s['misses']} | "
+                f"reuse {reuse:.0%} | entri {len(self)} (~{self.total_bytes / 1024 / 1024:.1f} MB) | "
+                f"evict {s['evictions']}")
+
+    def repair(self, live, changes, old_key):
+        """
+        Perbaiki entri graf `old_key` setelah live.update(changes): SPT lengkap
+        di-repair inkremental lalu disimpan di bawah live.key; entri parsial
+        (frontier belum habis) dibuang. Mengembalikan statistik repair.
+        """
+        from dynamic_sssp import repair as repair_tree
+
+        stats = {'repaired': 0, 'dropped': 0, 'affected': 0, 'settled': 0}
+        for key in [k for k in self.entries if k[0] == old_key]:
+            spt = self.entries.pop(key)
+            self.total_bytes -= self.sizes.pop(key)
+            if spt.pred is None or spt.frontier is None or spt.frontier:
+                stats['dropped'] += 1
+                continue
+            result = repair_tree(live, spt, changes)
+            stats['repaired'] += 1
+            stats['affected'] += result['affected']
+            stats['settled'] += result['settled']
+            self._store((live.key, key[1]), spt)
+        return stats
+
+    # --- PERSISTENSI ---
+    def save(self, path):
+        """Simpan semua entri (urutan LRU dipertahankan) ke file pickle."""
+        rows = []
+        for (graph_hash, source), spt in self.entries.items():
+            pred = array('i', spt.pred) if spt.pred is not None else None
+            rows.append((graph_hash, source, array('d', spt.dist), pred, spt.visited, spt.frontier))
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'with_pred': self.with_pred, 'entries': rows}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @classmethod
+    def load(cls, path, max_mb=DEFAULT_MAX_MB):
+        """Muat cache dari file; file tidak ada / versi berbeda -> cache kosong."""
+        cache = cls(max_mb)
+        path = Path(path)
+        if not path.exists():
+            return cache
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != CACHE_VERSION:
+            print(f"[WARN] Versi cache {path} tidak cocok, cache diabaikan.")
+            return cache
+        cache.with_pred = data['with_pred']
+        for graph_hash, source, dist, pred, visited, frontier in data['entries']:
+            spt = ShortestPathTree(source, dist.tolist(), pred.tolist() if pred is not None else None,
+                                   visited, frontier)
+            cache._store((graph_hash, source), spt)
+        return cache
+
+
+# --- BENCHMARK: QUERY BERSUMBER SAMA, TANPA vs DENGAN CACHE ---
+def benchmark(instance_path, n_sources, n_targets, max_mb, seed, persist=None):
+    from instance_io import load_instance_csr
+
+    inst, csr = load_instance_csr(instance_path)
+    graph_hash = cache_key(inst)
+    rnd = random.Random(seed)
+    sources = rnd.sample(range(csr.num_nodes), min(n_sources, csr.num_nodes))
+    queries = [(rnd.choice(sources), rnd.randrange(csr.num_nodes)) for _ in range(n_sources * n_targets)]
+
+    t0 = time.perf_counter()
+    cold = [dijkstra(csr, s, (t,)).dist[t] for s, t in queries]
+    t_cold = (time.perf_counter() - t0) * 1000.0
+
+    cache = SPTCache.load(persist, max_mb) if persist else SPTCache(max_mb)
+    t0 = time.perf_counter()
+    warm = [cache.distance(csr, graph_hash, s, t)[0] for s, t in queries]
+    t_warm = (time.perf_counter() - t0) * 1000.0
+
+    mismatch = sum(1 for a, b in zip(cold, warm) if a != b and not (a == INF and b == INF))
+    print(f"=== SPT CACHE: {len(queries)} query, {len(sources)} sumber ({Path(instance_path).name}) ===")
+    print(f"Tanpa cache : {t_cold:9.2f} ms")
+    print(f"Dengan cache: {t_warm:9.2f} ms  (speedup {t_cold / t_warm if t_warm > 0 else 0:.1f}x)")
+    print(f"[INFO] {cache.summary()}")
+    if mismatch:
+        print(f"[ERROR] {mismatch} jarak berbeda dari Dijkstra tanpa cache!")
+        return 1
+    print("[SUKSES] Semua jarak identik dengan Dijkstra tanpa cache.")
+    if persist:
+        print(f"[INFO] Cache disimpan di: {cache.save(persist)}")
+    return 0
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Benchmark cache shortest-path tree per (graf, sumber)')
+    p.add_argument('--instance', default='data/solo_route_G01.json', help='File instance (menentukan graf)')
+    p.add_argument('--sources', type=int, default=10, help='Jumlah sumber berbeda')
+    p.add_argument('--targets', type=int, default=20, help='Jumlah query per sumber')
+    p.add_argument('--max-mb', type=float, default=DEFAULT_MAX_MB, help='Batas memori cache (MB)')
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--persist', metavar='FILE', help='Muat/simpan cache dari/ke file ini')
+    args = p.parse_args()
+
+    sys.exit(benchmark(args.instance, args.sources, args.targets, args.max_mb, args.seed, args.persist))
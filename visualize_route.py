@@ -1,127 +1,122 @@
-import json
-import heapq
 import matplotlib.pyplot as plt
 import argparse
+import time
 from pathlib import Path
-
-# --- FUNGSI DIJKSTRA (Khusus untuk melacak jalur) ---
-def get_dijkstra_path(graph, start, end):
-    """
-    Menjalankan Dijkstra untuk mendapatkan urutan node (path).
-    Mengembalikan list node: [start, node_a, node_b, ..., end]
-    """
-    # Inisialisasi
-    distances = {node: float('inf') for node in graph}
-    distances[start] = 0
-    pq = [(0, start)]
-    
-    # Dictionary untuk melacak parent node agar bisa backtrack jalur
-    predecessors = {node: None for node in graph} 
-    
-    while pq:
-        curr_dist, curr_node = heapq.heappop(pq)
-        
-        if curr_node == end:
-            break # Tujuan ditemukan
-        
-        if curr_dist > distances.get(curr_node, float('inf')):
-            continue
-            
-        # Cek Tetangga
-        neighbors = graph.get(curr_node, {})
-        for neighbor, weight in neighbors.items():
-            new_dist = curr_dist + weight
-            
-            # Jika belum ada di distances, anggap infinity
-            if neighbor not in distances:
-                distances[neighbor] = float('inf')
-            
-            if new_dist < distances[neighbor]:
-                distances[neighbor] = new_dist
-                predecessors[neighbor] = curr_node # Simpan jejak
-                heapq.heappush(pq, (new_dist, neighbor))
-    
-    # --- REKONSTRUKSI JALUR (Backtracking) ---
-    path = []
-    curr = end
-    
-    # Cek apakah end node terjangkau
-    if distances.get(end) == float('inf'):
-        return [] # Tidak ada jalur
-
-    while curr is not None:
-        path.append(curr)
-        curr = predecessors.get(curr)
-        
-    return path[::-1] # Balik urutan agar dari Start -> End
+from instance_io import load_instance_csr, load_ch, load_spatial_index
+from map_render import add_isochrone, add_network, add_routes, path_coords
+from alternatives import METHODS as ALT_METHODS, alternatives
+from instrument import PhaseTimer
+from isochrone import isochrone
+from routing import dijkstra
+from spatial_index import MAX_SNAP_M, parse_latlon
 
 # --- FUNGSI VISUALISASI ---
-def visualize(json_path):
+def visualize(json_path, use_ch=False, origin=None, dest=None, snap='node', snap_radius=MAX_SNAP_M,
+              isochrone_min=None, n_alternatives=None, alt_method='plateau'):
     print(f"--- Memvisualisasikan: {json_path} ---")
+    phases = PhaseTimer()
     
-    # 1. Load Data
+    # 1. Load Data (graf dari cache biner via mmap)
     try:
-        with open(json_path, 'r') as f:
-            data = json.load(f)
+        with phases.phase('load'):
+            data, csr = load_instance_csr(json_path)
     except FileNotFoundError:
         print("File tidak ditemukan.")
         return
 
-    nodes_coords = data.get('nodes') # Koordinat {id: {x:..., y:...}}
-    graph_adj = data.get('graph')
+    xs, ys = csr.xs, csr.ys # Koordinat per indeks node (lon, lat)
     
-    if not nodes_coords:
+    if xs is None:
         print("ERROR: File JSON ini tidak memiliki data koordinat 'nodes'.")
         print("Solusi: Jalankan ulang 'generate_instances.py' yang baru.")
         return
 
-    start_node = str(data['meta']['start_node'])
-    end_node = str(data['meta']['end_node'])
+    start_node = csr.to_index(data['meta']['start_node'])
+    end_node = csr.to_index(data['meta']['end_node'])
+    # Titik GPS (--from / --to) di-snap ke graf lewat indeks grid
+    gps_points = []
+    if origin or dest:
+        with phases.phase('snap'):
+            try:
+                index = load_spatial_index(json_path, data, csr)
+                if origin:
+                    lat, lon = parse_latlon(origin)
+                    start_node = index.snap(lat, lon, snap, snap_radius)
+                    gps_points.append((lon, lat))
+                if dest:
+                    lat, lon = parse_latlon(dest)
+                    end_node = index.snap(lat, lon, snap, snap_radius)
+                    gps_points.append((lon, lat))
+            except ValueError as e:
+                print(f"ERROR: {e}")
+                return
+        if start_node < 0 or end_node < 0:
+            print(f"ERROR: tidak ada node/ruas jalan dalam {snap_radius:g} m dari koordinat "
+                  f"{origin if start_node < 0 else dest}")
+            return
+        print(f"[INFO] Snap GPS -> start {csr.to_osm(start_node)}, end {csr.to_osm(end_node)}")
     
     print("1. Menghitung rute terpendek...")
-    path_nodes = get_dijkstra_path(graph_adj, start_node, end_node)
+    if use_ch:
+        # Query CH lalu unpack shortcut menjadi urutan jalan asli
+        with phases.phase('preprocessing'):
+            ch = load_ch(json_path, data, csr)
+        with phases.phase('search + path'):
+            _, _, path_nodes = ch.query(start_node, end_node, with_path=True)
+    else:
+        with phases.phase('search'):
+            spt = dijkstra(csr, start_node, (end_node,), with_pred=True)
+        with phases.phase('path'):
+            path_nodes = spt.path_to(end_node)
     
     if not path_nodes:
         print("PERINGATAN: Tidak ada jalur yang ditemukan antar titik ini.")
         return
 
+    iso = None
+    if isochrone_min:
+        # Pita isochrone dari titik start, satu pencarian berbatas untuk semua anggaran
+        with phases.phase('isochrone'):
+            iso = isochrone(csr, start_node, [m * 60.0 for m in isochrone_min])
+
+    routes = []
+    if n_alternatives:
+        # Rute alternatif (rute pertama = jalur tercepat yang sudah digambar merah)
+        with phases.phase('alternatives'):
+            routes, _ = alternatives(csr, start_node, end_node, n_alternatives, method=alt_method)
+        print(f"[INFO] {len(routes) - 1} rute alternatif ditemukan")
+
     # 2. Setup Plot
     print("2. Menggambar peta (Background)...")
+    t_render = time.perf_counter()
     fig, ax = plt.subplots(figsize=(10, 10))
     
     # Gambar semua jalan (Edges) sebagai garis abu-abu tipis
-    # Kita iterasi adj_list
-    for u, neighbors in graph_adj.items():
-        if u not in nodes_coords: continue
-        x1, y1 = nodes_coords[u]['x'], nodes_coords[u]['y']
-        
-        for v in neighbors:
-            if v in nodes_coords:
-                x2, y2 = nodes_coords[v]['x'], nodes_coords[v]['y']
-                # Plot garis tipis (Background Map)
-                ax.plot([x1, x2], [y1, y2], c='#d9d9d9', linewidth=0.8, zorder=1)
+    # Satu LineCollection dari array segmen CSR (bukan satu ax.plot per edge)
+    add_network(ax, csr, color='#d9d9d9', linewidth=0.8)
+    iso_handles = add_isochrone(ax, csr, iso) if iso is not None else []
 
     print("3. Menggambar rute solusi...")
     # Ambil koordinat untuk jalur merah
-    path_x = []
-    path_y = []
-    for node_id in path_nodes:
-        node_id = str(node_id)
-        if node_id in nodes_coords:
-            path_x.append(nodes_coords[node_id]['x'])
-            path_y.append(nodes_coords[node_id]['y'])
+    path_x, path_y = path_coords(csr, path_nodes)
     
     # Plot Rute (Garis Merah Tebal)
     ax.plot(path_x, path_y, c='red', linewidth=3, label='Jalur Tercepat', zorder=2)
+    if len(routes) > 1:
+        # Rute alternatif di bawah jalur merah, warna berbeda per rute
+        add_routes(ax, csr, routes[1:], routes[0].cost)
     
     # Plot Titik Start (Hijau) & End (Biru)
     ax.scatter(path_x[0], path_y[0], c='green', s=150, edgecolors='black', label='Start', zorder=3)
     ax.scatter(path_x[-1], path_y[-1], c='blue', s=150, edgecolors='black', label='End', zorder=3)
+    if gps_points:
+        ax.scatter(*zip(*gps_points), c='black', marker='x', s=80, label='Titik GPS', zorder=4)
     
     # Kosmetik Grafik
     filename = Path(json_path).name
     ax.set_title(f"Visualisasi Rute: {filename}\nNodes: {len(path_nodes)} titik", fontsize=14)
-    ax.legend()
+    handles, _ = ax.get_legend_handles_labels()
+    ax.legend(handles=handles + iso_handles)
     ax.axis('off') # Matikan sumbu X/Y agar terlihat seperti peta bersih
     
     # Simpan
@@ -132,11 +127,28 @@ def visualize(json_path):
     plt.tight_layout()
     plt.savefig(output_file, dpi=150)
     print(f"[SUKSES] Gambar disimpan di: {output_file}")
+    phases.add('render', (time.perf_counter() - t_render) * 1000.0)
+    phases.report()
     plt.show()
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
     p.add_argument('--instance', required=True, help='Path ke file JSON')
+    p.add_argument('--ch', action='store_true', help='Hitung rute dengan Contraction Hierarchies (+ path unpacking)')
+    p.add_argument('--from', dest='origin', metavar='LAT,LON', help='Titik awal koordinat GPS (menggantikan start_node)')
+    p.add_argument('--to', dest='dest', metavar='LAT,LON', help='Titik tujuan koordinat GPS (menggantikan end_node)')
+    p.add_argument('--snap', choices=['node', 'road'], default='node',
+                   help='node=node terdekat, road=ujung terdekat dari ruas jalan terdekat')
+    p.add_argument('--snap-radius', type=float, default=MAX_SNAP_M, metavar='METER',
+                   help='Jarak maksimum titik GPS ke node/ruas jalan (default %(default)s m)')
+    p.add_argument('--isochrone', type=float, nargs='+', metavar='MENIT',
+                   help='Gambar pita isochrone dari titik start, misal: --isochrone 1 2 3')
+    p.add_argument('--alternatives', type=int, metavar='K',
+                   help='Gambar hingga K rute (jalur tercepat + alternatif) dalam satu gambar')
+    p.add_argument('--alt-method', choices=list(ALT_METHODS), default='plateau',
+                   help='Metode rute alternatif (plateau / penalty)')
     args = p.parse_args()
     
-    visualize(args.instance)
\ No newline at end of file
+    visualize(args.instance, use_ch=args.ch, origin=args.origin, dest=args.dest, snap=args.snap,
+              snap_radius=args.snap_radius, isochrone_min=args.isochrone, n_alternatives=args.alternatives,
+              alt_method=args.alt_method)
\ No newline at end of file